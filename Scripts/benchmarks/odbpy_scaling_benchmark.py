@@ -0,0 +1,176 @@
+'''
+Benchmark for the odbpy analysis scripts run by Odb.CellFrequencyTables and
+the STA steps' unannotated net check (cell_frequency.py and
+filter_unannotated.py) on large blocks.
+
+Generates synthetic ODBs of increasing size (by default 10k, 100k and 1M
+instances: a chain of cells from a handful of sky130-style masters, every
+other net with a wire) with a checks report listing 10% of the nets as
+unannotated and a buffer list, then runs each script with `openroad -python`.
+The time to read the ODB (a `defutil.py write_views` job that writes nothing)
+is subtracted, so the remaining time per instance should stay flat as the
+block grows.
+
+Requires `openroad` in PATH.
+
+Usage (from the Scripts directory):
+    python benchmarks/odbpy_scaling_benchmark.py [--instances 1000000] [--steps 3]
+'''
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from openlane.common import get_script_dir  # noqa: E402
+
+ODBPY_DIR = os.path.join(get_script_dir(), "odbpy")
+
+MASTERS = [
+    "sky130_fd_sc_hd__buf_1",
+    "sky130_fd_sc_hd__buf_2",
+    "sky130_fd_sc_hd__clkbuf_4",
+    "sky130_fd_sc_hd__inv_2",
+    "sky130_fd_sc_hd__nand2_1",
+    "sky130_fd_sc_hd__nor2_1",
+    "sky130_fd_sc_hd__a21oi_1",
+    "sky130_fd_sc_hd__dfxtp_1",
+]
+BUFFERS = MASTERS[:3]
+
+# Run with `openroad -python`: writes a block of argv[1] instances to argv[2]
+GENERATOR = '''
+import sys
+import odb
+
+instances, path, masters = int(sys.argv[1]), sys.argv[2], sys.argv[3].split(",")
+
+
+def create(function, *variants):
+    # The signatures of the create() functions differ between OpenROAD versions
+    for args in variants:
+        try:
+            return function(*args)
+        except TypeError:
+            pass
+    raise TypeError(f"No known signature of {function}")
+
+
+db = odb.dbDatabase.create()
+tech = create(odb.dbTech.create, (db, "tech"), (db,))
+lib = create(odb.dbLib.create, (db, "lib", tech, ","), (db, "lib", ","))
+lib_masters = []
+for name in masters:
+    master = odb.dbMaster.create(lib, name)
+    master.setWidth(460)
+    master.setHeight(2720)
+    master.setType("CORE")
+    odb.dbMTerm.create(master, "A", "INPUT")
+    odb.dbMTerm.create(master, "X", "OUTPUT")
+    master.setFrozen()
+    lib_masters.append(master)
+chip = create(odb.dbChip.create, (db,), (db, tech))
+block = odb.dbBlock.create(chip, "synthetic")
+
+previous = None
+for i in range(instances):
+    inst = odb.dbInst.create(block, lib_masters[i % len(lib_masters)], f"u{i}")
+    if previous is not None:
+        net = odb.dbNet.create(block, f"n{i}")
+        previous.findITerm("X").connect(net)
+        inst.findITerm("A").connect(net)
+        if i % 2 == 0:
+            odb.dbWire.create(net)
+    previous = inst
+
+odb.write_db(db, path)
+'''
+
+
+def openroad_python(script, args, cwd):
+    '''
+    :returns: Seconds taken by `openroad -python script args`.
+    '''
+    env = dict(os.environ, PYTHONPATH=f"{ODBPY_DIR}:{os.getenv('PYTHONPATH', '')}")
+    start = time.perf_counter()
+    result = subprocess.run(
+        ["openroad", "-exit", "-no_splash", "-python", script, *args],
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        encoding="utf8",
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        print(result.stdout[-4000:], file=sys.stderr)
+        sys.exit(f"'{os.path.basename(script)}' failed with exit code {result.returncode}.")
+    return elapsed
+
+
+def generate(directory, instances, unannotated_fraction):
+    '''
+    Writes the ODB, checks report and buffer list for a block.
+    :returns: Their paths.
+    '''
+    generator = os.path.join(directory, "generate.py")
+    with open(generator, "w") as f:
+        f.write(GENERATOR)
+    odb_path = os.path.join(directory, f"synthetic_{instances}.odb")
+    openroad_python(generator, [str(instances), odb_path, ",".join(MASTERS)], directory)
+
+    checks_report = os.path.join(directory, f"checks_{instances}.rpt")
+    stride = max(1, round(1 / unannotated_fraction))
+    reported = [f"n{i}" for i in range(1, instances, stride)]
+    with open(checks_report, "w") as f:
+        f.write("report_parasitic_annotation -report_unannotated\n")
+        f.write(f"Found {len(reported)} unannotated drivers.\n")
+        f.writelines(f" {net}\n" for net in reported)
+        f.write("=" * 75 + "\n")
+
+    buffer_list = os.path.join(directory, "buffers.txt")
+    with open(buffer_list, "w") as f:
+        f.write("\n".join(BUFFERS) + "\n")
+    return odb_path, checks_report, buffer_list
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the odbpy analysis scripts on synthetic blocks of increasing size.')
+    parser.add_argument('--instances', type=int, default=1_000_000, help='Instances in the largest block.')
+    parser.add_argument('--steps', type=int, default=3, help='Block sizes, each 10x smaller than the next.')
+    parser.add_argument('--unannotated', type=float, default=0.1, help='Fraction of the nets reported as unannotated.')
+    args = parser.parse_args()
+    if shutil.which("openroad") is None:
+        sys.exit("openroad was not found in PATH.")
+
+    sizes = [args.instances // 10**i for i in reversed(range(args.steps))]
+    print(f"{'instances':>10}  {'script':<24}{'seconds':>10}{'- read':>10}{'us/inst':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for instances in sizes:
+            odb_path, checks_report, buffer_list = generate(tmp, instances, args.unannotated)
+            out_dir = os.path.join(tmp, f"tables_{instances}")
+            os.makedirs(out_dir)
+            jobs = [
+                ("defutil.py", ["write_views"]),
+                ("cell_frequency.py", ["--buffer-list", buffer_list, "--out-dir", out_dir]),
+                ("filter_unannotated.py", ["--corner", "nom", "--checks-report", checks_report]),
+            ]
+            read_seconds = None
+            for script, script_args in jobs:
+                seconds = openroad_python(os.path.join(ODBPY_DIR, script), [*script_args, odb_path], tmp)
+                if read_seconds is None:
+                    read_seconds = seconds
+                    print(f"{instances:>10}  {'(read ODB)':<24}{seconds:>10.2f}")
+                    continue
+                net_seconds = max(seconds - read_seconds, 0)
+                print(f"{instances:>10}  {script:<24}{seconds:>10.2f}{net_seconds:>10.2f}{net_seconds / instances * 1e6:>10.2f}")
+            os.unlink(odb_path)
+
+
+if __name__ == "__main__":
+    main()
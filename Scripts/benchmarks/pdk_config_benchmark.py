@@ -0,0 +1,136 @@
+'''
+Benchmark for Config.interactive, which the retiming driver calls once per
+iteration and once per clock-period bump.
+
+Times Config.interactive with the PDK configuration cache cleared before
+every call (the PDK and SCL config.tcl files are evaluated and every PDK
+variable is processed again), with only the on-disk cache (as in a new
+process) and with the in-memory cache.
+
+By default, a synthetic PDK with a value for every PDK and SCL variable is
+generated; pass --pdk-root and --pdk to use an installed PDK instead.
+
+Usage (from the Scripts directory):
+    python benchmarks/pdk_config_benchmark.py [--iterations 50]
+    python benchmarks/pdk_config_benchmark.py --pdk-root ~/.volare --pdk sky130A
+'''
+import argparse
+import os
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from typing import Union, get_args, get_origin
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from openlane.common import Path, TclUtils  # noqa: E402
+from openlane.config import Config, pdk_cache  # noqa: E402
+from openlane.config.flow import pdk_variables, scl_variables  # noqa: E402
+
+
+def tcl_value(type_, make_file):
+    '''
+    :returns: A Tcl value that the PDK variable type accepts.
+    '''
+    origin, args = get_origin(type_), get_args(type_)
+    if origin is Union:
+        return tcl_value(next(arg for arg in args if arg is not type(None)), make_file)
+    if origin in [list, tuple]:
+        return " ".join(tcl_value(args[0], make_file) for _ in range(4))
+    if origin is dict:
+        return f'nom_* "{tcl_value(args[1], make_file)}"'
+    if type_ is Path:
+        return make_file()
+    if type_ in [Decimal, int]:
+        return "1"
+    return "cell"
+
+
+def generate_pdk(pdk_root, pdk="synthetic", scl="synthetic_scl", extra_vars=150):
+    '''
+    Writes a PDK whose config.tcl files set every PDK and SCL variable, plus
+    ``extra_vars`` variables no step reads, as real PDKs do.
+    '''
+    pdkpath = os.path.join(pdk_root, pdk)
+    files_dir = os.path.join(pdkpath, "libs.ref", scl)
+    os.makedirs(files_dir)
+    counter = iter(range(10**6))
+
+    def make_file():
+        path = os.path.join(files_dir, f"file_{next(counter)}")
+        open(path, "w").close()
+        return path
+
+    lines = {"pdk": [f'set ::env(STD_CELL_LIBRARY) "{scl}"'], "scl": []}
+    for variable in pdk_variables + scl_variables:
+        if variable.name == "STD_CELL_LIBRARY":
+            continue
+        value = tcl_value(variable.type, make_file)
+        target = "scl" if variable in scl_variables else "pdk"
+        lines[target].append(f"set ::env({variable.name}) {{{value}}}")
+    for i in range(extra_vars):
+        lines["pdk"].append(f'set ::env(EXTRA_{i}) "$::env(PDK_ROOT)/{pdk}/{i}"')
+
+    for target, directory in [("pdk", ""), ("scl", scl)]:
+        config_dir = os.path.join(pdkpath, "libs.tech", "openlane", directory)
+        os.makedirs(config_dir, exist_ok=True)
+        with open(os.path.join(config_dir, "config.tcl"), "w") as f:
+            f.write("\n".join(lines[target]) + "\n")
+    return pdk
+
+
+def run(mode, pdk_root, pdk, iterations):
+    '''
+    :returns: Mean milliseconds per Config.interactive call and Tcl
+        evaluations per call.
+    '''
+    original_eval_env = TclUtils._eval_env
+    evaluations = 0
+
+    def counting_eval_env(*args, **kwargs):
+        nonlocal evaluations
+        evaluations += 1
+        return original_eval_env(*args, **kwargs)
+
+    TclUtils._eval_env = counting_eval_env
+    try:
+        pdk_cache.clear()
+        Config.interactive("spm", pdk, PDK_ROOT=pdk_root)  # fills the caches
+        evaluations = 0
+        start = time.perf_counter()
+        for _ in range(iterations):
+            if mode != "memory":
+                pdk_cache.clear()
+            Config.interactive("spm", pdk, PDK_ROOT=pdk_root)
+        elapsed = time.perf_counter() - start
+    finally:
+        TclUtils._eval_env = original_eval_env
+    return elapsed / iterations * 1000, evaluations / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Config.interactive with and without the PDK configuration cache.')
+    parser.add_argument('--iterations', type=int, default=50, help='Config.interactive calls per mode.')
+    parser.add_argument('--pdk-root', help='An installed PDK root. A synthetic PDK is generated if omitted.')
+    parser.add_argument('--pdk', default='sky130A', help='The PDK to load from --pdk-root.')
+    parser.add_argument('--extra-vars', type=int, default=150, help='Unused variables set by the synthetic PDK.')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdk_root, pdk = args.pdk_root, args.pdk
+        if pdk_root is None:
+            pdk_root = os.path.join(tmp, "pdks")
+            pdk = generate_pdk(pdk_root, extra_vars=args.extra_vars)
+        pdk_root = os.path.abspath(os.path.expanduser(pdk_root))
+
+        print(f"{'mode':<10}{'ms/call':>10}{'Tcl evals/call':>16}")
+        for mode, cache_dir in [("uncached", ""), ("disk", os.path.join(tmp, "cache")), ("memory", "")]:
+            os.environ["OPENLANE_PDK_CACHE_DIR"] = cache_dir
+            milliseconds, evaluations = run(mode, pdk_root, pdk, args.iterations)
+            print(f"{mode:<10}{milliseconds:>10.2f}{evaluations:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
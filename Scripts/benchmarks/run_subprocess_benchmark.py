@@ -0,0 +1,74 @@
+'''
+Benchmark for the handling of report output in Step.run_subprocess.
+
+Generates a synthetic full_clock_expanded max.rpt (default ~300 MB), wraps
+it in %OL_CREATE_REPORT/%OL_END_REPORT like corner.tcl does and feeds it
+through `cat` to the output processors of an OpenROAD STA step, once with
+the line-by-line reader and once with the chunked reader that copies report
+regions in bulk.
+
+Usage (from the Scripts directory):
+    python benchmarks/run_subprocess_benchmark.py [--size-mb 300]
+'''
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import psutil
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from benchmarks.timing_rpt_parser_benchmark import generate_report  # noqa: E402
+from openlane.common import RingBuffer  # noqa: E402
+from openlane.steps import DefaultOutputProcessor, OpenROADOutputProcessor  # noqa: E402
+from openlane.steps.step import LOG_TAIL_LENGTH, _process_output  # noqa: E402
+
+
+def run(mode, tool_output, report_dir):
+    '''
+    Process the output of `cat tool_output` as run_subprocess would.
+    :returns: Seconds taken.
+    '''
+    step = SimpleNamespace(step_dir=report_dir, on_alert=lambda alert: alert)
+    processors = [OpenROADOutputProcessor(step, report_dir, True), DefaultOutputProcessor(step, report_dir, True)]
+    start = time.perf_counter()
+    process = psutil.Popen(["cat", tool_output], stdout=subprocess.PIPE, encoding="utf8")
+    # A plain iterator has no underlying buffer, so it takes the line-by-line reader
+    stdout = process.stdout if mode == "bulk" else (line for line in process.stdout)
+    with open(os.path.join(report_dir, f"{mode}.log"), 'w') as log_file:
+        _process_output(stdout, log_file, RingBuffer(str, LOG_TAIL_LENGTH), processors)
+    process.wait()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark report handling in run_subprocess on a synthetic report.')
+    parser.add_argument('--size-mb', type=int, default=300, help='Approximate size of the synthetic report (in MB).')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report = os.path.join(tmp, "generated.rpt")
+        print(f"Generating ~{args.size_mb} MB synthetic report...")
+        n_paths, n_bytes = generate_report(report, args.size_mb)
+        tool_output = os.path.join(tmp, "sta.out")
+        with open(tool_output, 'w') as out, open(report) as f:
+            out.write("Reading timing models for corner nom_ss_100C_1v60…\n%OL_CREATE_REPORT max.rpt\n")
+            shutil.copyfileobj(f, out)
+            out.write("%OL_END_REPORT\n%OL_METRIC_F timing__setup__ws__corner:nom_ss_100C_1v60 -1.0\n")
+        size_mb = os.path.getsize(tool_output) / (1024 * 1024)
+        print(f"{n_paths} paths, {size_mb:.1f} MB of tool output")
+
+        print(f"{'mode':<8}{'seconds':>10}{'MB/s':>10}")
+        for mode in ["lines", "bulk"]:
+            seconds = run(mode, tool_output, tmp)
+            print(f"{mode:<8}{seconds:>10.2f}{size_mb / seconds:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
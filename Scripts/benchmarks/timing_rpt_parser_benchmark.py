@@ -0,0 +1,186 @@
+'''
+Benchmark for the timing report parser.
+
+Generates a synthetic full_clock_expanded max.rpt (default ~300 MB, the size
+corner.tcl produces with -group_count 1000000 on real designs) and parses it
+with both the legacy whole-file parser and the streaming parser. Each run
+happens in its own child process so that peak RSS is measured in isolation.
+
+Usage (from the Scripts directory):
+    python benchmarks/timing_rpt_parser_benchmark.py [--size-mb 300] [--gzip] [--max-paths N]
+'''
+import argparse
+import gzip
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from metrics import TimingRptParser  # noqa: E402
+
+
+PATH_TEMPLATE = """Startpoint: {start}
+            (rising edge-triggered flip-flop clocked by clk)
+Endpoint: {end} (rising edge-triggered flip-flop clocked by clk)
+Path Group: clk
+Path Type: max
+Corner: nom_ss_100C_1v60
+
+Fanout     Cap    Slew   Delay    Time   Description
+-----------------------------------------------------------------------------
+                          0.000000    0.000000   clock clk (rise edge)
+                          0.000000    0.000000   clock source latency
+     1    0.012474    0.150000    0.000000    0.000000 ^ clk (in)
+                                                         clk (net)
+                    0.150000    0.000000    0.000000 ^ {start_pin}/CLK (sky130_fd_sc_hd__dfxtp_1)
+     2    0.004527    0.061286    0.465377    0.465377 ^ {start_pin}/Q (sky130_fd_sc_hd__dfxtp_1)
+                                                         {net_a} (net)
+                    0.061286    0.000000    0.465377 ^ _{cell_a}_/A (sky130_fd_sc_hd__nand2_1)
+     1    0.002110    0.071530    0.092817    0.558194 v _{cell_a}_/Y (sky130_fd_sc_hd__nand2_1)
+                                                         {net_b} (net)
+                    0.071530    0.000000    0.558194 v _{cell_b}_/B (sky130_fd_sc_hd__xor2_1)
+     1    0.001905    0.093416    0.213201    0.771395 ^ _{cell_b}_/X (sky130_fd_sc_hd__xor2_1)
+                                                         {net_c} (net)
+                    0.093416    0.000000    0.771395 ^ {end_pin}/D (sky130_fd_sc_hd__dfxtp_1)
+                                            0.771395   data arrival time
+
+                          {period:.6f}    {period:.6f}   clock clk (rise edge)
+                          0.000000    {period:.6f}   clock source latency
+                    0.150000    0.000000    {period:.6f} ^ {end_pin}/CLK (sky130_fd_sc_hd__dfxtp_1)
+                         -0.250000    {required:.6f}   clock uncertainty
+                          0.000000    {required:.6f}   clock reconvergence pessimism
+                         -0.124721    {setup:.6f}   library setup time
+                                            {setup:.6f}   data required time
+-----------------------------------------------------------------------------
+                                            {setup:.6f}   data required time
+                                           -0.771395   data arrival time
+-----------------------------------------------------------------------------
+                                            {slack:.6f}   slack ({status})
+
+
+"""
+
+
+def generate_report(path, size_mb, compress=False):
+    '''
+    Write a synthetic, slack-sorted max.rpt of roughly size_mb megabytes.
+    '''
+    target = size_mb * 1024 * 1024
+    header = ("\n===========================================================================\n"
+              "report_checks -path_delay max (Setup)\n"
+              "============================================================================\n"
+              "======================= nom_ss_100C_1v60 Corner ===================================\n\n")
+    opener = gzip.open if compress else open
+    written = 0
+    paths = 0
+    with opener(path, 'wt') as f:
+        f.write(header)
+        while written < target:
+            stage = paths % 4
+            start = f"mul_{paths % 7}.Multiplier_pipeline_stage[{stage}].pipe_stage_input.data_out[{paths % 16}]$_DFF_P_"
+            end = f"adder_tree0.AdderTree_pipeline_stage[{stage}].pipe_stage_input.data_out[{paths % 11}]$_DFF_P_"
+            period = 2.0
+            required = period - 0.25
+            setup = required - 0.124721
+            slack = -1.0 + paths * 1e-6
+            block = PATH_TEMPLATE.format(
+                start=start, end=end,
+                start_pin=start.replace('.', '/'), end_pin=end.replace('.', '/'),
+                net_a=f"net{paths}a", net_b=f"net{paths}b", net_c=f"net{paths}c",
+                cell_a=2 * paths, cell_b=2 * paths + 1,
+                period=period, required=required, setup=setup,
+                slack=slack, status="VIOLATED" if slack < 0 else "MET",
+            )
+            f.write(block)
+            written += len(block)
+            paths += 1
+    return paths, written
+
+
+def legacy_parse(timing_rpt):
+    '''
+    The previous implementation: concatenate every report, split on
+    "Startpoint:" and run three regex searches per block.
+    '''
+    text = ""
+    for rpt_file in timing_rpt:
+        with open(rpt_file, 'r') as f:
+            text += f.read() + "\n"
+    paths = []
+    blocks = re.split(r'(?=Startpoint:)', text)
+    blocks = [block for block in blocks if block.lstrip().startswith("Startpoint:")]
+    for block in blocks:
+        block = block.strip()
+        startpoint_match = re.search(r'^Startpoint:\s*(\S+)\s*\n?\s*\((\w+)', block, re.MULTILINE)
+        endpoint_match = re.search(r'^Endpoint:\s*(\S+)\s*\n?\s*\((\w+)', block, re.MULTILINE)
+        slack_match = re.search(r'^\s*([-\d\.]+)\s+slack', block, re.MULTILINE)
+        slack_value = float(slack_match.group(1)) if slack_match else None
+        paths.append({
+            'startpoint': startpoint_match.group(1) if startpoint_match else None,
+            'endpoint': endpoint_match.group(1) if endpoint_match else None,
+            'slack': slack_value,
+            'violated': slack_value is not None and slack_value < 0,
+        })
+    return paths
+
+
+def worker(mode, report, max_paths):
+    start = time.perf_counter()
+    if mode == "legacy":
+        paths = legacy_parse([report])
+    else:
+        paths = TimingRptParser([report], max_paths=max_paths).get_paths()
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is reported in KiB on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"mode": mode, "paths": len(paths), "seconds": elapsed, "peak_rss_mb": peak_rss_mb}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the timing report parser on a synthetic report.')
+    parser.add_argument('--size-mb', type=int, default=300, help='Approximate size of the synthetic report (in MB).')
+    parser.add_argument('--gzip', action='store_true', help='Compress the synthetic report (streaming parser only).')
+    parser.add_argument('--max-paths', type=int, default=None, help='Additionally benchmark early exit after N worst paths.')
+    parser.add_argument('--skip-legacy', action='store_true', help='Do not run the legacy whole-file parser.')
+    parser.add_argument('--worker', nargs=2, metavar=('MODE', 'REPORT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        mode, report = args.worker
+        worker(mode, report, args.max_paths if mode == "early-exit" else None)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report = os.path.join(tmp, "max.rpt.gz" if args.gzip else "max.rpt")
+        print(f"Generating ~{args.size_mb} MB synthetic report...")
+        n_paths, n_bytes = generate_report(report, args.size_mb, args.gzip)
+        # Throughput is always computed on the uncompressed report size
+        size_mb = n_bytes / (1024 * 1024)
+        print(f"{n_paths} paths, {size_mb:.1f} MB uncompressed, {os.path.getsize(report) / (1024 * 1024):.1f} MB on disk")
+
+        modes = ["streaming"]
+        if not args.skip_legacy and not args.gzip:
+            modes.insert(0, "legacy")
+        if args.max_paths is not None:
+            modes.append("early-exit")
+
+        print(f"{'mode':<12}{'paths':>10}{'seconds':>10}{'MB/s':>10}{'peak RSS (MB)':>16}")
+        for mode in modes:
+            cmd = [sys.executable, os.path.abspath(__file__), "--worker", mode, report]
+            if args.max_paths is not None:
+                cmd += ["--max-paths", str(args.max_paths)]
+            out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            throughput = size_mb / result["seconds"] if result["seconds"] else float("inf")
+            print(f"{mode:<12}{result['paths']:>10}{result['seconds']:>10.2f}{throughput:>10.1f}{result['peak_rss_mb']:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
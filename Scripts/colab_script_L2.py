@@ -14,7 +14,12 @@ import subprocess
 import random 
 import argparse
 
-from metrics import InstanceDetails, TimingRptParser, StateOutMetrics
+from metrics import InstanceDetails, TimingRptParser, StateOutMetrics, PathTable, NetlistIndex
+from metrics.incremental_synthesis import IncrementalSynthesis
+from metrics.candidate_evaluation import CandidateEvaluator
+from metrics.mask_table import MaskTable
+from metrics.retiming_solver import StageDelayModel
+from metrics.period_search import PeriodSearch
 
 # Added command-line argument parsing
 parser = argparse.ArgumentParser(description='Run the pipeline adjustment algorithm with optional clock period increase.')
@@ -22,6 +27,16 @@ parser.add_argument('--increase-clock', action='store_true', help='Allow automat
 parser.add_argument('--clock-period', type=float, default=20.0, help='Initial clock period to use in the design (in ns).')
 parser.add_argument('--Iterations', type=int, default=50, help='Max Iteration count for the algorithm')
 parser.add_argument('--naive-config', action='store_true', help='naive configuration to check the clock which design satisfies without any modification')
+parser.add_argument('--incremental-synth', action='store_true', help='Only resynthesize the pipelined instances whose mask changed, reusing cached netlists for the rest')
+parser.add_argument('--solver', action='store_true', help='Plan all masks at once from a stage delay model fitted to the STA runs so far, instead of moving one stage per violated path')
+parser.add_argument('--period-search', action='store_true', help='Bracket and bisect the minimum clock period, starting every period from the masks of the nearest passing one, and report the Fmax curve')
+parser.add_argument('--period-step', type=float, default=2.5, help='Initial bracketing step of --period-search (in ns), doubled after every step')
+parser.add_argument('--period-tolerance', type=float, default=0.5, help='--period-search stops once the minimum period is known to within this (in ns)')
+parser.add_argument('--yosys-worker', action='store_true', help='Run synthesis in long-lived pyosys worker processes instead of starting Yosys for every synthesis')
+parser.add_argument('--sta-session', action='store_true', help='Run STA in long-lived OpenSTA sessions that keep the cell libraries loaded instead of starting OpenSTA for every STA run')
+parser.add_argument('--sta-cache', action='store_true', help='Reuse the STA results of earlier iterations whose netlist and constraints were identical (cached in ./openlane_run/sta_cache)')
+parser.add_argument('--step-cache', action='store_true', help='Restore synthesis and STA from earlier runs whose inputs and configuration were identical instead of rerunning them (cached in ./openlane_run/step_cache)')
+parser.add_argument('--candidates', type=int, default=1, help='Number of candidate mask moves to evaluate concurrently per iteration (1 = one move per iteration)')
 args = parser.parse_args()
 
 openlane.logging.set_log_level("CRITICAL")
@@ -62,16 +77,37 @@ SYNTHESIS
 '''
 flag_stop = False
 telemetry = {"attempted_pipeline_combinations":set(), "kill_count":0, "kill":False, "iterations":0}
-backup_files = create_backup_files(design_paths)
+mask_table = MaskTable(FILES)  # Pipeline masks live here; the design files are never modified
+synth_options = dict(
+    SYNTH_NO_FLAT=True,
+    YOSYS_LOG_LEVEL="ERROR",
+    SYNTH_STRATEGY="DELAY 1",
+    SYNTH_ABC_BUFFERING=True,            # Enable cell buffering
+    YOSYS_PERSISTENT_WORKER=args.yosys_worker,
+)
+incremental_synthesis = IncrementalSynthesis(FILES, top_module[0], **synth_options)
+candidate_evaluator = CandidateEvaluator("nom_ss_100C_1v60", synth_options=dict(synth_options, SYNTH_WRITE_ELABORATED_JSON=True),
+                                         sta_options=dict(PNR_SDC_FILE="pre_pnr_base.sdc",
+                                                          STA_PERSISTENT_SESSION=args.sta_session,
+                                                          STA_CACHE_DIR=os.path.abspath("./openlane_run/sta_cache") if args.sta_cache else None))
+delay_model = StageDelayModel()  # Segment delays fitted to every STA run so far, kept across clock periods
+candidate_sta_dir = None  # STA of the current design files, if the last iteration's best candidate already ran it
+period_search = PeriodSearch(args.period_step, args.period_tolerance) if args.period_search else None
 while not flag_stop:
+    passed = False
     for iterations in range(N_iterations):
         # print_available_steps()
 
-        # Dumping raw netlist
-        verilog_str = " ".join(FILES)
-        yosys_cmd = f'rm -rf ./openlane_run/*yosys* ./openlane_run/*openroad*; mkdir -p ./openlane_run; yosys -Q -qq -p "read_verilog -sv {verilog_str}; hierarchy -top {top_module[0]}; proc; write_json ./openlane_run/raw_netlist.json"'
-        # Run Yosys comman
-        subprocess.run(yosys_cmd, shell=True, check=True)
+        # Design files with the current masks
+        files = mask_table.render("./openlane_run/sources")
+
+        subprocess.run("rm -rf ./openlane_run/*yosys* ./openlane_run/*openroad*; mkdir -p ./openlane_run", shell=True, check=True)
+        if args.incremental_synth:
+            # Dumping raw netlist: incremental synthesis needs it before synthesizing.
+            # Otherwise synthesis writes it (SYNTH_WRITE_ELABORATED_JSON).
+            verilog_str = " ".join(files)
+            yosys_cmd = f'yosys -Q -qq -p "read_verilog -sv {verilog_str}; hierarchy -top {top_module[0]}; proc; write_json ./openlane_run/raw_netlist.json"'
+            subprocess.run(yosys_cmd, shell=True, check=True)
 
         Config.interactive(
             top_module[0],  # Assume first element of top_module list is the top module
@@ -81,39 +117,60 @@ while not flag_stop:
             CLOCK_NET = clock_pin,
             CLOCK_PERIOD = clock_period,
             PRIMARY_GDSII_STREAMOUT_TOOL="klayout",
+            STEP_CACHE_DIR=os.path.abspath("./openlane_run/step_cache") if args.step_cache else None,
+            PROCESS_HISTORY=os.path.abspath("./openlane_run/process_history.sqlite"),
         )
 
-        Synthesis = Step.factory.get("Yosys.Synthesis")
-        synthesis = Synthesis(
-            VERILOG_FILES=FILES,
-            SYNTH_NO_FLAT=True,
-            YOSYS_LOG_LEVEL="ERROR",
-            SYNTH_STRATEGY="DELAY 1", 
-            SYNTH_ABC_BUFFERING=True,            # Enable cell buffering
-            state_in=State(),
-        )
-        synthesis.start()
-
-        # Static Timing Analysis Pre-PNR (STA Pre-PNR)
-        STAPrePNR = Step.factory.get("OpenROAD.STAPrePNR")
-        sta_pre_pnr = STAPrePNR(
-            PNR_SDC_FILE="pre_pnr_base.sdc",
-            VERILOG_FILES=FILES,
-            state_in=synthesis.state_out,  # Use the output state from synthesis as input state for STA Pre-PNR
-        )
-        sta_pre_pnr.start()
+        # The best candidate of the last iteration already ran STA on the current design files
+        openroad_path = candidate_sta_dir
+        if openroad_path is None:
+            synth_state = None
+            if args.incremental_synth:
+                synth_state = incremental_synthesis.run(NetlistIndex.load("./openlane_run/raw_netlist.json", top_module[0]), files)
+            if synth_state is None:
+                Synthesis = Step.factory.get("Yosys.Synthesis")
+                synthesis = Synthesis(
+                    VERILOG_FILES=files,
+                    state_in=State(),
+                    SYNTH_WRITE_ELABORATED_JSON=True,
+                    **synth_options,
+                )
+                synthesis.start()
+                synth_state = synthesis.state_out
+
+            # Static Timing Analysis Pre-PNR (STA Pre-PNR)
+            STAPrePNR = Step.factory.get("OpenROAD.STAPrePNR")
+            sta_pre_pnr = STAPrePNR(
+                PNR_SDC_FILE="pre_pnr_base.sdc",
+                STA_PERSISTENT_SESSION=args.sta_session,
+                STA_CACHE_DIR=os.path.abspath("./openlane_run/sta_cache") if args.sta_cache else None,
+                VERILOG_FILES=files,
+                state_in=synth_state,  # Use the output state from synthesis as input state for STA Pre-PNR
+            )
+            sta_pre_pnr.start()
+            openroad_path = glob.glob("./openlane_run/*-openroad-*")[0]
+        if not args.incremental_synth:
+            # The elaborated design written by synthesis (carried through to the STA state)
+            with open(f"{openroad_path}/state_out.json") as f:
+                shutil.copy(json.load(f)["elab_json"], "./openlane_run/raw_netlist.json")
 
         # Parse Timing Data.
         it = telemetry["iterations"]
         print("============================================================")
         print(f"Iteration {it}")
         print("============================================================")
-        openroad_state_path = glob.glob("./openlane_run/*-openroad-*/state_out.json")[0]
+        openroad_state_path = f"{openroad_path}/state_out.json"
         stateout = StateOutMetrics(openroad_state_path)
         if stateout.nom_ss_100C_1v60.metrics["timing__hold__ws"] < 0 or stateout.nom_ss_100C_1v60.metrics["timing__setup__ws"] < 0:
             print("Timing Violated For nom_ss_100C_1v60")
             if not args.naive_config:
-                temp_telemetry = the_algorithm("nom_ss_100C_1v60",  telemetry)
+                if args.solver:
+                    temp_telemetry = the_solver_algorithm("nom_ss_100C_1v60", telemetry, mask_table, delay_model, clock_period, openroad_path)
+                elif args.candidates > 1:
+                    temp_telemetry, best = the_parallel_algorithm("nom_ss_100C_1v60", telemetry, mask_table, candidate_evaluator, args.candidates, openroad_path)
+                    candidate_sta_dir = best.sta_dir if best is not None else None
+                else:
+                    temp_telemetry = the_algorithm("nom_ss_100C_1v60",  telemetry, mask_table, openroad_path)
                 if temp_telemetry["kill"]:
                     print("Kill Condition Met")
                     #print(temp_telemetry)
@@ -121,15 +178,33 @@ while not flag_stop:
                 telemetry = temp_telemetry
         else:
             print(f"Timing Passed For nom_ss_100C_1v60 for clock period of {clock_period}")
-            temp_telemetry = the_algorithm("nom_ss_100C_1v60",  telemetry)
-            flag_stop = True
+            temp_telemetry = the_algorithm("nom_ss_100C_1v60",  telemetry, mask_table, openroad_path)
+            passed = True
+            flag_stop = period_search is None
             break
         # print("============================================================")
         # print("One Iteration Completed")
         # print("============================================================")
         #input()
     
-    if not flag_stop:
+    if period_search is not None:
+        period_search.record(clock_period, passed, mask_table.to_dict(),
+                             stateout.nom_ss_100C_1v60.metrics["timing__setup__ws"], iterations + 1)
+        period_search.save("./openlane_run/period_search.json")
+        next_period = period_search.next_period()
+        if next_period is None:
+            period_search.print_curve()
+            break
+        # Warm start from the masks of the nearest passing period
+        mask_table = MaskTable.from_dict(FILES, period_search.warm_start())
+        telemetry = {"attempted_pipeline_combinations": set(), "kill_count": 0, "kill": False,
+                     "iterations": telemetry["iterations"]}
+        candidate_sta_dir = None
+        clock_period = next_period
+        print("============================================================")
+        print(f"Period search: trying a clock period of {clock_period}")
+        print("============================================================")
+    elif not flag_stop:
         if args.increase_clock:
             # Proceed with increasing clock period
             if not args.naive_config:
@@ -137,6 +212,7 @@ while not flag_stop:
             telemetry["attempted_pipeline_combinations"].clear()
             telemetry["kill_count"] = 0
             telemetry["kill"] = False
+            candidate_sta_dir = None
             clock_period = round(clock_period + 2.5, 2)
             print("============================================================")
             print(f"Increasing clock period to {clock_period}")
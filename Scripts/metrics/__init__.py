@@ -1,3 +1,5 @@
 from .state_out_metrics import StateOutMetrics, StateOutCornerMetrics
 from .instance_details import InstanceDetails
-from .timing_rpt_parser import TimingRptParser
+from .timing_rpt_parser import TimingRptParser, iter_timing_paths, open_report
+from .path_table import PathTable, PATH_DTYPE
+from .netlist_index import NetlistIndex, PipelineInstance
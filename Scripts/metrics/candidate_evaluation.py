@@ -0,0 +1,123 @@
+import math
+import os
+import re
+import shutil
+from typing import NamedTuple
+
+from openlane.common import get_tpe
+from openlane.state import State
+from openlane.steps import Step, StepError
+
+from metrics.state_out_metrics import StateOutCornerMetrics
+
+
+class MaskMove(NamedTuple):
+    module: str
+    instance_name: str
+    instance_id: int
+    old_mask: str
+    new_mask: str
+
+
+class Candidate(NamedTuple):
+    name: str
+    moves: tuple  # MaskMove, at most one per instance
+
+
+class CandidateResult(NamedTuple):
+    candidate: Candidate
+    workspace: str
+    files: list  # the candidate's rendered design files
+    sta_dir: str
+    metrics: StateOutCornerMetrics
+    score: tuple  # (worst slack, total negative slack), higher is better
+
+
+def timing_score(metrics):
+    """
+    Rank a corner's STA metrics by worst slack (setup or hold), then by
+    total negative slack. Higher is better; a missing worst slack (e.g. STA
+    failed to report it) ranks lowest.
+    """
+    worst_slacks = [metrics.get_metric("timing__setup__ws"), metrics.get_metric("timing__hold__ws")]
+    if None in worst_slacks:
+        return -math.inf, -math.inf
+    wns = min(worst_slacks)
+    tns = (metrics.get_metric("timing__setup__tns") or 0) + (metrics.get_metric("timing__hold__tns") or 0)
+    return wns, tns
+
+
+class CandidateEvaluator:
+    """
+    Evaluates several pipeline mask candidates of one retiming iteration concurrently.
+
+    Every candidate renders its design files into its own workspace, so
+    candidates never touch the user's sources or each other. Synthesis and STA
+    of all candidates are submitted to OpenLane's process-limited thread pool,
+    the same one SynthesisExploration fans out on, and their tool processes
+    share the cores and memory of OpenLane's resource scheduler.
+    """
+    def __init__(self, condition, workdir="./openlane_run/candidates", synth_options=None, sta_options=None):
+        self.condition = condition
+        self.workdir = os.path.abspath(workdir)
+        self.synth_options = synth_options or {}
+        self.sta_options = sta_options or {}
+
+    def _workspace(self, iteration, index, candidate, render):
+        slug = re.sub(r'[^\w.-]+', '_', candidate.name)
+        workspace = os.path.join(self.workdir, str(iteration), f"{index}-{slug}")
+        shutil.rmtree(workspace, ignore_errors=True)
+        return workspace, render(candidate.moves, os.path.join(workspace, "src"))
+
+    def evaluate(self, iteration, candidates, render):
+        """
+        :param iteration: Iteration number, used to name the workspaces.
+        :param candidates: List of Candidate to try.
+        :param render: Callable (moves, directory) that writes the design files
+            with the moves applied into directory and returns their paths.
+        :returns: The CandidateResults of the candidates that completed, best first.
+        """
+        # Workspaces of older iterations are no longer referenced
+        if os.path.isdir(self.workdir):
+            for entry in os.listdir(self.workdir):
+                if entry != str(iteration):
+                    shutil.rmtree(os.path.join(self.workdir, entry), ignore_errors=True)
+
+        Synthesis = Step.factory.get("Yosys.Synthesis")
+        STAPrePNR = Step.factory.get("OpenROAD.STAPrePNR")
+
+        # Submit every synthesis before any STA: an STA blocks its worker
+        # until the synthesis it depends on is done.
+        pending = []
+        for index, candidate in enumerate(candidates):
+            workspace, files = self._workspace(iteration, index, candidate, render)
+            synthesis = Synthesis(VERILOG_FILES=files, state_in=State(), **self.synth_options)
+            synth_future = get_tpe().submit(synthesis.start, step_dir=os.path.join(workspace, "1-yosys-synthesis"))
+            pending.append((candidate, workspace, files, synth_future))
+
+        futures = []
+        for candidate, workspace, files, synth_future in pending:
+            sta_dir = os.path.join(workspace, "2-openroad-staprepnr")
+            sta = STAPrePNR(VERILOG_FILES=files, state_in=synth_future, **self.sta_options)
+            # Finish candidates that are already synthesized before synthesizing more
+            sta.priority = 1
+            futures.append((candidate, workspace, files, sta_dir, get_tpe().submit(sta.start, step_dir=sta_dir)))
+
+        results = []
+        for candidate, workspace, files, sta_dir, future in futures:
+            try:
+                state = future.result()
+            except StepError as e:
+                print(f"Candidate {candidate.name} failed: {e}")
+                continue
+            metrics = StateOutCornerMetrics(self.condition, state.metrics)
+            results.append(CandidateResult(candidate, workspace, files, sta_dir, metrics, timing_score(metrics)))
+
+        results.sort(key=lambda result: result.score, reverse=True)
+        return results
+
+    def discard(self, results, keep):
+        """Remove the workspaces of all results except keep."""
+        for result in results:
+            if result is not keep:
+                shutil.rmtree(result.workspace, ignore_errors=True)
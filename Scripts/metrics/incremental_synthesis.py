@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+
+from openlane.common import GenericDictEncoder, Path
+from openlane.state import DesignFormat, State
+from openlane.steps import Step
+
+
+MASK_LOCALPARAM_PATTERN = re.compile(r"localparam\s+PIPELINE_STAGE_MASK\s*=\s*.*?;", re.DOTALL)
+
+# Synthesis settings that the incremental flow controls per synthesized unit
+CONTROLLED_VARIABLES = ("DESIGN_NAME", "VERILOG_FILES", "EXTRA_VERILOG_MODELS", "SYNTH_PARAMETERS",
+                        "SYNTH_HIERARCHY_MODE", "SYNTH_NO_FLAT")
+# Variables that do not change the synthesized netlist, left out of cache keys
+NETLIST_NEUTRAL_VARIABLES = ("YOSYS_LOG_LEVEL", "YOSYS_PERSISTENT_WORKER")
+
+
+def defines_module(file_path, module):
+    with open(file_path, 'r') as f:
+        return re.search(rf"^\s*module\s+{re.escape(module)}\b", f.read(), re.MULTILINE) is not None
+
+
+def normalized_source_digest(file_paths):
+    """
+    Hash the design sources with the PIPELINE_STAGE_MASK localparam removed.
+    Per-instance masks are keyed separately (from the elaborated netlist), so
+    a mask edit for one INSTANCE_ID does not invalidate every other instance.
+    """
+    digest = hashlib.sha256()
+    for file_path in file_paths:
+        with open(file_path, 'r') as f:
+            content = f.read()
+        digest.update(os.path.basename(file_path).encode())
+        digest.update(MASK_LOCALPARAM_PATTERN.sub("", content).encode())
+    return digest.hexdigest()
+
+
+def format_parameter(value):
+    return str(value) if isinstance(value, int) else f'"{value}"'
+
+
+class IncrementalSynthesis:
+    """
+    Synthesizes a design with pipelined submodules one parameterization at a time.
+
+    Every pipelined instance found in the elaborated netlist is synthesized on
+    its own (flattened) and stored in a content-addressed cache, keyed by its
+    module, parameter overrides, effective pipeline mask, the design sources and
+    the synthesis configuration. The top module is synthesized with the pipelined
+    modules as black boxes, then the cached submodule netlists are stitched in.
+    Between retiming iterations only the instances whose mask changed miss the
+    cache and get resynthesized.
+    """
+    def __init__(self, design_files, top_module, cache_dir="./openlane_run/synth_cache", **synth_kwargs):
+        self.design_files = [str(f) for f in design_files]
+        self.top_module = top_module
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.synth_kwargs = {k: v for k, v in synth_kwargs.items() if k not in CONTROLLED_VARIABLES}
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _key(self, synthesis, kind, **identity):
+        config = {k: v for k, v in synthesis.config.items()
+                  if k not in CONTROLLED_VARIABLES and k not in NETLIST_NEUTRAL_VARIABLES}
+        payload = json.dumps({"kind": kind, "identity": identity, "config": config},
+                             cls=GenericDictEncoder, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _make_synthesis(self, **kwargs):
+        Synthesis = Step.factory.get("Yosys.Synthesis")
+        return Synthesis(state_in=State(), **self.synth_kwargs, **kwargs)
+
+    def _cached(self, synthesis, key, design_name, cached_module_name):
+        """
+        Return the cached netlist for key, running the synthesis step on a miss
+        and storing its netlist with the top module renamed to cached_module_name.
+        """
+        cache_path = os.path.join(self.cache_dir, f"{key}.nl.v")
+        if os.path.exists(cache_path):
+            self.hits += 1
+            return cache_path
+        self.misses += 1
+        synthesis.start()
+        netlist = str(synthesis.state_out[DesignFormat.NETLIST])
+        with open(netlist, 'r') as f:
+            content = f.read()
+        if cached_module_name != design_name:
+            content = re.sub(rf"^module\s+{re.escape(design_name)}\s*\(", f"module {cached_module_name}(",
+                             content, count=1, flags=re.MULTILINE)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+        os.replace(tmp_path, cache_path)
+        return cache_path
+
+    def run(self, netlist, design_files=None):
+        """
+        :param netlist: NetlistIndex of the current elaborated (raw) netlist.
+        :param design_files: The design files of this iteration (e.g. rendered
+            by a MaskTable), if they differ from the ones given at construction.
+        :returns: A State whose NETLIST view is the stitched netlist, or None if
+            the design cannot be split (e.g. the top file also defines a
+            pipelined module) and a full synthesis is needed instead.
+        """
+        self.hits = 0
+        self.misses = 0
+        if design_files is not None:
+            self.design_files = [str(f) for f in design_files]
+        pipelined_modules = {info.module for info in netlist.instances.values()}
+        top_files = [f for f in self.design_files if defines_module(f, self.top_module)]
+        model_files = [f for f in self.design_files if any(defines_module(f, m) for m in pipelined_modules)]
+        if not pipelined_modules or not top_files or set(top_files) & set(model_files):
+            return None
+        top_level_files = [f for f in self.design_files if f not in model_files]
+        sources_digest = normalized_source_digest(self.design_files)
+
+        # 1. One synthesis per distinct (module, parameters, mask)
+        instance_modules = {}
+        submodule_netlists = {}
+        for instance_name, info in sorted(netlist.instances.items()):
+            synthesis = self._make_synthesis(
+                DESIGN_NAME=info.module,
+                VERILOG_FILES=self.design_files,
+                SYNTH_PARAMETERS=[f"{name}={format_parameter(value)}" for name, value in info.parameters],
+                SYNTH_HIERARCHY_MODE="flatten",
+            )
+            key = self._key(synthesis, "module", module=info.module, parameters=info.parameters,
+                            mask=info.pipeline_mask, sources=sources_digest)
+            cached_module_name = f"{info.module}__{key[:16]}"
+            submodule_netlists[cached_module_name] = self._cached(synthesis, key, info.module, cached_module_name)
+            instance_modules[instance_name] = (info.module, cached_module_name)
+
+        # 2. The top level, with the pipelined modules as black boxes
+        synthesis = self._make_synthesis(
+            DESIGN_NAME=self.top_module,
+            VERILOG_FILES=top_level_files,
+            EXTRA_VERILOG_MODELS=model_files,
+            SYNTH_HIERARCHY_MODE="keep",
+        )
+        top_key = self._key(synthesis, "top", top=self.top_module, sources=normalized_source_digest(top_level_files + model_files))
+        top_netlist = self._cached(synthesis, top_key, self.top_module, self.top_module)
+
+        # 3. Stitch: point every black-box instance at its cached netlist
+        print(f"Incremental synthesis: {self.hits} cached, {self.misses} synthesized")
+        return State(overrides={DesignFormat.NETLIST: Path(self.stitch(top_netlist, instance_modules, submodule_netlists))})
+
+    def stitch(self, top_netlist, instance_modules, submodule_netlists):
+        with open(top_netlist, 'r') as f:
+            top = f.read()
+        for instance_name, (module, cached_module_name) in instance_modules.items():
+            escaped = re.escape(instance_name)
+            top = re.sub(rf"^\s*defparam\s+\\?{escaped}\s*\.\S+\s*=.*?;\s*$\n?", "", top, flags=re.MULTILINE)
+            top = re.sub(rf"^(\s*){re.escape(module)}(\s+\\?{escaped}\s*\()", rf"\g<1>{cached_module_name}\g<2>",
+                         top, count=1, flags=re.MULTILINE)
+
+        digest = hashlib.sha256(top.encode())
+        for cached_module_name in sorted(submodule_netlists):
+            digest.update(cached_module_name.encode())
+        stitched_dir = os.path.join(self.cache_dir, "stitched")
+        os.makedirs(stitched_dir, exist_ok=True)
+        stitched_path = os.path.join(stitched_dir, f"{self.top_module}.{digest.hexdigest()[:16]}.nl.v")
+        if not os.path.exists(stitched_path):
+            with open(f"{stitched_path}.tmp", 'w') as out:
+                for cached_module_name in sorted(submodule_netlists):
+                    with open(submodule_netlists[cached_module_name], 'r') as f:
+                        shutil.copyfileobj(f, out)
+                    out.write("\n")
+                out.write(top)
+            os.replace(f"{stitched_path}.tmp", stitched_path)
+        return stitched_path
@@ -1,7 +1,35 @@
 import re
 
 
+PIPELINE_STAGE_PATTERNS = [
+    re.compile(r'(.*?)\.([^.]+)_pipeline_stage\[(\d+)\]'),
+    re.compile(r'(.*?)/([^.]+)_pipeline_stage\[(\d+)\]')
+]
+
+
+def parse_point(string, startpoint=False):
+    """
+    Split a timing path start/endpoint name into (module, instance_name, pipeline_stage).
+    Ports map to INPUT/OUTPUT and anything that is not a pipeline stage to REGISTER.
+    """
+    for pattern in PIPELINE_STAGE_PATTERNS:
+        match = pattern.search(string)
+        if match:
+            instance_name, module, stage = match.groups()
+            return module, instance_name, int(stage)
+
+    if startpoint and string == "INPUT":
+        return "INPUT", "INPUT", None
+    elif not startpoint and string == "OUTPUT":
+        return "OUTPUT", "OUTPUT", None
+    else:
+        return "REGISTER", "REGISTER", None
+
+
 class InstanceDetails:
+    __slots__ = ("module", "instance_name", "pipeline_stage", "pipeline_mask",
+                 "num_pipeline_stages", "instance_id", "num_enabled_pipeline_stages")
+
     def __init__(self, string, startpoint=True):
         self.module, self.instance_name, self.pipeline_stage = self.pattern_match(string, startpoint)
         self.pipeline_mask = None
@@ -9,34 +37,34 @@ class InstanceDetails:
         self.instance_id = None
         self.num_enabled_pipeline_stages = None
 
+    @classmethod
+    def from_parts(cls, module, instance_name, pipeline_stage):
+        """Create an InstanceDetails from an already parsed (module, instance_name, pipeline_stage)."""
+        details = cls.__new__(cls)
+        details.module = module
+        details.instance_name = instance_name
+        details.pipeline_stage = pipeline_stage
+        details.pipeline_mask = None
+        details.num_pipeline_stages = None
+        details.instance_id = None
+        details.num_enabled_pipeline_stages = None
+        return details
+
     def pattern_match(self, string, startpoint=False):
-        patterns = [
-            r'(.*?)\.([^.]+)_pipeline_stage\[(\d+)\]',
-            r'(.*?)/([^.]+)_pipeline_stage\[(\d+)\]'
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, string)
-            if match:
-                instance_name, module, stage = match.groups()
-                return module, instance_name, int(stage)
-
-        if startpoint and string == "INPUT":
-            return "INPUT", "INPUT", None
-        elif not startpoint and string == "OUTPUT":
-            return "OUTPUT", "OUTPUT", None
-        else:
-            return "REGISTER", "REGISTER", None
-    
+        return parse_point(string, startpoint)
+
     def __repr__(self):
         return f"""InstanceDetails(module={self.module}, instance_name={self.instance_name}, instance_id={self.instance_id}, num_pipeline_stages={self.num_pipeline_stages}, pipeline_stage={self.pipeline_stage}, pipeline_mask={self.pipeline_mask}, num_enabled_pipeline_stages={self.num_enabled_pipeline_stages})"""
 
+    def _key(self):
+        return tuple(getattr(self, attr) for attr in self.__slots__)
+
     # Added for hashability and equality
     def __eq__(self, other):
         if not isinstance(other, InstanceDetails):
             return False
-        return self.__dict__ == other.__dict__
+        return self._key() == other._key()
 
     def __hash__(self):
-        # Convert to a tuple of key-value pairs sorted for consistent hashing
-        return hash(tuple(sorted(self.__dict__.items())))
\ No newline at end of file
+        return hash(self._key())
+
@@ -0,0 +1,106 @@
+import os
+import re
+
+
+MODULE_PATTERN = re.compile(r"^\s*module\s+(\w+)\b.*?^\s*endmodule\b", re.MULTILINE | re.DOTALL)
+MASK_LOCALPARAM_PATTERN = re.compile(r"(localparam\s+PIPELINE_STAGE_MASK\s*=\s*)(.*?)(\s*;)", re.DOTALL)
+
+
+class MaskTable:
+    """
+    In-memory table of per-instance pipeline masks, keyed by (module, INSTANCE_ID).
+
+    The design files are read once and never modified. render() writes copies
+    in which the PIPELINE_STAGE_MASK localparam of every module with entries
+    is replaced by a single lookup on INSTANCE_ID, generated from the table.
+    The lookup has one branch per overridden instance, so its size does not
+    depend on how many iterations changed the masks.
+    """
+    def __init__(self, design_files, masks=None):
+        self.design_files = [str(f) for f in design_files]
+        self.masks = dict(masks or {})  # (module, instance_id) -> mask, highest stage first
+        self.sources = {}
+        self.module_files = {}
+        for file in self.design_files:
+            with open(file, 'r') as f:
+                self.sources[file] = f.read()
+            for match in MODULE_PATTERN.finditer(self.sources[file]):
+                self.module_files.setdefault(match.group(1), file)
+
+    def copy(self):
+        table = MaskTable.__new__(MaskTable)
+        table.design_files = self.design_files
+        table.masks = dict(self.masks)
+        table.sources = self.sources
+        table.module_files = self.module_files
+        return table
+
+    def set(self, module, instance_id, mask):
+        if module not in self.module_files:
+            raise KeyError(f"Module {module} is not defined in the design files")
+        self.masks[(module, instance_id)] = mask
+
+    def apply(self, moves, netlist):
+        """
+        Record mask moves.
+        :param moves: MaskMove list, as returned by plan_mask_changes.
+        :param netlist: NetlistIndex the moves were planned on, used to find
+            the RTL module of every moved instance.
+        """
+        for move in moves:
+            self.set(netlist[move.instance_name].module, move.instance_id, move.new_mask)
+
+    def with_moves(self, moves, netlist):
+        table = self.copy()
+        table.apply(moves, netlist)
+        return table
+
+    def _render_module(self, module, body):
+        masks = sorted((instance_id, mask) for (m, instance_id), mask in self.masks.items() if m == module)
+        if not masks:
+            return body
+
+        def lookup(match):
+            branches = "".join(f"(INSTANCE_ID == {instance_id}) ? {len(mask)}'b{mask} : " for instance_id, mask in masks)
+            return f"{match.group(1)}{branches}{match.group(2).strip()}{match.group(3)}"
+
+        rendered, count = MASK_LOCALPARAM_PATTERN.subn(lookup, body, count=1)
+        if count == 0:
+            raise ValueError(f"PIPELINE_STAGE_MASK not found in module {module}")
+        return rendered
+
+    def render_source(self, file):
+        return MODULE_PATTERN.sub(lambda match: self._render_module(match.group(1), match.group(0)), self.sources[file])
+
+    def render(self, directory):
+        """
+        Write the design files with the table's masks applied into directory.
+        Files that are already up to date are not rewritten.
+        :returns: The rendered files, in the order of the design files.
+        """
+        os.makedirs(directory, exist_ok=True)
+        names = [os.path.basename(file) for file in self.design_files]
+        files = []
+        for i, file in enumerate(self.design_files):
+            # Prefix with the index only if two design files share a name
+            name = names[i] if names.count(names[i]) == 1 else f"{i}-{names[i]}"
+            target = os.path.join(directory, name)
+            content = self.render_source(file)
+            if os.path.exists(target):
+                with open(target, 'r') as f:
+                    if f.read() == content:
+                        files.append(target)
+                        continue
+            with open(target, 'w') as f:
+                f.write(content)
+            files.append(target)
+        return files
+
+    def to_dict(self):
+        return {module: {str(instance_id): mask for (m, instance_id), mask in sorted(self.masks.items()) if m == module}
+                for module in sorted({module for module, _ in self.masks})}
+
+    @classmethod
+    def from_dict(cls, design_files, masks):
+        return cls(design_files, {(module, int(instance_id)): mask
+                                  for module, instances in masks.items() for instance_id, mask in instances.items()})
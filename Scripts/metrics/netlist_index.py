@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import re
+from typing import NamedTuple
+
+try:
+    import ijson
+except ImportError:  # Optional: falls back to loading the whole JSON at once
+    ijson = None
+
+
+PIPELINE_PARAMETERS = ("DATAWIDTH", "INSTANCE_ID", "NUM_PIPELINE_STAGES")
+STAGE_INDEX_PATTERN = re.compile(r'\[(\d+)\]')
+
+
+class PipelineInstance(NamedTuple):
+    datawidth: int
+    instance_id: int
+    num_pipeline_stages: int
+    pipeline_mask: str  # enabled-stage mask, highest stage first
+    module: str = ""  # RTL module name, without the $paramod prefix
+    parameters: tuple = ()  # sorted (name, value) parameter overrides of the instance
+
+
+def base_module_name(module_type):
+    """
+    Recover the RTL module name from a Yosys derived module name, e.g.
+    "$paramod$8c3f...\\array_multiplier" or "$paramod\\pipeline_stage\\WIDTH=1".
+    """
+    if not module_type.startswith("$paramod"):
+        return module_type.lstrip("\\")
+    rest = module_type[len("$paramod"):]
+    if rest.startswith("$"):
+        return rest.split("\\", 1)[1]
+    return rest.split("\\")[1]
+
+
+def parameter_value(value):
+    """Convert a Yosys JSON parameter value to an int, or a string for string parameters."""
+    if isinstance(value, int):
+        return value
+    if value and all(c in "01" for c in value):
+        return int(value, 2)
+    # Yosys pads string parameters that look like bit strings with a space
+    return value[:-1] if value.endswith(" ") else value
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _iter_modules(netlist_json):
+    """
+    Yield (module_name, module) pairs of a Yosys JSON netlist. With ijson
+    installed only one module is held in memory at a time.
+    """
+    with open(netlist_json, 'rb') as f:
+        if ijson is not None:
+            yield from ijson.kvitems(f, 'modules')
+        else:
+            yield from json.load(f)["modules"].items()
+
+
+def _pipeline_instance(module_name, module):
+    parameters = module.get("parameter_default_values", {})
+    if not all(parameter in parameters for parameter in PIPELINE_PARAMETERS):
+        return None
+    datawidth, instance_id, num_pipeline_stages = (int(parameters[parameter], 2) for parameter in PIPELINE_PARAMETERS)
+
+    pipeline_mask = {}
+    for key, cell in module.get("cells", {}).items():
+        if "_pipeline_stage" in key and "ENABLE" in cell["type"]:
+            idx = num_pipeline_stages - 1 - int(STAGE_INDEX_PATTERN.findall(key)[0])
+            pipeline_mask[idx] = cell["type"][-1]
+
+    mask = "".join(pipeline_mask[key] for key in sorted(pipeline_mask))
+    overrides = tuple(sorted((name, parameter_value(value)) for name, value in parameters.items()))
+    return PipelineInstance(datawidth, instance_id, num_pipeline_stages, mask, base_module_name(module_name), overrides)
+
+
+class NetlistIndex:
+    """
+    Index of the pipelined instances of an elaborated (raw) Yosys netlist.
+
+    The JSON is read once and every instance of the top module is mapped to
+    its PipelineInstance, so lookups are O(1). Use NetlistIndex.load() to get
+    an index that is only rebuilt when the netlist file content changes.
+    """
+    _cache = {}  # (abspath, top_module) -> ((mtime_ns, size), digest, NetlistIndex)
+
+    def __init__(self, netlist_json, top_module="top", digest=None):
+        self.netlist_json = netlist_json
+        self.top_module = top_module
+        self.digest = digest or file_digest(netlist_json)
+        self.instances = {}
+
+        instance_types = {}
+        module_info = {}
+        for module_name, module in _iter_modules(netlist_json):
+            if module_name == top_module:
+                instance_types = {name: cell["type"] for name, cell in module.get("cells", {}).items()}
+            info = _pipeline_instance(module_name, module)
+            if info is not None:
+                module_info[module_name] = info
+
+        for instance_name, module_type in instance_types.items():
+            if module_type in module_info:
+                self.instances[instance_name] = module_info[module_type]
+
+    @classmethod
+    def load(cls, netlist_json, top_module="top"):
+        """
+        Return the index for a netlist, reusing the previous one unless the
+        file's content hash changed. The hash is only recomputed when the
+        file's mtime or size differ from the last load.
+        """
+        key = (os.path.abspath(netlist_json), top_module)
+        stat = os.stat(netlist_json)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = cls._cache.get(key)
+        if cached is not None:
+            cached_signature, cached_digest, index = cached
+            if cached_signature == signature:
+                return index
+            digest = file_digest(netlist_json)
+            if digest == cached_digest:
+                cls._cache[key] = (signature, digest, index)
+                return index
+        else:
+            digest = file_digest(netlist_json)
+
+        index = cls(netlist_json, top_module, digest)
+        cls._cache[key] = (signature, digest, index)
+        return index
+
+    def __getitem__(self, instance_name):
+        return self.instances[instance_name]
+
+    def __contains__(self, instance_name):
+        return instance_name in self.instances
+
+    def __len__(self):
+        return len(self.instances)
+
+    def find_pipeline_stage(self, instance_name):
+        """
+        Returns (mask length, pipeline mask, instance id, NUM_PIPELINE_STAGES) for an instance.
+        """
+        info = self.instances[instance_name]
+        return len(info.pipeline_mask), info.pipeline_mask, info.instance_id, info.num_pipeline_stages
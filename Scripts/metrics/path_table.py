@@ -0,0 +1,253 @@
+from array import array
+
+import numpy as np
+
+from metrics.instance_details import InstanceDetails, parse_point
+from metrics.timing_rpt_parser import iter_timing_paths
+
+
+NO_STAGE = -1
+
+PATH_DTYPE = np.dtype([
+    ('start_module', np.int32),     # index into PathTable.names
+    ('start_instance', np.int32),   # index into PathTable.names
+    ('start_stage', np.int16),      # NO_STAGE for INPUT/REGISTER
+    ('end_module', np.int32),
+    ('end_instance', np.int32),
+    ('end_stage', np.int16),        # NO_STAGE for OUTPUT/REGISTER
+    ('slack', np.float64),          # NaN if the report had no slack line
+    ('violated', np.bool_),
+])
+
+CROSSING_DTYPE = np.dtype([
+    ('path', np.int32),             # row of the path in PathTable.rows
+    ('module', np.int32),           # index into PathTable.names
+    ('instance', np.int32),         # index into PathTable.names
+    ('stage', np.int16),
+    ('arrival', np.float32),        # arrival time at the stage boundary, in ns
+])
+
+STARTPOINT_FIELDS = ('start_module', 'start_instance', 'start_stage')
+ENDPOINT_FIELDS = ('end_module', 'end_instance', 'end_stage')
+POINT_FIELDS = STARTPOINT_FIELDS + ENDPOINT_FIELDS
+
+
+class NameTable:
+    """
+    Interns module/instance names so each distinct string is stored once and
+    paths only hold small integer ids.
+    """
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+
+    def intern(self, name):
+        name_id = self.ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.ids[name] = name_id
+            self.names.append(name)
+        return name_id
+
+    def __getitem__(self, name_id):
+        return self.names[name_id]
+
+    def __len__(self):
+        return len(self.names)
+
+
+class PathTable:
+    """
+    Columnar store for parsed STA paths.
+
+    Every path is one row of a NumPy structured array (see PATH_DTYPE). Start
+    and end points are parsed once per distinct report name, so reports with
+    around 10^6 paths do not pay two regex searches per InstanceDetails.
+
+    If the paths were parsed with crossings, the pipeline stage boundaries
+    each path passes through are kept in a second array (see CROSSING_DTYPE),
+    ordered by path and then by arrival.
+    """
+    def __init__(self, rows, names, crossings=None):
+        self.rows = rows
+        self.names = names
+        self.crossings = crossings if crossings is not None else np.empty(0, dtype=CROSSING_DTYPE)
+
+    @classmethod
+    def from_paths(cls, paths):
+        """
+        Build a table from an iterable of path dicts as produced by
+        iter_timing_paths / TimingRptParser.get_paths().
+        """
+        names = NameTable()
+        parsed = ({}, {})  # endpoint cache, startpoint cache
+        columns = {field: array('i') for field in POINT_FIELDS}
+        slacks = array('d')
+        crossing_columns = {'path': array('i'), 'module': array('i'), 'instance': array('i'), 'stage': array('i'), 'arrival': array('d')}
+        boundaries = {}
+
+        def parse(string, startpoint):
+            cache = parsed[startpoint]
+            point = cache.get(string)
+            if point is None:
+                module, instance_name, stage = parse_point(string, startpoint)
+                point = (names.intern(module), names.intern(instance_name), NO_STAGE if stage is None else stage)
+                cache[string] = point
+            return point
+
+        for path in paths:
+            for fields, string, startpoint in ((STARTPOINT_FIELDS, path['startpoint'], True),
+                                               (ENDPOINT_FIELDS, path['endpoint'], False)):
+                for field, value in zip(fields, parse(string, startpoint)):
+                    columns[field].append(value)
+            for boundary, arrival in path.get('crossings', ()):
+                point = boundaries.get(boundary)
+                if point is None:
+                    module, instance_name, stage = parse_point(boundary)
+                    point = boundaries[boundary] = (names.intern(module), names.intern(instance_name), stage)
+                crossing_columns['path'].append(len(slacks))
+                for field, value in zip(('module', 'instance', 'stage'), point):
+                    crossing_columns[field].append(value)
+                crossing_columns['arrival'].append(arrival)
+            slack = path['slack']
+            slacks.append(float('nan') if slack is None else slack)
+
+        rows = np.empty(len(slacks), dtype=PATH_DTYPE)
+        for field, values in columns.items():
+            rows[field] = np.frombuffer(values, dtype=np.int32) if len(values) else 0
+        rows['slack'] = np.frombuffer(slacks, dtype=np.float64) if len(slacks) else 0.0
+        # NaN < 0 is False, matching "violated" for paths without slack
+        rows['violated'] = rows['slack'] < 0
+
+        crossings = np.empty(len(crossing_columns['path']), dtype=CROSSING_DTYPE)
+        for field, values in crossing_columns.items():
+            if len(values):
+                crossings[field] = np.frombuffer(values, dtype=np.float64 if field == 'arrival' else np.int32)
+        return cls(rows, names, crossings)
+
+    @classmethod
+    def from_reports(cls, timing_rpt, max_paths=None, crossings=False):
+        """
+        Stream report files straight into a table without materializing the
+        intermediate list of path dicts.
+        :param crossings: Also keep the pipeline stage boundary arrival times.
+        """
+        return cls.from_paths(iter_timing_paths(timing_rpt, max_paths, crossings))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def name_id(self, name):
+        """Id of an interned name, or -1 if it never appears in the table."""
+        return self.names.ids.get(name, -1)
+
+    def filter(self, mask):
+        """Return a new table with the rows selected by a boolean mask or index array."""
+        if len(self.crossings) == 0:
+            return PathTable(self.rows[mask], self.names)
+        selected = np.arange(len(self.rows))[mask]
+        new_index = np.full(len(self.rows), -1, dtype=np.int32)
+        new_index[selected] = np.arange(len(selected), dtype=np.int32)
+        crossings = self.crossings[new_index[self.crossings['path']] >= 0]
+        crossings['path'] = new_index[crossings['path']]
+        crossings = crossings[np.argsort(crossings['path'], kind='stable')]
+        return PathTable(self.rows[mask], self.names, crossings)
+
+    def module_is(self, module, startpoint=True):
+        """Boolean mask of rows whose start (or end) point is of the given module."""
+        field = 'start_module' if startpoint else 'end_module'
+        return self.rows[field] == self.name_id(module)
+
+    def violated(self):
+        return self.filter(self.rows['violated'])
+
+    def sort_by_slack(self):
+        return self.filter(np.argsort(self.rows['slack'], kind='stable'))
+
+    def group_by(self, fields=POINT_FIELDS):
+        """
+        Group rows by the given fields.
+        :returns: (keys, inverse) where keys holds one row of the grouped fields
+            per group and inverse maps every row to its group index.
+        """
+        keys, inverse = np.unique(self.rows[list(fields)], return_inverse=True)
+        return keys, inverse.reshape(-1)
+
+    def group_min_slack(self, fields=POINT_FIELDS):
+        """
+        :returns: (keys, min_slack) with the lowest slack of every group.
+        """
+        keys, inverse = self.group_by(fields)
+        min_slack = np.full(len(keys), np.inf)
+        np.minimum.at(min_slack, inverse, self.rows['slack'])
+        return keys, min_slack
+
+    def dedup_min_slack(self, fields=POINT_FIELDS):
+        """
+        Keep only the lowest-slack row for every distinct combination of the
+        given fields. Groups are returned in order of their first appearance.
+        """
+        if len(self.rows) == 0:
+            return self.filter(slice(None))
+        order = np.lexsort((self.rows['slack'],) + tuple(self.rows[field] for field in reversed(fields)))
+        ordered = self.rows[order]
+        keys = ordered[list(fields)]
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        first_seen = np.minimum.reduceat(order, starts)
+        return self.filter(order[starts][np.argsort(first_seen, kind='stable')])
+
+    def point(self, row, startpoint=True):
+        """(module, instance_name, pipeline_stage) of a row's start (or end) point."""
+        fields = STARTPOINT_FIELDS if startpoint else ENDPOINT_FIELDS
+        module, instance, stage = (row[field] for field in fields)
+        return self.names[module], self.names[instance], None if stage == NO_STAGE else int(stage)
+
+    def crossings_of(self, index):
+        """(module, instance_name, stage, arrival) of every stage boundary crossed by a row, in path order."""
+        first, last = np.searchsorted(self.crossings['path'], [index, index + 1])
+        return [(self.names[c['module']], self.names[c['instance']], int(c['stage']), float(c['arrival']))
+                for c in self.crossings[first:last]]
+
+    def segments(self, clock_period):
+        """
+        Split every path with a slack at the stage boundaries it crosses.
+
+        The delay of a path is clock_period - slack. The segment up to the
+        first boundary gets its arrival there, each following segment the
+        difference of consecutive arrivals, and the last one the rest, so the
+        segments of a path add up to its delay. Boundaries of the path's own
+        start and end stages (clock and data pins of its registers) are skipped.
+        :returns: List of (row index, start, end, delay) where start and end
+            are (module, instance_name, pipeline_stage) as returned by point().
+        """
+        segments = []
+        for index, row in enumerate(self.rows):
+            slack = float(row['slack'])
+            if np.isnan(slack):
+                continue
+            start, end = self.point(row, startpoint=True), self.point(row, startpoint=False)
+            previous, previous_arrival = start, 0.0
+            for module, instance_name, stage, arrival in self.crossings_of(index):
+                if (instance_name, stage) in (start[1:], end[1:]):
+                    continue
+                point = (module, instance_name, stage)
+                segments.append((index, previous, point, arrival - previous_arrival))
+                previous, previous_arrival = point, arrival
+            segments.append((index, previous, end, float(clock_period) - slack - previous_arrival))
+        return segments
+
+    def to_instance_details(self):
+        """
+        Materialize the rows in the format of TimingRptParser.get_instance_details().
+        Intended for small (e.g. deduplicated) tables only.
+        """
+        instance_details = []
+        for row in self.rows:
+            slack = float(row['slack'])
+            instance_details.append({
+                "startpoint": InstanceDetails.from_parts(*self.point(row, startpoint=True)),
+                "endpoint": InstanceDetails.from_parts(*self.point(row, startpoint=False)),
+                "slack": None if np.isnan(slack) else slack,
+                "violated": bool(row['violated']),
+            })
+        return instance_details
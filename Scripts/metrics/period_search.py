@@ -0,0 +1,103 @@
+import json
+
+
+class PeriodSearch:
+    """
+    Brackets and bisects the smallest clock period at which retiming passes.
+
+    Starting from the first period tried, the period moves up (after a
+    failure) or down (after a pass) by a step that doubles every time, until
+    a failing and a passing period bracket the minimum. The bracket is then
+    halved until it is narrower than tolerance. Every new period starts from
+    the masks of the passing bound, or of the last attempt if nothing has
+    passed yet, so the retiming at neighbouring periods only has to adjust
+    an existing solution.
+    """
+    def __init__(self, step, tolerance, min_period=0.0):
+        self.step = float(step)
+        self.tolerance = float(tolerance)
+        self.min_period = float(min_period)
+        self.attempts = []  # {"period", "passed", "wns", "runs", "masks"}, in the order they were tried
+
+    @property
+    def lower(self):
+        """Highest failing period below the lowest passing one, or None."""
+        upper = self.upper
+        failed = [a["period"] for a in self.attempts if not a["passed"] and (upper is None or a["period"] < upper)]
+        return max(failed, default=None)
+
+    @property
+    def upper(self):
+        """Lowest passing period, or None."""
+        return min((a["period"] for a in self.attempts if a["passed"]), default=None)
+
+    def record(self, period, passed, masks, wns=None, runs=0):
+        """
+        :param period: Clock period of the attempt, in ns.
+        :param passed: Whether retiming met timing at this period.
+        :param masks: MaskTable.to_dict() at the end of the attempt.
+        :param wns: Worst setup slack of the last STA run of the attempt.
+        :param runs: Number of synthesis + STA runs the attempt took.
+        """
+        self.attempts.append({"period": float(period), "passed": bool(passed), "wns": wns, "runs": runs,
+                              "masks": masks})
+
+    def next_period(self):
+        """
+        :returns: The next period to try, or None once the bracket is within tolerance.
+        """
+        lower, upper = self.lower, self.upper
+        last = self.attempts[-1]["period"]
+        if upper is None:
+            period = last + self.step
+            self.step *= 2
+        elif lower is None:
+            period = upper - self.step
+            self.step *= 2
+            if period <= self.min_period:
+                lower = self.min_period
+        if lower is not None and upper is not None:
+            if upper - lower <= self.tolerance:
+                return None
+            period = (lower + upper) / 2
+        return round(period, 3)
+
+    def warm_start(self):
+        """Masks to start the next period from (MaskTable.to_dict() format)."""
+        upper = self.upper
+        for attempt in reversed(self.attempts):
+            if upper is None or attempt["period"] == upper:
+                return attempt["masks"]
+        return {}
+
+    def curve(self):
+        """(period, passed, wns, runs) of every attempt, by period."""
+        return sorted((a["period"], a["passed"], a["wns"], a["runs"]) for a in self.attempts)
+
+    def print_curve(self):
+        print("============================================================")
+        print("Period search (Fmax curve)")
+        print(f"{'Period (ns)':>12} {'Fmax (MHz)':>11} {'Result':>7} {'WNS (ns)':>9} {'Runs':>5}")
+        for period, passed, wns, runs in self.curve():
+            wns = "-" if wns is None else f"{wns:.3f}"
+            print(f"{period:>12.3f} {1000 / period:>11.1f} {'pass' if passed else 'fail':>7} {wns:>9} {runs:>5}")
+        total = sum(a["runs"] for a in self.attempts)
+        if self.upper is None:
+            print(f"No period passed; {total} synthesis + STA runs.")
+        else:
+            print(f"Minimum period {self.upper:.3f} ns ({1000 / self.upper:.1f} MHz) after {total} synthesis + STA runs.")
+        print("============================================================")
+
+    def to_dict(self):
+        return {"step": self.step, "tolerance": self.tolerance, "min_period": self.min_period,
+                "attempts": self.attempts}
+
+    @classmethod
+    def from_dict(cls, data):
+        search = cls(data["step"], data["tolerance"], data["min_period"])
+        search.attempts = list(data["attempts"])
+        return search
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=4)
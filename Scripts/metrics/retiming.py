@@ -0,0 +1,324 @@
+import hashlib
+import json
+import os
+import random
+
+from metrics.candidate_evaluation import Candidate, MaskMove
+from metrics.instance_details import InstanceDetails
+from metrics.path_table import PathTable
+from metrics.timing_rpt_parser import ENDPOINT_SLACK_SUFFIXES
+
+
+def shift_pipeline_bit(pipeline_mask, pipeline_stage, left):
+    """
+    Helper function to move the '1' bit from 'from_stage' to 'to_stage' in
+    a pipeline mask string. Assumes leftmost bit = highest stage, rightmost bit = stage 0.
+    Args:
+        pipeline_mask: The pipeline mask string (e.g., "100110")
+        pipeline_stage: The stage to move the '1' bit from (0-indexed)
+        left: Boolean indicating the direction to move the bit.
+            If True, move left (to a higher stage); if False, move right (to a lower stage).
+    Returns:
+        Updated pipeline mask string with the '1' bit moved
+        and a boolean indicating if the operation was successful.
+    """
+    if pipeline_stage is None:
+        return pipeline_mask, False
+
+    bits = list(pipeline_mask)
+    curr_idx = len(bits) - 1 - pipeline_stage
+
+    if left:
+        new_stage = pipeline_stage + 1
+    else:
+        new_stage = pipeline_stage - 1
+        
+    new_idx = len(bits) - 1 - new_stage
+
+    # If either index is out of range, do nothing
+    if not (0 <= curr_idx < len(bits)) or not (0 <= new_idx < len(bits)):
+        return pipeline_mask, False
+    # Move the '1' bit only if current bit is '1' and target bit is '0'
+    if bits[curr_idx] == '1' and bits[new_idx] == '0':
+        bits[curr_idx] = '0'
+        bits[new_idx] = '1'
+        return "".join(bits), True
+    return pipeline_mask, False
+
+
+def generate_pipeline_mask(startpoint: InstanceDetails, endpoint: InstanceDetails, pipeline_details: list, telemetry: dict, data_hash: str,
+                           no_slack_assumption: bool = False):
+    """
+    Generate pipeline mask based on the timing path between startpoint and endpoint.
+    
+    Args:
+        startpoint: InstanceDetails object for the startpoint
+        endpoint: InstanceDetails object for the endpoint
+        pipeline_details: List of pipeline details contatining all startpoint and endpoints
+        no_slack_assumption: For register to register paths, always try the startpoint first instead of
+            moving the side whose other path has more slack
+    Returns:
+        Updated pipeline masks for both startpoint and endpoint instances
+    """
+    #  INPUT to REGISTER
+    if startpoint.module == "INPUT":
+        pipeline_mask, success = shift_pipeline_bit(endpoint.pipeline_mask, endpoint.pipeline_stage, left=False)
+        if success:
+            return None, None, pipeline_mask, endpoint.pipeline_stage - 1
+        else:
+            print("Warning: Unable to shift pipeline bit.")
+            return None, None, endpoint.pipeline_mask, endpoint.pipeline_stage
+    #  REGISTER to OUTPUT
+    elif endpoint.module == "OUTPUT":
+        pipeline_mask, success = shift_pipeline_bit(startpoint.pipeline_mask, startpoint.pipeline_stage, left=True)
+        if success:
+            return pipeline_mask, startpoint.pipeline_stage + 1, None, None
+        else:
+            print("Warning: Unable to shift pipeline bit.")
+            return startpoint.pipeline_mask, startpoint.pipeline_stage, None, None
+    #  REGISTER to REGISTER
+    if data_hash in telemetry["attempted_pipeline_combinations"] :
+        random_bit = random.randint(0, 1)
+        if random_bit == 0:
+            pipeline_mask, success = shift_pipeline_bit(startpoint.pipeline_mask, startpoint.pipeline_stage, left=True)
+            if success:
+                return pipeline_mask, startpoint.pipeline_stage + 1, endpoint.pipeline_mask, endpoint.pipeline_stage
+            else:
+                print("Warning: Unable to shift pipeline bit left. Trying to shift right.")
+                pipeline_mask, success = shift_pipeline_bit(endpoint.pipeline_mask, endpoint.pipeline_stage, left=False)
+                if success:
+                    return startpoint.pipeline_mask, startpoint.pipeline_stage, pipeline_mask, endpoint.pipeline_stage - 1
+                else:
+                    print("Warning: Unable to shift pipeline bit.")
+                    return startpoint.pipeline_mask, startpoint.pipeline_stage, endpoint.pipeline_mask, endpoint.pipeline_stage
+        else:
+            pipeline_mask, success = shift_pipeline_bit(endpoint.pipeline_mask, endpoint.pipeline_stage, left=False)
+            if success:
+                return startpoint.pipeline_mask, startpoint.pipeline_stage, pipeline_mask, endpoint.pipeline_stage - 1
+            else:
+                print("Warning: Unable to shift pipeline bit right. Trying to shift left.")
+                pipeline_mask, success = shift_pipeline_bit(startpoint.pipeline_mask, startpoint.pipeline_stage, left=True)
+                if success:
+                    return pipeline_mask, startpoint.pipeline_stage + 1, endpoint.pipeline_mask, endpoint.pipeline_stage
+                else:
+                    print("Warning: Unable to shift pipeline bit.")
+                    return startpoint.pipeline_mask, startpoint.pipeline_stage, endpoint.pipeline_mask, endpoint.pipeline_stage
+    else:
+        if not no_slack_assumption:
+            startpoint_as_endpoint = None
+            endpoint_as_startpoint = None
+            for pipeline in pipeline_details:
+                if startpoint == pipeline["endpoint"]:
+                    startpoint_as_endpoint = pipeline
+                if endpoint == pipeline["startpoint"]:
+                    endpoint_as_startpoint = pipeline
+                if startpoint_as_endpoint != None and endpoint_as_startpoint != None:  
+                    break
+            
+            if startpoint_as_endpoint["slack"] >= endpoint_as_startpoint["slack"]:
+                pipeline_mask, success = shift_pipeline_bit(startpoint.pipeline_mask, startpoint.pipeline_stage, left=True)
+                if success:
+                    return pipeline_mask, startpoint.pipeline_stage + 1, endpoint.pipeline_mask, endpoint.pipeline_stage
+                else:
+                    print("Warning: Unable to shift pipeline bit left. Trying to shift right.")
+                    pipeline_mask, success = shift_pipeline_bit(endpoint.pipeline_mask, endpoint.pipeline_stage, left=False)
+                    if success:
+                        return startpoint.pipeline_mask, startpoint.pipeline_stage, pipeline_mask, endpoint.pipeline_stage - 1
+                    else:
+                        print("Warning: Unable to shift pipeline bit.")
+                        return startpoint.pipeline_mask, startpoint.pipeline_stage, endpoint.pipeline_mask, endpoint.pipeline_stage
+            else:
+                pipeline_mask, success = shift_pipeline_bit(endpoint.pipeline_mask, endpoint.pipeline_stage, left=False)
+                if success:
+                    return startpoint.pipeline_mask, startpoint.pipeline_stage, pipeline_mask, endpoint.pipeline_stage - 1
+                else:
+                    print("Warning: Unable to shift pipeline bit right. Trying to shift left.")
+                    pipeline_mask, success = shift_pipeline_bit(startpoint.pipeline_mask, startpoint.pipeline_stage, left=True)
+                    if success:
+                        return pipeline_mask, startpoint.pipeline_stage + 1, endpoint.pipeline_mask, endpoint.pipeline_stage
+                    else:
+                        print("Warning: Unable to shift pipeline bit.")
+                        return startpoint.pipeline_mask, startpoint.pipeline_stage, endpoint.pipeline_mask, endpoint.pipeline_stage
+        else:
+            pipeline_mask, success = shift_pipeline_bit(startpoint.pipeline_mask, startpoint.pipeline_stage, left=True)
+            if success:
+                return pipeline_mask, startpoint.pipeline_stage + 1, endpoint.pipeline_mask, endpoint.pipeline_stage
+            else:
+                print("Warning: Unable to shift pipeline bit left. Trying to shift right.")
+                pipeline_mask, success = shift_pipeline_bit(endpoint.pipeline_mask, endpoint.pipeline_stage, left=False)
+                if success:
+                    return startpoint.pipeline_mask, startpoint.pipeline_stage, pipeline_mask, endpoint.pipeline_stage - 1
+                else:
+                    print("Warning: Unable to shift pipeline bit.")
+                    return startpoint.pipeline_mask, startpoint.pipeline_stage, endpoint.pipeline_mask, endpoint.pipeline_stage
+
+
+def pipeline_paths(data: PathTable):
+    """
+    Drop paths from/to non-pipeline registers and keep only the lowest slack
+    path for every (startpoint, endpoint) pipeline stage pair.
+
+    Returns:
+        PathTable in order of first appearance
+    """
+    keep = ~(data.module_is("REGISTER", startpoint=True) | data.module_is("REGISTER", startpoint=False))
+    return data.filter(keep).dedup_min_slack()
+
+
+def remove_duplicates_keep_lowest_slack(data: PathTable):
+    """
+    Args:
+        data: PathTable of every parsed path
+    Returns:
+        List of path dicts (see PathTable.to_instance_details) of pipeline_paths(data)
+    """
+    return pipeline_paths(data).to_instance_details()
+
+
+def path_digest(simplified):
+    """
+    Stable digest of a set of paths, including the masks of their end points.
+    Unlike hash(), it is the same across processes, so it can be checkpointed.
+    """
+    digest = hashlib.sha256()
+    for data in simplified:
+        points = [[getattr(data[point], attr) for attr in InstanceDetails.__slots__] for point in ("startpoint", "endpoint")]
+        digest.update(json.dumps([points, data["slack"], data["violated"]]).encode())
+    return digest.hexdigest()
+
+
+def corner_reports(openroad_path, condition):
+    """
+    The path reports of a corner: the endpoint slack report if STA wrote one
+    (STA_ENDPOINT_SLACK_REPORT), otherwise max.rpt and min.rpt.
+    """
+    for suffix in ENDPOINT_SLACK_SUFFIXES:
+        report = f"{openroad_path}/{condition}/endpoint_slack{suffix}"
+        if os.path.exists(report):
+            return [report]
+    return [f"{openroad_path}/{condition}/max.rpt", f"{openroad_path}/{condition}/min.rpt"]
+
+
+def load_path_details(openroad_path, condition, netlist):
+    """
+    Parse the STA reports of a corner into deduplicated pipeline paths, with
+    the mask details of every start- and endpoint filled in from the raw netlist.
+
+    Args:
+        openroad_path: Step directory of the STA run
+        condition: Corner name, e.g. "nom_ss_100C_1v60"
+        netlist: NetlistIndex of the raw netlist the STA run was synthesized from
+    Returns:
+        (simplified, data_hash) where data_hash identifies the set of paths
+    """
+    path_table = PathTable.from_reports(corner_reports(openroad_path, condition))
+    simplified = remove_duplicates_keep_lowest_slack(path_table)
+
+    for i, details in enumerate(simplified):
+        if details["startpoint"].module != "INPUT":
+            details["startpoint"].num_pipeline_stages, details["startpoint"].pipeline_mask, details["startpoint"].instance_id, details["startpoint"].num_enabled_pipeline_stages = netlist.find_pipeline_stage(details["startpoint"].instance_name)
+
+        if details["endpoint"].module != "OUTPUT":
+            details["endpoint"].num_pipeline_stages, details["endpoint"].pipeline_mask, details["endpoint"].instance_id, details["endpoint"].num_enabled_pipeline_stages = netlist.find_pipeline_stage(details["endpoint"].instance_name)
+    data_hash = path_digest(simplified)  # Compare hashs to see if we have tried this already.
+    return simplified, data_hash
+
+
+def check_kill_conditions(simplified, telemetry):
+    """
+    Flag telemetry["kill"] for bad paths (Input to Register that is not closest, Register to Output that is not closest)
+    """
+    for data in simplified:
+        if data["startpoint"].module == "INPUT" and data["endpoint"].module != "OUTPUT":
+            #Input to output path becaause of pipeline stages at top
+            mask = data["endpoint"].pipeline_mask
+            stage = data["endpoint"].pipeline_stage
+            forward = mask[len(mask)-stage:]
+            if "1" in forward:
+                telemetry["kill"] = True
+                print("Kill Condition Met: Input to Register that is not closest")
+        if data["endpoint"].module == "OUTPUT" and data["startpoint"].module != "INPUT": 
+            #Input to output path becaause of pipeline stages at top
+            mask = data["startpoint"].pipeline_mask
+            stage = data["startpoint"].pipeline_stage
+            forward = mask[:len(mask)-stage-1]
+            if "1" in forward:
+                telemetry["kill"] = True 
+                print("Kill Condition Met: Register to Output that is not closest")
+
+
+def print_register_paths(simplified):
+    print("============================================================")
+    print("ALL REGISTER PATHS")
+    print("============================================================")
+    simplified_sorted = sorted(simplified, key=lambda x: x['slack'])
+    for i in (simplified_sorted):
+        print(f"From {i['startpoint'].instance_name} Pipeline stage {i['startpoint'].pipeline_stage} to {i['endpoint'].instance_name} Pipeline stage {i['endpoint'].pipeline_stage} : {i['slack']}")
+    print("============================================================")
+
+
+def plan_mask_changes(violated_paths, simplified, telemetry, data_hash, no_slack_assumption=False):
+    """
+    The mask moves of one iteration: for every violated path (worst first) whose
+    instances were not already changed, the move chosen by generate_pipeline_mask.
+
+    Returns:
+        List of MaskMove
+    """
+    moves = []
+    changed_modules = set()
+    for data in violated_paths:
+        if data['startpoint'].instance_name in changed_modules or data['endpoint'].instance_name in changed_modules:
+            continue
+        pm1, _, pm2, _ = generate_pipeline_mask(data["startpoint"], data["endpoint"], simplified, telemetry, data_hash,
+                                              no_slack_assumption)
+        for details, new_mask in ((data["startpoint"], pm1), (data["endpoint"], pm2)):
+            if new_mask != details.pipeline_mask:
+                moves.append(MaskMove(details.module, details.instance_name, details.instance_id, details.pipeline_mask, new_mask))
+                changed_modules.add(details.instance_name)
+    return moves
+
+
+def print_mask_moves(moves):
+    for move in moves:
+        print(f"{move.instance_name} Pipeline Mask Changed from", move.old_mask[::-1], "to", move.new_mask[::-1])
+
+
+def generate_candidates(violated_paths, simplified, telemetry, data_hash, n_candidates, no_slack_assumption=False):
+    """
+    Up to n_candidates alternative mask moves for one iteration: the combined
+    move of the serial algorithm first, then single-bit moves (startpoint
+    stage shifted left, endpoint stage shifted right) of each violated path,
+    worst path first.
+    """
+    combined = tuple(plan_mask_changes(violated_paths, simplified, telemetry, data_hash, no_slack_assumption))
+    # A candidate without moves would rerun synthesis and STA on an unchanged design
+    candidates = [Candidate("combined", combined)] if combined else []
+    seen = {frozenset(combined)}
+    for data in violated_paths:
+        for details, left in ((data["startpoint"], True), (data["endpoint"], False)):
+            if len(candidates) >= n_candidates:
+                return candidates
+            if details.module in ("INPUT", "OUTPUT", "REGISTER"):
+                continue
+            new_mask, success = shift_pipeline_bit(details.pipeline_mask, details.pipeline_stage, left)
+            if not success:
+                continue
+            moves = (MaskMove(details.module, details.instance_name, details.instance_id, details.pipeline_mask, new_mask),)
+            if frozenset(moves) in seen:
+                continue
+            seen.add(frozenset(moves))
+            direction = "left" if left else "right"
+            candidates.append(Candidate(f"{details.instance_name}.{details.pipeline_stage}.{direction}", moves))
+    return candidates
+
+
+def update_attempted_combinations(temp_telemetry, data_hash):
+    if data_hash in temp_telemetry["attempted_pipeline_combinations"]:
+        if temp_telemetry["kill_count"] >= 5:
+            temp_telemetry["kill"] = True
+            return temp_telemetry
+        temp_telemetry["kill_count"] += 1
+
+    temp_telemetry["attempted_pipeline_combinations"].add(data_hash)     
+    return temp_telemetry
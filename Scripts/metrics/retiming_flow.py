@@ -0,0 +1,313 @@
+import copy
+import json
+import os
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from openlane.common import GenericDictEncoder, Path
+from openlane.config import Variable
+from openlane.flows import Flow, FlowException
+from openlane.logging import info, success, warn
+from openlane.state import DesignFormat, State
+from openlane.steps import OpenROAD, Step, Yosys
+
+from metrics.mask_table import MaskTable
+from metrics.netlist_index import NetlistIndex
+from metrics.period_search import PeriodSearch
+from metrics.path_table import PathTable
+from metrics.retiming import (check_kill_conditions, load_path_details, pipeline_paths, plan_mask_changes,
+                              update_attempted_combinations)
+from metrics.retiming_solver import StageDelayModel, solve_masks, solver_moves
+
+
+def new_telemetry():
+    return {"attempted_pipeline_combinations": set(), "kill_count": 0, "kill": False, "iterations": 0}
+
+
+class Checkpoints:
+    """
+    One JSON file per completed retiming iteration, under <run_dir>/retiming.
+
+    A checkpoint holds the masks, metrics and decision of its iteration and
+    everything the next iteration needs (mask table, clock period and
+    telemetry), so a run can resume right after the last completed iteration.
+    The state the run started from is kept next to them, as every iteration
+    synthesizes from it.
+    """
+    def __init__(self, run_dir):
+        self.dir = os.path.join(run_dir, "retiming")
+        self.checkpoint_dir = os.path.join(self.dir, "checkpoints")
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+
+    def sources_dir(self, iteration):
+        return os.path.join(self.dir, "sources", str(iteration))
+
+    def save(self, checkpoint):
+        path = os.path.join(self.checkpoint_dir, f"{checkpoint['iteration']}.json")
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(checkpoint, f, cls=GenericDictEncoder, indent=4)
+        # Only complete checkpoints are ever visible
+        os.replace(f"{path}.tmp", path)
+
+    def save_initial_state(self, state):
+        path = os.path.join(self.dir, "initial_state.json")
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(state.to_raw_dict(), f, cls=GenericDictEncoder, indent=4)
+        os.replace(f"{path}.tmp", path)
+
+    def initial_state(self):
+        """
+        :returns: The state the run started from, or an empty state for runs
+            checkpointed before it was saved.
+        """
+        path = os.path.join(self.dir, "initial_state.json")
+        if not os.path.exists(path):
+            return State()
+        with open(path, 'r') as f:
+            return State.loads(f.read())
+
+    def latest(self):
+        iterations = [int(name[:-len(".json")]) for name in os.listdir(self.checkpoint_dir)
+                      if name.endswith(".json") and name[:-len(".json")].isdigit()]
+        if not iterations:
+            return None
+        with open(os.path.join(self.checkpoint_dir, f"{max(iterations)}.json"), 'r') as f:
+            checkpoint = json.load(f)
+        if "next" in checkpoint:
+            telemetry = checkpoint["next"]["telemetry"]
+            telemetry["attempted_pipeline_combinations"] = set(telemetry["attempted_pipeline_combinations"])
+        return checkpoint
+
+
+@Flow.factory.register()
+class Retiming(Flow):
+    """
+    Moves enabled pipeline stages of pipelined instances (modules with
+    ``DATAWIDTH``, ``INSTANCE_ID`` and ``NUM_PIPELINE_STAGES`` parameters)
+    along violated paths until STA passes at ``RETIMING_CORNER``.
+
+    Masks are kept in a :class:`MaskTable`; every iteration synthesizes and
+    runs STA on design files rendered from it, and the user's files are never
+    modified. The pipeline masks are read from the elaborated netlist that
+    synthesis writes along the way. Each completed
+    iteration is checkpointed under ``retiming/`` in the run directory, and
+    starting the flow again with the same tag resumes after the last one.
+    Unless ``STA_CACHE_DIR`` is set, STA results are cached in
+    ``retiming/sta_cache``.
+    """
+
+    Steps = [
+        Yosys.Synthesis,
+        OpenROAD.STAPrePNR,
+    ]
+
+    config_vars = [
+        Variable(
+            "RETIMING_ITERATIONS",
+            int,
+            "Maximum number of retiming iterations per clock period.",
+            default=50,
+        ),
+        Variable(
+            "RETIMING_CORNER",
+            str,
+            "The timing corner whose paths are retimed.",
+            default="nom_ss_100C_1v60",
+        ),
+        Variable(
+            "RETIMING_NO_SLACK_ASSUMPTION",
+            bool,
+            "Move register to register paths without comparing the slack of neighbouring paths.",
+            default=False,
+        ),
+        Variable(
+            "RETIMING_SOLVER",
+            bool,
+            "Plan all masks at once with a minimum-period solver on a stage delay model fitted to every STA run so far, instead of moving one stage per violated path.",
+            default=False,
+        ),
+        Variable(
+            "RETIMING_CLOCK_STEP",
+            Optional[Decimal],
+            "If set, the clock period is increased by this amount whenever retiming gets stuck or runs out of iterations. Otherwise, the flow stops. With RETIMING_PERIOD_TOLERANCE, the initial bracketing step of the period search.",
+            units="ns",
+        ),
+        Variable(
+            "RETIMING_PERIOD_TOLERANCE",
+            Optional[Decimal],
+            "If set, search for the minimum clock period instead of stopping at the first one that passes: the period is bracketed with doubling steps and bisected until the minimum is known to within this tolerance. Every period starts from the masks of the nearest passing one. The results are written to retiming/period_search.json.",
+            units="ns",
+        ),
+    ]
+
+    def run(
+        self,
+        initial_state: State,
+        **kwargs,
+    ) -> Tuple[State, List[Step]]:
+        assert self.run_dir is not None
+        step_list: List[Step] = []
+        checkpoints = Checkpoints(self.run_dir)
+        corner = self.config["RETIMING_CORNER"]
+
+        checkpoint = checkpoints.latest()
+        if checkpoint is None:
+            checkpoints.save_initial_state(initial_state)
+            progress = {
+                "iteration": 0,
+                "clock_iteration": 0,
+                "clock_period": str(self.config["CLOCK_PERIOD"]),
+                "mask_table": {},
+                "delay_model": StageDelayModel().to_dict(),
+                "telemetry": new_telemetry(),
+            }
+            if self.config["RETIMING_PERIOD_TOLERANCE"] is not None:
+                progress["period_search"] = PeriodSearch(self.config["RETIMING_CLOCK_STEP"] or 1,
+                                                         self.config["RETIMING_PERIOD_TOLERANCE"]).to_dict()
+        elif checkpoint["decision"] in ("passed", "stopped", "searched"):
+            info(f"Retiming already {checkpoint['decision']} at iteration {checkpoint['iteration']}.")
+            return (initial_state, step_list)
+        else:
+            progress = checkpoint["next"]
+            info(f"Resuming retiming at iteration {progress['iteration']}.")
+            # On a resume, initial_state is the output of the last step, i.e. STA
+            initial_state = checkpoints.initial_state()
+
+        self.progress_bar.set_max_stage_count(self.config["RETIMING_ITERATIONS"])
+
+        # The design files are read once; each iteration renders its masks from the table
+        mask_table = MaskTable.from_dict(self.config["VERILOG_FILES"], progress["mask_table"])
+        # Checkpoints written before the solver existed have no delay model
+        delay_model = StageDelayModel.from_dict(progress["delay_model"]) if "delay_model" in progress else StageDelayModel()
+        period_search = PeriodSearch.from_dict(progress["period_search"]) if "period_search" in progress else None
+        state = initial_state
+        while True:
+            iteration = progress["iteration"]
+            sources = mask_table.render(checkpoints.sources_dir(iteration))
+            config = self.config.copy(
+                VERILOG_FILES=[Path(file) for file in sources],
+                CLOCK_PERIOD=Decimal(progress["clock_period"]),
+                SYNTH_WRITE_ELABORATED_JSON=True,
+                # Iterations that revisit a set of masks reuse their STA results
+                STA_CACHE_DIR=self.config["STA_CACHE_DIR"] or os.path.join(checkpoints.dir, "sta_cache"),
+            )
+            self.progress_bar.start_stage(f"Retiming {iteration}")
+
+            synthesis = Yosys.Synthesis(config, state_in=initial_state)
+            state = self.start_step(synthesis)
+            step_list.append(synthesis)
+
+            sta = OpenROAD.STAPrePNR(config, state_in=state)
+            state = self.start_step(sta)
+            step_list.append(sta)
+
+            self.progress_bar.end_stage()
+
+            netlist = NetlistIndex(str(state[DesignFormat.ELABORATED_JSON]), self.config["DESIGN_NAME"])
+            metrics = {
+                name: state.metrics.get(f"timing__{name}__corner:{corner}")
+                for name in ("setup__ws", "hold__ws", "setup__tns", "hold__tns")
+            }
+            if metrics["setup__ws"] is None or metrics["hold__ws"] is None:
+                raise FlowException(
+                    f"STA at '{sta.step_dir}' reported no worst setup/hold slack for the corner '{corner}'. "
+                    "Check RETIMING_CORNER and the STA logs."
+                )
+            checkpoint = {
+                "iteration": iteration,
+                "clock_period": progress["clock_period"],
+                "sources": sources,
+                "mask_table": progress["mask_table"],
+                "sta_dir": sta.step_dir,
+                "masks": {name: instance.pipeline_mask for name, instance in sorted(netlist.instances.items())},
+                "metrics": metrics,
+                "moves": [],
+            }
+
+            passed = metrics["setup__ws"] >= 0 and metrics["hold__ws"] >= 0
+            if passed and period_search is None:
+                checkpoint["decision"] = "passed"
+                checkpoints.save(checkpoint)
+                success(f"Timing passed at {corner} with a clock period of {progress['clock_period']}ns after {iteration + 1} iterations.")
+                info(f"Retimed design files: {os.path.dirname(sources[0])}")
+                break
+
+            telemetry = copy.deepcopy(progress["telemetry"])
+            telemetry["iterations"] += 1
+            if passed:
+                moves = []
+            elif self.config["RETIMING_SOLVER"]:
+                path_table = pipeline_paths(PathTable.from_reports([os.path.join(sta.step_dir, corner, "max.rpt")], crossings=True))
+                delay_model.add_path_table(path_table, netlist, progress["clock_period"])
+                period, solved = solve_masks(delay_model, checkpoint["masks"])
+                checkpoint["predicted_period"] = period
+                checkpoint["stage_delays"] = {name: [None if np.isnan(d) else round(float(d), 4) for d in delays]
+                                              for name, delays in sorted(delay_model.profile().items())}
+                moves = solver_moves(netlist, solved)
+                # The model already has everything this run can tell it
+                telemetry["kill"] = len(moves) == 0
+            else:
+                simplified, data_hash = load_path_details(sta.step_dir, corner, netlist)
+                check_kill_conditions(simplified, telemetry)
+                violated_paths = sorted((item for item in simplified if item["violated"]), key=lambda x: x["slack"])
+                moves = plan_mask_changes(violated_paths, simplified, telemetry, data_hash,
+                                          self.config["RETIMING_NO_SLACK_ASSUMPTION"])
+                telemetry = update_attempted_combinations(telemetry, data_hash)
+
+            mask_table.apply(moves, netlist)
+            checkpoint["moves"] = [move._asdict() for move in moves]
+
+            clock_period = Decimal(progress["clock_period"])
+            clock_iteration = progress["clock_iteration"] + 1
+            if period_search is not None and (passed or telemetry["kill"] or clock_iteration >= self.config["RETIMING_ITERATIONS"]):
+                period_search.record(clock_period, passed, mask_table.to_dict(), metrics["setup__ws"], clock_iteration)
+                period_search.save(os.path.join(checkpoints.dir, "period_search.json"))
+                next_period = period_search.next_period()
+                if next_period is None:
+                    checkpoint["decision"] = "searched"
+                    checkpoints.save(checkpoint)
+                    period_search.print_curve()
+                    if period_search.upper is not None:
+                        success(f"Minimum clock period at {corner}: {period_search.upper:.3f}ns.")
+                    break
+                checkpoint["decision"] = "next_period"
+                clock_period = Decimal(str(next_period))
+                clock_iteration = 0
+                telemetry = new_telemetry()
+                # Warm start from the masks of the nearest passing period
+                mask_table = MaskTable.from_dict(self.config["VERILOG_FILES"], period_search.warm_start())
+                info(f"Period search: trying a clock period of {clock_period}ns.")
+            elif telemetry["kill"] or clock_iteration >= self.config["RETIMING_ITERATIONS"]:
+                clock_step = self.config["RETIMING_CLOCK_STEP"]
+                if clock_step is None:
+                    checkpoint["decision"] = "stopped"
+                    checkpoints.save(checkpoint)
+                    warn(f"Make the design choice of either increasing the number of pipeline stages or increasing the current clock period {clock_period}.")
+                    break
+                checkpoint["decision"] = "increase_clock"
+                clock_period += clock_step
+                clock_iteration = 0
+                telemetry = new_telemetry()
+                info(f"Increasing clock period to {clock_period}ns.")
+            else:
+                checkpoint["decision"] = "moved"
+
+            progress = {
+                "iteration": iteration + 1,
+                "clock_iteration": clock_iteration,
+                "clock_period": str(clock_period),
+                "mask_table": mask_table.to_dict(),
+                "delay_model": delay_model.to_dict(),
+                "telemetry": telemetry,
+            }
+            if period_search is not None:
+                progress["period_search"] = period_search.to_dict()
+            checkpoint["next"] = dict(progress, telemetry=dict(
+                telemetry, attempted_pipeline_combinations=sorted(telemetry["attempted_pipeline_combinations"])))
+            checkpoints.save(checkpoint)
+            for move in moves:
+                info(f"Iteration {iteration}: {move.instance_name} pipeline mask {move.old_mask[::-1]} → {move.new_mask[::-1]}")
+
+        return (state, step_list)
@@ -0,0 +1,258 @@
+from graphlib import CycleError, TopologicalSorter
+
+import numpy as np
+
+from metrics.candidate_evaluation import MaskMove
+
+
+INPUT = "INPUT"
+OUTPUT = "OUTPUT"
+
+
+def enabled_stages(mask):
+    """Enabled stage positions of a mask (highest stage first), lowest first."""
+    return [len(mask) - 1 - i for i, bit in enumerate(mask) if bit == '1'][::-1]
+
+
+def stages_to_mask(stages, length):
+    bits = ['0'] * length
+    for stage in stages:
+        bits[length - 1 - stage] = '1'
+    return "".join(bits)
+
+
+class StageDelayModel:
+    """
+    Combinational delay of every segment between pipeline stage positions.
+
+    An instance with L stage positions has L + 1 segments: segment 0 runs from
+    the instance inputs to stage 0, segment k from stage k - 1 to stage k and
+    segment L from stage L - 1 to the outputs. A register at stage p sits
+    after segment p.
+
+    Every STA path is an observation: its delay (clock period - setup slack)
+    is the sum of the segments it crosses. Paths parsed with crossings are
+    split at every disabled stage they pass, so each piece usually covers a
+    single segment. Observations of the same segments keep their worst delay,
+    and segment delays are the minimum-norm least-squares fit of those, so a
+    path without crossings spreads its delay evenly over the disabled stages
+    it crosses until later runs with other masks refine the split.
+    """
+    def __init__(self, lengths=None, observations=None):
+        self.lengths = dict(lengths or {})  # instance -> number of stage positions
+        # ((instance, first segment, last segment), ...) -> worst delay
+        self.observations = {}
+        for spans, delay in observations or []:
+            self._observe(tuple(tuple(span) for span in spans), delay)
+
+    def _observe(self, spans, delay):
+        self.observations[spans] = max(float(delay), self.observations.get(spans, float(delay)))
+
+    def add_path(self, start, end, delay):
+        """
+        :param start: (instance, stage) of the launching register, or INPUT.
+        :param end: (instance, stage) of the capturing register, or OUTPUT.
+        :param delay: Combinational delay of the path, in ns.
+        """
+        spans = []
+        if start == INPUT and end == OUTPUT:
+            return
+        if start != INPUT and end != OUTPUT and start[0] == end[0]:
+            if end[1] <= start[1]:
+                return
+            spans.append((start[0], start[1] + 1, end[1]))
+        else:
+            if start != INPUT:
+                spans.append((start[0], start[1] + 1, self.lengths[start[0]]))
+            if end != OUTPUT:
+                spans.append((end[0], 0, end[1]))
+        self._observe(tuple(spans), delay)
+
+    def add_path_table(self, path_table, netlist, clock_period):
+        """
+        Add the setup paths of an STA run.
+        :param path_table: PathTable of a max.rpt, deduplicated or not.
+        :param netlist: NetlistIndex of the raw netlist the run was synthesized from.
+        :param clock_period: Clock period of the run, in ns.
+        """
+        for instance_name, info in netlist.instances.items():
+            self.lengths[instance_name] = len(info.pipeline_mask)
+
+        def point(parsed):
+            module, instance_name, stage = parsed
+            if module in (INPUT, OUTPUT):
+                return module
+            if stage is None or instance_name not in self.lengths:
+                return None
+            return instance_name, stage
+
+        segments = [(index, point(start), point(end), delay)
+                    for index, start, end, delay in path_table.segments(clock_period)]
+        # Add a path's pieces only if all of them are between pipeline stages or ports
+        skipped = {index for index, start, end, _ in segments if start is None or end is None}
+        for index, start, end, delay in segments:
+            if index not in skipped:
+                self.add_path(start, end, delay)
+
+    def edges(self):
+        """(driver, receiver) instance pairs, with INPUT/OUTPUT for ports."""
+        edges = set()
+        for spans in self.observations:
+            if len(spans) == 2:
+                edges.add((spans[0][0], spans[1][0]))
+            elif spans[0][1] == 0:
+                edges.add((INPUT, spans[0][0]))
+            elif spans[0][2] == self.lengths[spans[0][0]]:
+                edges.add((spans[0][0], OUTPUT))
+        return edges
+
+    def segment_delays(self):
+        """
+        :returns: {instance: array of its L + 1 segment delays}
+        """
+        offsets = {}
+        size = 0
+        for instance_name in sorted(self.lengths):
+            offsets[instance_name] = size
+            size += self.lengths[instance_name] + 1
+        if not self.observations or size == 0:
+            return {instance_name: np.zeros(length + 1) for instance_name, length in self.lengths.items()}
+
+        matrix = np.zeros((len(self.observations), size))
+        delays = np.empty(len(self.observations))
+        for i, (spans, delay) in enumerate(self.observations.items()):
+            for instance_name, first, last in spans:
+                matrix[i, offsets[instance_name] + first:offsets[instance_name] + last + 1] = 1
+            delays[i] = delay
+        solution = np.clip(np.linalg.lstsq(matrix, delays, rcond=None)[0], 0, None)
+        return {instance_name: solution[offset:offset + self.lengths[instance_name] + 1]
+                for instance_name, offset in offsets.items()}
+
+    def profile(self):
+        """
+        Per-instance stage delay profile: the worst delay seen for each of an
+        instance's L + 1 segments on its own, NaN where no single-segment
+        observation exists yet.
+        :returns: {instance: float32 array}
+        """
+        profile = {instance_name: np.full(length + 1, np.nan, dtype=np.float32)
+                   for instance_name, length in self.lengths.items()}
+        for spans, delay in self.observations.items():
+            if len(spans) == 1 and spans[0][1] == spans[0][2]:
+                instance_name, segment, _ = spans[0]
+                profile[instance_name][segment] = delay
+        return profile
+
+    def to_dict(self):
+        return {"lengths": self.lengths,
+                "observations": [[[list(span) for span in spans], delay] for spans, delay in self.observations.items()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["lengths"], data["observations"])
+
+
+def place_stages(delays, count, period, head_budget):
+    """
+    Place count registers on the stage positions of one instance so that the
+    head (inputs to the first register) fits head_budget, every register to
+    register segment fits period and the tail (last register to outputs) is
+    as short as possible. Each register goes as late as it can, which
+    maximizes the position of the last one. Without registers the instance
+    extends the paths of its drivers, so its tail is theirs plus its own delay.
+    :returns: (stages, tail delay), or None if infeasible.
+    """
+    length = len(delays) - 1
+    if count == 0:
+        head = float(delays.sum())
+        return ([], period - head_budget + head) if head <= head_budget else None
+    stages = []
+    budget = head_budget
+    previous = -1
+    for j in range(count):
+        latest = length - count + j  # leave room for the remaining registers
+        accumulated = 0.0
+        position = None
+        for p in range(previous + 1, latest + 1):
+            accumulated += delays[p]
+            if accumulated > budget:
+                break
+            position = p
+        if position is None:
+            return None
+        stages.append(position)
+        previous = position
+        budget = period
+    return stages, float(delays[previous + 1:].sum())
+
+
+def _feasible(period, order, predecessors, delays, counts, outputs):
+    tails = {INPUT: 0.0}
+    placements = {}
+    for instance_name in order:
+        if instance_name not in delays:
+            continue
+        head_budget = period - max((tails.get(p, 0.0) for p in predecessors.get(instance_name, ())), default=0.0)
+        placement = place_stages(delays[instance_name], counts[instance_name], period, head_budget)
+        if placement is None:
+            return None
+        placements[instance_name], tails[instance_name] = placement
+        if instance_name in outputs and tails[instance_name] > period:
+            return None
+    return placements
+
+
+def solve_masks(model, masks, tolerance=1e-3):
+    """
+    Minimum-period placement of every instance's enabled stages, keeping the
+    number of enabled stages (latency) of each instance.
+
+    Instances are visited in topological order of the path graph; each gets
+    the latest placement whose head fits what its drivers' tails leave of
+    the period, and the period is bisected down to tolerance.
+    :param model: StageDelayModel.
+    :param masks: {instance: current mask}; instances the model has no data for keep theirs.
+    :returns: (predicted period, {instance: mask})
+    """
+    delays = {instance_name: d for instance_name, d in model.segment_delays().items() if instance_name in masks}
+    if not delays:
+        return None, dict(masks)
+    counts = {instance_name: masks[instance_name].count('1') for instance_name in delays}
+
+    predecessors = {}
+    outputs = set()
+    for driver, receiver in model.edges():
+        if receiver == OUTPUT:
+            outputs.add(driver)
+        elif driver != receiver:
+            predecessors.setdefault(receiver, set()).add(driver)
+    try:
+        order = list(TopologicalSorter({n: predecessors.get(n, set()) - {INPUT} for n in delays}).static_order())
+    except CycleError:
+        order = sorted(delays)
+
+    low = max(float(d.max()) for d in delays.values())
+    high = sum(float(d.sum()) for d in delays.values())
+    best = _feasible(high, order, predecessors, delays, counts, outputs)
+    while best is not None and high - low > tolerance:
+        middle = (low + high) / 2
+        placements = _feasible(middle, order, predecessors, delays, counts, outputs)
+        if placements is None:
+            low = middle
+        else:
+            high, best = middle, placements
+
+    solved = dict(masks)
+    for instance_name, stages in (best or {}).items():
+        solved[instance_name] = stages_to_mask(stages, len(masks[instance_name]))
+    return high, solved
+
+
+def solver_moves(netlist, solved):
+    """MaskMoves from the masks of a netlist to solved masks."""
+    moves = []
+    for instance_name, mask in sorted(solved.items()):
+        info = netlist[instance_name]
+        if mask != info.pipeline_mask:
+            moves.append(MaskMove(info.module, instance_name, info.instance_id, info.pipeline_mask, mask))
+    return moves
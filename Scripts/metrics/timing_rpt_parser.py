@@ -1,64 +1,219 @@
+import csv
+import gzip
+import json
 import re
 from metrics import InstanceDetails
 
 
+STARTPOINT_PREFIX = "Startpoint:"
+ENDPOINT_PREFIX = "Endpoint:"
+
+POINT_PATTERN = re.compile(r'^(?:Startpoint|Endpoint):\s*(\S+)\s*(?:\((\w+))?')
+IO_TYPE_PATTERN = re.compile(r'^\s*\((\w+)')
+SLACK_PATTERN = re.compile(r'^\s*([-\d\.]+)\s+slack')
+PIN_TIME_PATTERN = re.compile(r'([-\d\.]+)\s+[\^v]\s+\S')
+STAGE_BOUNDARY_PATTERN = re.compile(r'([^\s(]*?[./][^./\s]+_pipeline_stage\[\d+\])')
+STAGE_MARKER = "_pipeline_stage["
+ARRIVAL_MARKER = "data arrival time"
+# Written by STA steps with STA_ENDPOINT_SLACK_REPORT set
+ENDPOINT_SLACK_SUFFIXES = (".csv", ".json")
+
+
+def open_report(rpt_file):
+    """
+    Open a timing report for line-by-line reading, transparently
+    decompressing gzip files (detected by their magic bytes, not the name).
+    :param rpt_file: Path to a plain-text or gzip-compressed .rpt file.
+    """
+    with open(rpt_file, 'rb') as f:
+        magic = f.read(2)
+    if magic == b'\x1f\x8b':
+        return gzip.open(rpt_file, 'rt')
+    return open(rpt_file, 'r')
+
+
+def _make_path(startpoint, input_io_type, endpoint, output_io_type, slack_value, crossings=None):
+    violated = slack_value is not None and slack_value < 0
+    path = {
+        'startpoint': startpoint if input_io_type != "input" else "INPUT",
+        'endpoint': endpoint if output_io_type != "output" else "OUTPUT",
+        'slack': slack_value,
+        'violated': violated
+    }
+    if crossings is not None:
+        path['crossings'] = crossings
+    return path
+
+
+def _line_time(line):
+    match = PIN_TIME_PATTERN.search(line) if line is not None else None
+    return float(match.group(1)) if match else None
+
+
+def iter_report_paths(lines, max_paths=None, crossings=False):
+    """
+    Single-pass parser over the lines of one timing report.
+
+    Yields one path record per "Startpoint:" block, as soon as the slack line
+    of that block has been read. Only the current block is held in memory.
+    :param lines: An iterable of report lines (e.g. an open file).
+    :param max_paths: Stop reading after this many paths. Reports are written
+        with -sort_by_slack, so these are the N worst paths of the report.
+    :param crossings: Also read the arrival times of the full_clock_expanded
+        detail lines. Every record then has a 'crossings' list of
+        (pipeline stage boundary, arrival time), one per boundary the data
+        path passes through, in path order. A boundary is the name prefix up
+        to and including "<prefix>_pipeline_stage[k]"; the arrival time is
+        that of the first pin (or of the driver of the first net) in it.
+    """
+    if max_paths is not None and max_paths <= 0:
+        return
+
+    count = 0
+    in_block = False
+    startpoint = input_io_type = endpoint = output_io_type = None
+    # "startpoint"/"endpoint" when a long name pushed its "(...)" to the next line
+    pending_io_type = None
+    path_crossings = None
+    arrived = True
+    # Net lines have no time column; they take the time of their driver pin
+    last_pin_line = None
+
+    for line in lines:
+        if pending_io_type is not None:
+            io_match = IO_TYPE_PATTERN.match(line)
+            io_type = io_match.group(1) if io_match else None
+            if pending_io_type == "startpoint":
+                input_io_type = io_type
+            else:
+                output_io_type = io_type
+            pending_io_type = None
+            if io_match:
+                continue
+
+        if line.startswith(STARTPOINT_PREFIX):
+            if in_block:
+                # Previous block never printed a slack line
+                yield _make_path(startpoint, input_io_type, endpoint, output_io_type, None, path_crossings)
+                count += 1
+                if max_paths is not None and count >= max_paths:
+                    return
+            in_block = True
+            endpoint = output_io_type = None
+            if crossings:
+                path_crossings = []
+                arrived = False
+                last_pin_line = None
+            match = POINT_PATTERN.match(line)
+            startpoint = match.group(1) if match else None
+            input_io_type = match.group(2) if match else None
+            if match and input_io_type is None:
+                pending_io_type = "startpoint"
+        elif not in_block:
+            continue
+        elif line.startswith(ENDPOINT_PREFIX):
+            match = POINT_PATTERN.match(line)
+            endpoint = match.group(1) if match else None
+            output_io_type = match.group(2) if match else None
+            if match and output_io_type is None:
+                pending_io_type = "endpoint"
+        elif not arrived:
+            if ARRIVAL_MARKER in line:
+                arrived = True
+            elif STAGE_MARKER in line:
+                boundary = STAGE_BOUNDARY_PATTERN.search(line)
+                if boundary and (not path_crossings or path_crossings[-1][0] != boundary.group(1)):
+                    time = _line_time(line)
+                    if time is None:
+                        time = _line_time(last_pin_line)
+                    if time is not None:
+                        path_crossings.append((boundary.group(1), time))
+                if "(net)" not in line:
+                    last_pin_line = line
+            elif "(net)" not in line:
+                last_pin_line = line
+        elif "slack" in line:
+            slack_match = SLACK_PATTERN.match(line)
+            if not slack_match:
+                continue
+            try:
+                slack_value = float(slack_match.group(1))
+            except ValueError:
+                slack_value = None
+            yield _make_path(startpoint, input_io_type, endpoint, output_io_type, slack_value, path_crossings)
+            in_block = False
+            count += 1
+            if max_paths is not None and count >= max_paths:
+                return
+
+    if in_block:
+        yield _make_path(startpoint, input_io_type, endpoint, output_io_type, None, path_crossings)
+
+
+def iter_endpoint_slack_paths(rpt_file, max_paths=None):
+    """
+    Path records of an endpoint_slack.csv or endpoint_slack.json report: one
+    row per path with its check (setup/hold), kind ("reg-reg", "in-reg", ...),
+    startpoint and endpoint pins and slack. The records have no crossings.
+    :param rpt_file: Path to the report.
+    :param max_paths: Per-check limit on the number of (worst) paths to read.
+    """
+    with open_report(rpt_file) as f:
+        rows = json.load(f) if str(rpt_file).endswith(".json") else list(csv.DictReader(f))
+    counts = {}
+    for row in rows:
+        count = counts.get(row['check'], 0)
+        if max_paths is not None and count >= max_paths:
+            continue
+        counts[row['check']] = count + 1
+        try:
+            slack_value = float(row['slack'])
+        except ValueError:
+            slack_value = None
+        yield _make_path(row['startpoint'], "input" if row['kind'].startswith("in-") else None,
+                         row['endpoint'], "output" if row['kind'].endswith("-out") else None, slack_value)
+
+
+def iter_timing_paths(timing_rpt, max_paths=None, crossings=False):
+    """
+    Stream path records out of a list of report files, one file at a time.
+    :param timing_rpt: List of .rpt (or .rpt.gz) files, or endpoint slack
+        reports (see iter_endpoint_slack_paths).
+    :param max_paths: Per-file limit on the number of (worst) paths to read.
+    :param crossings: See iter_report_paths. Endpoint slack reports have none.
+    """
+    for rpt_file in timing_rpt:
+        if str(rpt_file).endswith(ENDPOINT_SLACK_SUFFIXES):
+            yield from iter_endpoint_slack_paths(rpt_file, max_paths)
+            continue
+        with open_report(rpt_file) as f:
+            yield from iter_report_paths(f, max_paths, crossings)
+
+
 class TimingRptParser:
-    def __init__(self, timing_rpt: list[str] = None):
+    def __init__(self, timing_rpt: list[str] = None, max_paths: int = None, crossings: bool = False):
         """
-        Initialize the parser with the contents of a max report file.
-        :param timing_rpt: The .rpt file.
+        Initialize the parser with a list of report files (e.g. max.rpt and min.rpt).
+        :param timing_rpt: The .rpt files. Gzip-compressed reports are supported.
+        :param max_paths: If set, only the N worst paths of each report are read.
+        :param crossings: Also keep the arrival time at every pipeline stage
+            boundary each path crosses (see iter_report_paths).
         """
         if timing_rpt is None:
             raise ValueError("No timing report file provided.")
-        else:
-            self.timing_rpt = "" 
-            for rpt_file in timing_rpt: 
-                with open(rpt_file, 'r') as f:
-                    self.timing_rpt += f.read() + "\n"
+        self.timing_rpt = list(timing_rpt)
+        self.max_paths = max_paths
+        self.crossings = crossings
         self.paths = []  # List to store parsed path information
 
         self.parse()
 
     def parse(self):
         """
-        Parse the file content to extract the startpoint, endpoint, slack value,
+        Parse the reports to extract the startpoint, endpoint, slack value,
         and whether the slack is violated (negative) for each path.
         """
-        # Split the file content into blocks that start with "Startpoint:" and filter out empty blocks
-        blocks = re.split(r'(?=Startpoint:)', self.timing_rpt)
-        blocks = [block for block in blocks if block.lstrip().startswith("Startpoint:")]
-        for block in blocks:
-            block = block.strip()
-            if not block:
-                continue
-
-            startpoint_match = re.search(r'^Startpoint:\s*(\S+)\s*\n?\s*\((\w+)', block, re.MULTILINE)
-            startpoint = startpoint_match.group(1) if startpoint_match else None
-            input_io_type = startpoint_match.group(2) if startpoint_match else None
-
-            endpoint_match = re.search(r'^Endpoint:\s*(\S+)\s*\n?\s*\((\w+)', block, re.MULTILINE)
-            endpoint = endpoint_match.group(1) if endpoint_match else None
-            output_io_type = endpoint_match.group(2) if startpoint_match else None
-
-            slack_match = re.search(r'^\s*([-\d\.]+)\s+slack', block, re.MULTILINE)
-            if slack_match:
-                try:
-                    slack_value = float(slack_match.group(1))
-                except ValueError:
-                    slack_value = None
-            else:
-                slack_value = None
-
-            # Determine if the slack is violated (negative slack)
-            violated = slack_value is not None and slack_value < 0
-
-            # Store the parsed information in the paths list
-            self.paths.append({
-                'startpoint': startpoint if input_io_type != "input" else "INPUT",
-                'endpoint': endpoint if output_io_type != "output" else "OUTPUT",
-                'slack': slack_value,
-                'violated': violated
-            })
+        self.paths = list(iter_timing_paths(self.timing_rpt, self.max_paths, self.crossings))
 
     def get_paths(self):
         """
@@ -67,16 +222,22 @@ class TimingRptParser:
         - 'endpoint': The endpoint of the path.
         - 'slack': The slack time (float) or None if not found.
         - 'violated': True if slack < 0, otherwise False (or None if slack not found).
+        - 'crossings': (pipeline stage boundary, arrival time) list, if parsed with crossings=True.
         """
         return self.paths
 
-    def get_instance_details(self): 
+    def get_path_table(self):
+        """
+        Return the parsed paths as a columnar PathTable.
+        """
+        from metrics.path_table import PathTable
+        return PathTable.from_paths(self.paths)
+
+    def get_instance_details(self):
         instance_details = []
         for path in self.paths:
             startpoint = InstanceDetails(path["startpoint"], startpoint=True)
             endpoint = InstanceDetails(path["endpoint"], startpoint=False)
             instance_details.append({"startpoint": startpoint, "endpoint": endpoint, "slack": path["slack"], "violated": path["violated"]})
-        
-        return instance_details
-
 
+        return instance_details
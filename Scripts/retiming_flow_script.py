@@ -0,0 +1,60 @@
+import os
+import argparse
+
+from openlane.flows import Flow
+
+import metrics.retiming_flow  # Registers the Retiming flow
+
+parser = argparse.ArgumentParser(description='Run the pipeline adjustment algorithm as a resumable OpenLane flow.')
+parser.add_argument('--increase-clock', action='store_true', help='Allow automatic clock period increase when timing violations occur.')
+parser.add_argument('--clock-period', type=float, default=20.0, help='Initial clock period to use in the design (in ns).')
+parser.add_argument('--Iterations', type=int, default=50, help='Max Iteration count for the algorithm')
+parser.add_argument('--solver', action='store_true', help='Place all pipeline stages at once with the min-period solver instead of one-bit moves.')
+parser.add_argument('--period-search', action='store_true', help='Bracket and bisect the minimum clock period instead of stopping at the first passing one.')
+parser.add_argument('--period-step', type=float, default=1.0, help='Initial bracketing step of --period-search (in ns).')
+parser.add_argument('--period-tolerance', type=float, default=0.1, help='--period-search stops once the minimum period is known to within this (in ns).')
+parser.add_argument('--tag', default=None, help='Run tag. Running again with the same tag resumes after the last completed iteration.')
+parser.add_argument('--last-run', action='store_true', help='Resume the most recent run.')
+parser.add_argument('--overwrite', action='store_true', help='Discard an existing run with the same tag instead of resuming it.')
+args = parser.parse_args()
+
+'''
+CONFIGURATIONS
+'''
+### Make Changes here ###
+cwd_path = os.getcwd()
+## Design Modules
+top_module = "top_mult_addertree"
+design_paths = [f"{cwd_path}/../Design/Multiplier/array_multiplier.sv",
+                f"{cwd_path}/../Design/AdderTree/AdderTree.sv",
+                f"{cwd_path}/../Design/Top_mult_addertree/top_mult_addertree.sv"]
+## Library Modules
+lib_modules = ["pipeline_stage"]
+lib_paths = [f"{cwd_path}/../Design/lib/{lib_module}.sv" for lib_module in lib_modules]
+## Clock pin name
+clock_pin = "clk"
+## No changes bellow this line ###
+
+Retiming = Flow.factory.get("Retiming")
+flow = Retiming(
+    {
+        "DESIGN_NAME": top_module,
+        "VERILOG_FILES": design_paths + lib_paths,
+        "CLOCK_PORT": clock_pin,
+        "CLOCK_NET": clock_pin,
+        "CLOCK_PERIOD": args.clock_period,
+        "PNR_SDC_FILE": f"{cwd_path}/pre_pnr_base.sdc",
+        "SYNTH_NO_FLAT": True,
+        "YOSYS_LOG_LEVEL": "ERROR",
+        "SYNTH_STRATEGY": "DELAY 1",
+        "SYNTH_ABC_BUFFERING": True,
+        "RETIMING_ITERATIONS": args.Iterations,
+        "RETIMING_SOLVER": args.solver,
+        "RETIMING_CLOCK_STEP": args.period_step if args.period_search else 0.1 if args.increase_clock else None,
+        "RETIMING_PERIOD_TOLERANCE": args.period_tolerance if args.period_search else None,
+    },
+    design_dir=cwd_path,
+    pdk="sky130A",
+    pdk_root=os.getenv("VOLARE_FOLDER"),  # create .env file with VOLARE_FOLDER=<path to skywater-pdk>
+)
+flow.start(tag=args.tag, last_run=args.last_run, overwrite=args.overwrite)
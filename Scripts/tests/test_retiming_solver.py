@@ -0,0 +1,60 @@
+'''
+Tests for metrics/retiming_solver.py.
+
+Usage (from the Scripts directory):
+    python -m pytest tests
+'''
+import os
+import sys
+
+import numpy as np
+import pytest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from metrics.retiming_solver import StageDelayModel, place_stages, solve_masks  # noqa: E402
+
+
+def chain_model(lengths, segment_delay=2.0):
+    '''
+    A model of instances driving each other in the order of lengths, with
+    every segment and every path between two instances observed.
+    '''
+    names = list(lengths)
+    observations = [[[(name, segment, segment)], segment_delay]
+                    for name in names for segment in range(lengths[name] + 1)]
+    for driver, receiver in zip(names, names[1:]):
+        spans = [(driver, lengths[driver], lengths[driver]), (receiver, 0, 0)]
+        observations.append([spans, 2 * segment_delay])
+    return StageDelayModel(lengths, observations)
+
+
+def test_place_stages():
+    delays = np.array([2.0, 2.0, 2.0])
+    assert place_stages(delays, 1, 4.0, 4.0) == ([1], 2.0)
+    assert place_stages(delays, 2, 4.0, 2.0) == ([0, 1], 2.0)
+    assert place_stages(delays, 1, 4.0, 1.0) is None
+
+
+def test_place_stages_without_registers():
+    delays = np.array([2.0, 2.0])
+    # The drivers' tail (10 - 8 = 2 ns) continues through the instance
+    assert place_stages(delays, 0, 10.0, 8.0) == ([], 6.0)
+    assert place_stages(delays, 0, 10.0, 3.0) is None
+
+
+def test_solve_masks():
+    model = chain_model({"x": 2, "y": 2})
+    period, masks = solve_masks(model, {"x": "01", "y": "01"})
+    # x's register moves a stage later so that its tail and y's head fit 4 ns
+    assert period == pytest.approx(4.0, abs=1e-2)
+    assert masks == {"x": "10", "y": "01"}
+
+
+def test_solve_masks_through_combinational_instance():
+    model = chain_model({"x": 1, "a": 1, "b": 1})
+    period, masks = solve_masks(model, {"x": "1", "a": "0", "b": "1"})
+    # x's register → x segment 1 → a segments 0 and 1 → b segment 0 → b's register
+    assert period == pytest.approx(8.0, abs=1e-2)
+    assert masks == {"x": "1", "a": "0", "b": "1"}
@@ -39,6 +39,7 @@ from .misc import (
     mkdirp,
     zip_first,
     format_size,
+    parse_size,
     format_elapsed_time,
     Filter,
     get_latest_file,
@@ -58,4 +59,6 @@ from .toolbox import Toolbox
 from .drc import DRC, Violation
 from . import cli
 from .tpe import get_tpe, set_tpe
+from .scheduler import ResourceScheduler, get_scheduler, set_scheduler
+from .process_history import ProcessHistory, Prediction, get_process_history
 from .ring_buffer import RingBuffer
@@ -29,13 +29,15 @@ from typing import (
     Optional,
     SupportsFloat,
     Union,
+    TYPE_CHECKING,
 )
 
-import httpx
-
 from .types import AnyPath, Path
 from ..__version__ import __version__
 
+if TYPE_CHECKING:
+    import httpx
+
 T = TypeVar("T")
 
 
@@ -207,25 +209,42 @@ class zip_first(object):
         return (a, b)
 
 
-def format_size(byte_count: int) -> str:
-    units = [
-        "B",
-        "KiB",
-        "MiB",
-        "GiB",
-        "TiB",
-        "PiB",
-        "EiB",
-        # TODO: update OpenLane when zebibytes are a thing
-    ]
+SIZE_UNITS = [
+    "B",
+    "KiB",
+    "MiB",
+    "GiB",
+    "TiB",
+    "PiB",
+    "EiB",
+    # TODO: update OpenLane when zebibytes are a thing
+]
 
+
+def format_size(byte_count: int) -> str:
     tracker = 0
     so_far = byte_count
-    while (so_far // 1024) > 0 and tracker < (len(units) - 1):
+    while (so_far // 1024) > 0 and tracker < (len(SIZE_UNITS) - 1):
         tracker += 1
         so_far //= 1024
 
-    return f"{so_far}{units[tracker]}"
+    return f"{so_far}{SIZE_UNITS[tracker]}"
+
+
+def parse_size(size: str) -> int:
+    """
+    The inverse of :func:`format_size`. As ``format_size`` rounds down, the
+    result is rounded up to the next whole unit, so it is never smaller than
+    the size that was formatted.
+
+    :param size: A size formatted by :func:`format_size`, e.g. ``512MiB``
+    :returns: The size in bytes
+    """
+    if match := re.fullmatch(r"(\d+)([A-Za-z]+)", size):
+        count, unit = match.groups()
+        if unit in SIZE_UNITS:
+            return (int(count) + 1) * 1024 ** SIZE_UNITS.index(unit)
+    raise ValueError(f"Invalid size '{size}'")
 
 
 def format_elapsed_time(elapsed_seconds: SupportsFloat) -> str:
@@ -332,7 +351,7 @@ def get_latest_file(in_path: Union[str, os.PathLike], filename: str) -> Optional
     return latest_json
 
 
-def get_httpx_session(token: Optional[str] = None) -> httpx.Client:
+def get_httpx_session(token: Optional[str] = None) -> "httpx.Client":
     """
     Creates an ``httpx`` session client that follows redirects and has the
     User-Agent header set to ``openlane2/{__version__}``.
@@ -341,6 +360,8 @@ def get_httpx_session(token: Optional[str] = None) -> httpx.Client:
         Authorization: Bearer {token}, is included.
     :returns: The created client
     """
+    import httpx  # Slow to import and only needed here
+
     session = httpx.Client(follow_redirects=True)
     headers_raw = {"User-Agent": f"openlane2/{__version__}"}
     if token is not None and token.strip() != "":
@@ -0,0 +1,284 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import re
+import glob
+import json
+import math
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+
+from .types import Path
+from .generic_dict import GenericDictEncoder
+from .misc import parse_size
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS process_stats (
+    stats_path TEXT PRIMARY KEY,
+    step TEXT NOT NULL,
+    job TEXT NOT NULL,
+    settings TEXT,
+    size REAL,
+    runtime REAL,
+    cpu_time REAL,
+    peak_cpu REAL,
+    peak_rss INTEGER,
+    avg_cpu REAL,
+    avg_rss INTEGER,
+    recorded REAL
+);
+CREATE INDEX IF NOT EXISTS process_stats_job ON process_stats (step, job);
+"""
+
+#: The number of most recent records a prediction is based on
+HISTORY_WINDOW = 50
+
+#: The number of records of the most similar design sizes scaled to predict
+NEAREST_SIZES = 3
+
+
+class Prediction(NamedTuple):
+    """
+    :param runtime: The predicted runtime, in seconds.
+    :param peak_memory: The predicted peak resident memory, in bytes.
+    :param cpus: The predicted peak number of busy cores.
+    :param samples: The number of records the prediction is based on.
+    """
+
+    runtime: float
+    peak_memory: int
+    cpus: float
+    samples: int
+
+
+def _parse_elapsed_time(elapsed: str) -> float:
+    # The inverse of format_elapsed_time
+    hours, minutes, seconds = elapsed.split(":")
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def settings_digest(config: Dict[str, Any]) -> str:
+    """
+    :param config: A step's configuration.
+    :returns: A digest of the configuration without its paths, i.e., of the
+        settings that are the same between runs of the same flow on different
+        inputs.
+    """
+
+    def has_path(value: Any) -> bool:
+        if isinstance(value, Path):
+            return True
+        elif isinstance(value, dict):
+            return any(has_path(element) for element in value.values())
+        elif isinstance(value, (list, tuple)):
+            return any(has_path(element) for element in value)
+        return False
+
+    settings = {
+        name: value
+        for name, value in config.items()
+        if name != "meta" and not has_path(value)
+    }
+    payload = json.dumps(settings, cls=GenericDictEncoder, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf8")).hexdigest()
+
+
+class ProcessHistory(object):
+    """
+    An SQLite database of the resources used by the subprocesses of steps,
+    keyed by step (slugified ID), job (the name of the subprocess's log file),
+    settings (see :func:`settings_digest`) and design size (usually the
+    instance count).
+
+    The database may be shared by several processes.
+
+    :param path: The path to the database, which is created if needed.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._ingested: Set[str] = set()
+        self._connection = sqlite3.connect(
+            path, timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._connection.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def record(
+        self,
+        stats_path: str,
+        step: str,
+        job: str,
+        stats: Dict[str, Dict[str, float]],
+        *,
+        settings: Optional[str] = None,
+        size: Optional[float] = None,
+    ):
+        """
+        :param stats_path: The ``process_stats.json`` file the statistics were
+            written to. A later record for the same file replaces this one.
+        :param stats: The unformatted statistics of a
+            :class:`openlane.steps.process_stats.ProcessStatsThread`, i.e., its
+            ``time``, ``peak_resources`` and ``avg_resources``.
+        """
+        times = stats["time"]
+        peaks = stats["peak_resources"]
+        averages = stats["avg_resources"]
+        row = (
+            os.path.abspath(stats_path),
+            step,
+            job,
+            settings,
+            size,
+            times["runtime"],
+            times["cpu_time_user"] + times["cpu_time_system"],
+            peaks["cpu_percent"] / 100,
+            int(peaks["memory_rss"]),
+            averages["cpu_percent"] / 100,
+            int(averages["memory_rss"]),
+            time.time(),
+        )
+        with self._lock:
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO process_stats VALUES ({', '.join('?' * len(row))})",
+                row,
+            )
+
+    def ingest(self, run_dir: str) -> int:
+        """
+        Records the ``process_stats.json`` files of every step directory in
+        ``run_dir`` that are not in the database yet. Their settings and design
+        sizes are unknown. Each run directory is only read once.
+
+        :returns: The number of new records.
+        """
+        run_dir = os.path.abspath(run_dir)
+        with self._lock:
+            if run_dir in self._ingested:
+                return 0
+            self._ingested.add(run_dir)
+            known = {
+                row[0]
+                for row in self._connection.execute(
+                    "SELECT stats_path FROM process_stats WHERE stats_path LIKE ?",
+                    (os.path.join(run_dir, "%"),),
+                )
+            }
+        count = 0
+        for stats_path in glob.glob(
+            os.path.join(run_dir, "*", "**", "*.process_stats.json"),
+            recursive=True,
+        ):
+            if stats_path in known:
+                continue
+            step_dir_name = os.path.relpath(stats_path, run_dir).split(os.sep)[0]
+            step = re.sub(r"^\d+-", "", step_dir_name)
+            job = os.path.basename(stats_path)[: -len(".process_stats.json")]
+            try:
+                with open(stats_path, encoding="utf8") as f:
+                    formatted = json.load(f)
+                stats = {
+                    "time": {
+                        key: _parse_elapsed_time(value)
+                        for key, value in formatted["time"].items()
+                    }
+                }
+                for category in ["peak_resources", "avg_resources"]:
+                    resources = formatted[category]
+                    stats[category] = {
+                        "cpu_percent": float(resources["cpu_percent"]),
+                        "memory_rss": parse_size(resources["memory_rss"]),
+                    }
+                self.record(stats_path, step, job, stats)
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+            count += 1
+        return count
+
+    def predict(
+        self,
+        step: str,
+        job: Optional[str] = None,
+        *,
+        settings: Optional[str] = None,
+        size: Optional[float] = None,
+    ) -> Optional[Prediction]:
+        """
+        Predicts the resources a subprocess will use from the most recent
+        records of the same step and job.
+
+        Records with the same settings are preferred. If ``size`` is given, the
+        records of the most similar design sizes are scaled linearly to it;
+        otherwise, the largest peaks and the average runtime are used.
+
+        :param step: The slugified ID of the step.
+        :param job: The name of the subprocess's log file, without its
+            extension. If ``None``, all subprocesses of the step are considered.
+        :param settings: See :func:`settings_digest`.
+        :param size: The design size, usually ``design__instance__count``.
+        :returns: The prediction, or ``None`` if the step was never recorded.
+        """
+        query = "SELECT settings, size, runtime, peak_rss, peak_cpu FROM process_stats WHERE step = ?"
+        parameters: List[Any] = [step]
+        if job is not None:
+            query += " AND job = ?"
+            parameters.append(job)
+        query += " ORDER BY recorded DESC LIMIT ?"
+        parameters.append(HISTORY_WINDOW)
+        with self._lock:
+            rows = self._connection.execute(query, parameters).fetchall()
+        if len(rows) == 0:
+            return None
+
+        same_settings = [row for row in rows if row[0] == settings]
+        candidates = same_settings or rows
+        scaled = []
+        if size:
+            sized = [row for row in candidates if row[1]]
+            sized.sort(key=lambda row: abs(math.log(size / row[1])))
+            for _, row_size, runtime, peak_rss, peak_cpu in sized[:NEAREST_SIZES]:
+                scale = size / row_size
+                scaled.append((runtime * scale, peak_rss * scale, peak_cpu))
+        if len(scaled) == 0:
+            scaled = [(row[2], row[3], row[4]) for row in candidates]
+
+        return Prediction(
+            runtime=sum(runtime for runtime, _, _ in scaled) / len(scaled),
+            peak_memory=int(max(peak_rss for _, peak_rss, _ in scaled)),
+            cpus=max(max(peak_cpu for _, _, peak_cpu in scaled), 1.0),
+            samples=len(scaled),
+        )
+
+
+_histories: Dict[str, ProcessHistory] = {}
+_histories_lock = threading.Lock()
+
+
+def get_process_history(path: str) -> ProcessHistory:
+    """
+    :returns: A :class:`ProcessHistory` for the database at ``path``, shared
+        by every caller in this process.
+    """
+    path = os.path.abspath(path)
+    with _histories_lock:
+        if path not in _histories:
+            _histories[path] = ProcessHistory(path)
+        return _histories[path]
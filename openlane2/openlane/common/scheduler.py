@@ -0,0 +1,254 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import re
+import sys
+import glob
+import json
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+
+import psutil
+
+from .misc import _get_process_limit, parse_size
+
+Job = Tuple[str, str]
+
+
+def cgroup_dir(pid: Union[int, str] = "self") -> Optional[str]:
+    """
+    :param pid: A process ID, or ``"self"``.
+    :returns: The directory of the process's cgroup v2 (unified hierarchy),
+        or ``None`` if it is not mounted at ``/sys/fs/cgroup`` (or at
+        ``/sys/fs/cgroup/unified`` on hybrid hosts).
+    """
+    try:
+        with open(f"/proc/{pid}/cgroup", encoding="utf8") as f:
+            for line in f:
+                if line.startswith("0::"):
+                    path = line[3:].strip().lstrip("/")
+                    break
+            else:
+                return None
+    except OSError:
+        return None
+    for mount in ["/sys/fs/cgroup", "/sys/fs/cgroup/unified"]:
+        directory = os.path.normpath(os.path.join(mount, path))
+        if os.path.isfile(os.path.join(directory, "cgroup.procs")):
+            return directory
+    return None
+
+
+def _cgroup_value(name: str) -> Optional[str]:
+    if directory := cgroup_dir():
+        try:
+            with open(os.path.join(directory, name), encoding="utf8") as f:
+                return f.read().strip()
+        except OSError:
+            pass
+    return None
+
+
+def available_cpus() -> int:
+    """
+    :returns: The number of cores OpenLane may use: ``_OPENLANE_MAX_CORES``
+        (or the number of cores), limited by the CPU affinity of the process
+        and by the CPU quota of its cgroup.
+    """
+    count = _get_process_limit()
+    if hasattr(os, "sched_getaffinity"):
+        count = min(count, len(os.sched_getaffinity(0)))
+    if cpu_max := _cgroup_value("cpu.max"):
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max" and period:
+            count = min(count, -(-int(quota) // int(period)))
+    return max(count, 1)
+
+
+def available_memory() -> int:
+    """
+    :returns: The memory OpenLane may use, in bytes: ``_OPENLANE_MAX_MEMORY``
+        if set, otherwise the physical memory, limited by the memory limit of
+        the process's cgroup.
+    """
+    if value := os.getenv("_OPENLANE_MAX_MEMORY"):
+        return int(value)
+    try:
+        memory = psutil.virtual_memory().total
+    except OSError:
+        memory = sys.maxsize  # /proc is unavailable: memory is not limited
+    if memory_max := _cgroup_value("memory.max"):
+        if memory_max != "max":
+            memory = min(memory, int(memory_max))
+    return memory
+
+
+class ResourceEstimates(object):
+    """
+    The peak CPU and memory use of jobs, keyed by the step that runs them
+    (its slugified ID) and the name of the job's log file.
+
+    Estimates are the largest peaks recorded so far, either from jobs that
+    ran in this process or from the ``process_stats.json`` files of earlier
+    runs.
+    """
+
+    #: The estimate for jobs that have never been seen
+    default: Tuple[float, int] = (1.0, 0)
+
+    def __init__(self) -> None:
+        self._peaks: Dict[Job, Tuple[float, int]] = {}
+        self._seeded: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def record(self, job: Job, cpus: float, memory: int):
+        with self._lock:
+            known_cpus, known_memory = self._peaks.get(job, (0.0, 0))
+            self._peaks[job] = (max(cpus, known_cpus), max(memory, known_memory))
+
+    def get(self, job: Job) -> Tuple[float, int]:
+        with self._lock:
+            return self._peaks.get(job, self.default)
+
+    def seed(self, run_dir: str):
+        """
+        Records the peaks in the ``process_stats.json`` files of every step
+        directory in ``run_dir``. Each run directory is only read once.
+        """
+        run_dir = os.path.abspath(run_dir)
+        with self._lock:
+            if run_dir in self._seeded:
+                return
+            self._seeded.add(run_dir)
+        for stats_path in glob.glob(
+            os.path.join(run_dir, "*", "**", "*.process_stats.json"),
+            recursive=True,
+        ):
+            step_dir_name = os.path.relpath(stats_path, run_dir).split(os.sep)[0]
+            step = re.sub(r"^\d+-", "", step_dir_name)
+            log_name = os.path.basename(stats_path)[: -len(".process_stats.json")]
+            try:
+                with open(stats_path, encoding="utf8") as f:
+                    peaks = json.load(f)["peak_resources"]
+                cpus = float(peaks["cpu_percent"]) / 100
+                memory = parse_size(peaks["memory_rss"])
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+            self.record((step, log_name), max(cpus, 1.0), memory)
+
+
+class ResourceScheduler(object):
+    """
+    Admits jobs (usually tool subprocesses) while their estimated CPU and
+    memory use fits within global limits, so steps that run concurrently,
+    within one flow or across several, do not oversubscribe the machine.
+
+    Waiting jobs are admitted in order of priority (highest first), then of
+    arrival. A job is never admitted ahead of one that waits before it, and
+    estimates larger than the limits are reduced to the limits, so every job
+    is eventually admitted once nothing else is running.
+
+    :param cpus: The number of cores to share. Defaults to
+        :func:`available_cpus`.
+    :param memory: The memory to share, in bytes. Defaults to
+        :func:`available_memory`.
+    """
+
+    def __init__(
+        self,
+        cpus: Optional[float] = None,
+        memory: Optional[int] = None,
+    ) -> None:
+        self.cpus = cpus or available_cpus()
+        self.memory = memory or available_memory()
+        self.estimates = ResourceEstimates()
+        self.used_cpus = 0.0
+        self.used_memory = 0
+        self.running = 0
+        self._waiting: List[Tuple[int, int]] = []
+        self._tickets = itertools.count()
+        self._condition = threading.Condition()
+
+    def _fits(self, cpus: float, memory: int) -> bool:
+        return self.running == 0 or (
+            self.used_cpus + cpus <= self.cpus
+            and self.used_memory + memory <= self.memory
+        )
+
+    @contextmanager
+    def reserve(
+        self,
+        cpus: float,
+        memory: int,
+        priority: int = 0,
+    ) -> Iterator[None]:
+        """
+        Blocks until the job is admitted, then holds its resources until the
+        ``with`` block is exited.
+
+        :param cpus: The estimated number of cores used by the job.
+        :param memory: The estimated peak memory of the job, in bytes.
+        :param priority: Jobs with a higher priority are admitted first.
+        """
+        cpus = min(cpus, self.cpus)
+        memory = min(memory, self.memory)
+        with self._condition:
+            ticket = (-priority, next(self._tickets))
+            heapq.heappush(self._waiting, ticket)
+            while self._waiting[0] != ticket or not self._fits(cpus, memory):
+                self._condition.wait()
+            heapq.heappop(self._waiting)
+            self.used_cpus += cpus
+            self.used_memory += memory
+            self.running += 1
+            # The next job in line may fit as well
+            self._condition.notify_all()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.used_cpus -= cpus
+                self.used_memory -= memory
+                self.running -= 1
+                self._condition.notify_all()
+
+
+SCHEDULER: Optional[ResourceScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def set_scheduler(scheduler: ResourceScheduler):
+    """
+    Allows replacing OpenLane's global :class:`ResourceScheduler`, e.g. with
+    different limits.
+
+    :param scheduler: The replacement scheduler
+    """
+    global SCHEDULER
+    SCHEDULER = scheduler
+
+
+def get_scheduler() -> ResourceScheduler:
+    """
+    :returns: OpenLane's global :class:`ResourceScheduler`, which every step
+        runs its subprocesses through.
+    """
+    global SCHEDULER
+    with _scheduler_lock:
+        if SCHEDULER is None:
+            SCHEDULER = ResourceScheduler()
+        return SCHEDULER
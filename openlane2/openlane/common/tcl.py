@@ -11,9 +11,10 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import os
 import re
 import tkinter
-from typing import Dict, Mapping, Any, Iterable
+from typing import Dict, List, Mapping, Any, Iterable, Optional
 
 _env_rx = re.compile(r"(?:\:\:)?env\((\w+)\)")
 _find_unsafe = re.compile(r"[^\w@%+=:,./-]", re.ASCII).search
@@ -54,7 +55,15 @@ class TclUtils(object):
         return " ".join(TclUtils.escape(arg) for arg in ss)
 
     @staticmethod
-    def _eval_env(env_in: Mapping[str, Any], tcl_in: str) -> Dict[str, Any]:
+    def _eval_env(
+        env_in: Mapping[str, Any],
+        tcl_in: str,
+        sourced: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        :param sourced: If set, the absolute paths of files sourced by the
+            script are appended to this list.
+        """
         interpreter = tkinter.Tcl()
 
         interpreter.eval("array unset ::env")
@@ -75,6 +84,18 @@ class TclUtils(object):
             "proc set args { _py_set {*}$args; tailcall _orig_set {*}$args; }"
         )
 
+        if sourced is not None:
+
+            def py_source(path):
+                sourced.append(os.path.abspath(path))
+
+            py_source_name = interpreter.register(py_source)
+            interpreter.call("rename", py_source_name, "_py_source")
+            interpreter.call("rename", "source", "_orig_source")
+            interpreter.eval(
+                "proc source args { _py_source [lindex $args end]; tailcall _orig_source {*}$args; }"
+            )
+
         interpreter.eval(tcl_in)
 
         return env_out
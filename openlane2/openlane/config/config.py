@@ -19,7 +19,6 @@ import dataclasses
 from glob import glob
 from decimal import Decimal
 from textwrap import dedent
-from functools import lru_cache
 from dataclasses import dataclass
 from typing import (
     Any,
@@ -38,6 +37,7 @@ from typing import (
 from .variable import Variable, MissingRequiredVariable
 from .removals import removed_variables
 from .flow import pdk_variables, scl_variables, flow_common_variables
+from . import pdk_cache
 from .pdk_compat import migrate_old_config
 from .preprocessor import preprocess_dict, Keys as SpecialKeys
 from ..logging import info, warn
@@ -795,10 +795,11 @@ class Config(GenericImmutableDict[str, Any]):
         return os.path.abspath(pdk_root)
 
     @staticmethod
-    @lru_cache(1, True)
-    def __get_pdk_raw(
-        pdk_root: str, pdk: str, scl: Optional[str]
-    ) -> Tuple[GenericImmutableDict[str, Any], str, str]:
+    def __get_pdk_raw(pdk_root: str, pdk: str, scl: Optional[str]) -> pdk_cache.Entry:
+        key = ("raw", pdk_root, pdk, scl)
+        if cached := pdk_cache.get(key):
+            return cached
+
         pdk_config: GenericDict[str, Any] = GenericDict(
             {
                 SpecialKeys.pdk_root: pdk_root,
@@ -821,9 +822,11 @@ class Config(GenericImmutableDict[str, Any]):
 
         pdk_config_path = os.path.join(pdkpath, "libs.tech", "openlane", "config.tcl")
 
+        sourced = [pdk_config_path]
         pdk_env = TclUtils._eval_env(
             pdk_config,
             open(pdk_config_path, encoding="utf8").read(),
+            sourced,
         )
 
         scl = pdk_env["STD_CELL_LIBRARY"]
@@ -835,14 +838,24 @@ class Config(GenericImmutableDict[str, Any]):
             pdkpath, "libs.tech", "openlane", scl, "config.tcl"
         )
 
+        sourced.append(scl_config_path)
         scl_env = migrate_old_config(
             TclUtils._eval_env(
                 pdk_env,
                 open(scl_config_path, encoding="utf8").read(),
+                sourced,
             )
         )
 
-        return GenericImmutableDict(scl_env), pdkpath, scl
+        entry = pdk_cache.Entry(
+            GenericImmutableDict(scl_env),
+            [],
+            pdkpath,
+            scl,
+            {path: pdk_cache.fingerprint(path) for path in sourced},
+        )
+        pdk_cache.put(key, entry)
+        return entry
 
     @staticmethod
     def __get_pdk_config(
@@ -854,22 +867,43 @@ class Config(GenericImmutableDict[str, Any]):
     ) -> Tuple[GenericDict[str, Any], str, str]:
         """
         :returns: A tuple of the PDK configuration, the PDK path and the SCL.
-        """
 
-        frozen, pdkpath, scl = Config.__get_pdk_raw(pdk_root, pdk, scl)
+        Both the evaluated Tcl files and the processed configuration are cached:
+        see :mod:`openlane.config.pdk_cache`.
+        """
         if flow_pdk_vars is None or len(flow_pdk_vars) == 0:
-            return (GenericDict(), pdkpath, scl)
-
-        raw: GenericDict[str, Any] = GenericDict(frozen)  # microwave
-        processed, pdk_warnings, pdk_errors = Config.__process_variable_list(
-            raw,
-            flow_pdk_vars,
-            on_unknown_key=None,
-            permissive_typing=True,
+            raw_entry = Config.__get_pdk_raw(pdk_root, pdk, scl)
+            return (GenericDict(), raw_entry.pdkpath, raw_entry.scl)
+
+        key = (
+            "processed",
+            pdk_root,
+            pdk,
+            scl,
+            pdk_cache.variables_digest(flow_pdk_vars),
         )
+        if cached := pdk_cache.get(key):
+            processed, pdk_warnings = GenericDict(cached.config), cached.warnings
+            pdkpath, scl = cached.pdkpath, cached.scl
+        else:
+            raw_entry = Config.__get_pdk_raw(pdk_root, pdk, scl)
+            pdkpath, scl = raw_entry.pdkpath, raw_entry.scl
+
+            raw: GenericDict[str, Any] = GenericDict(raw_entry.config)  # microwave
+            processed, pdk_warnings, pdk_errors = Config.__process_variable_list(
+                raw,
+                flow_pdk_vars,
+                on_unknown_key=None,
+                permissive_typing=True,
+            )
+
+            if len(pdk_errors) != 0:
+                raise InvalidConfig("PDK configuration files", pdk_warnings, pdk_errors)
 
-        if len(pdk_errors) != 0:
-            raise InvalidConfig("PDK configuration files", pdk_warnings, pdk_errors)
+            pdk_cache.put(
+                key,
+                pdk_cache.Entry(processed, pdk_warnings, pdkpath, scl, raw_entry.files),
+            )
 
         if len(pdk_warnings) > 0:
             if full_pdk_warnings:
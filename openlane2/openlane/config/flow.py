@@ -485,6 +485,36 @@ option_variables = [
         deprecated_names=["BASE_SDC_FILE", "SDC_FILE"],
         default=Path(os.path.join(get_script_dir(), "base.sdc")),
     ),
+    # Caching
+    Variable(
+        "STEP_CACHE_DIR",
+        Optional[str],
+        "If set, the results of every step are stored in this directory, keyed by the step, its configuration and the contents of its input files. A step whose inputs match an earlier run is restored from the cache instead of being run again. Steps that produce views outside of their step directory, and steps that open a GUI, are never cached.",
+    ),
+    Variable(
+        "STEP_CACHE_SIZE",
+        int,
+        "The maximum size of STEP_CACHE_DIR. The least recently used entries are removed when it is exceeded.",
+        default=10240,
+        units="MiB",
+    ),
+    Variable(
+        "PROCESS_HISTORY",
+        Optional[str],
+        "An SQLite database of the resources used by the subprocesses of every step, keyed by step, configuration and design size. It is used to predict the runtime and peak memory of later runs, and by the resource scheduler to decide how many subprocesses can run at once. Flows default to process_history.sqlite in the directory containing their run directories.",
+    ),
+    Variable(
+        "ODB_PERSISTENT_SESSION",
+        bool,
+        "Run Odb steps in long-lived OpenROAD sessions instead of starting OpenROAD every time. A session keeps the database written by its last step loaded, and a step whose input is that step's output ODB runs in the same session without reading the design or any LEF file again, so back-to-back Odb steps only load the design once. Each step still writes its ODB view, and logs and metrics are unchanged.",
+        default=False,
+    ),
+    Variable(
+        "ODB_DEFER_DEF",
+        bool,
+        "Odb steps do not write a DEF view next to their ODB view. Instead, the DEF view is written from the ODB view when a later step that reads DEF views starts, or when a snapshot of the views is saved, and not at all otherwise.",
+        default=True,
+    ),
 ]
 
 flow_common_variables = pdk_variables + scl_variables + option_variables
@@ -0,0 +1,182 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+A cache of PDK configurations, as evaluated from the PDK's and the standard
+cell library's ``config.tcl`` files and processed against the PDK variables of
+a flow.
+
+Entries are kept in memory for the lifetime of the process and on disk, in
+``OPENLANE_PDK_CACHE_DIR`` (by default ``$XDG_CACHE_HOME/openlane/pdk``; set it
+to an empty string to keep entries in memory only). An entry is invalidated
+when any Tcl file it was evaluated from (including files they ``source``)
+changes, or when OpenLane is updated.
+
+:meta private:
+"""
+import os
+import re
+import copy
+import pickle
+import hashlib
+import tempfile
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from ..__version__ import __version__
+
+#: The modification time (ns), size and SHA-256 of a file
+Fingerprint = Tuple[int, int, str]
+
+
+class Entry(NamedTuple):
+    """
+    :param config: The evaluated (and possibly processed) configuration.
+    :param warnings: Warnings generated while processing the configuration.
+    :param pdkpath: The path to the PDK.
+    :param scl: The standard cell library (the PDK's default if none was
+        requested).
+    :param files: The fingerprints of the Tcl files the configuration was
+        evaluated from.
+    """
+
+    config: Any
+    warnings: List[str]
+    pdkpath: str
+    scl: str
+    files: Dict[str, Fingerprint]
+
+
+_entries: Dict[Tuple, Entry] = {}
+_digests: Dict[Tuple[int, ...], Tuple[Sequence[Any], str]] = {}
+_lock = threading.Lock()
+_address_rx = re.compile(r" at 0x[0-9a-fA-F]+")
+
+
+def fingerprint(path: str) -> Fingerprint:
+    stat = os.stat(path)
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    return (stat.st_mtime_ns, stat.st_size, digest)
+
+
+def is_current(files: Dict[str, Fingerprint]) -> bool:
+    """
+    :returns: Whether none of the files have changed. Files whose modification
+        time changed are hashed again, so touching a file does not invalidate
+        entries.
+    """
+    for path, (mtime_ns, size, digest) in files.items():
+        try:
+            stat = os.stat(path)
+            if stat.st_mtime_ns == mtime_ns and stat.st_size == size:
+                continue
+            if stat.st_size != size or fingerprint(path)[2] != digest:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def variables_digest(variables: Sequence[Any]) -> str:
+    """
+    :returns: A digest of the definitions of a list of variables, stable across
+        processes.
+    """
+    ids = tuple(id(variable) for variable in variables)
+    with _lock:
+        if found := _digests.get(ids):
+            return found[1]
+    # The list is kept alongside the digest so its IDs are not reused
+    definitions = _address_rx.sub("", repr(list(variables)))
+    digest = hashlib.sha256(definitions.encode("utf8")).hexdigest()
+    with _lock:
+        _digests[ids] = (variables, digest)
+    return digest
+
+
+def cache_dir() -> Optional[str]:
+    """
+    :returns: The directory of the on-disk cache, or ``None`` if it is
+        disabled.
+    """
+    value = os.getenv("OPENLANE_PDK_CACHE_DIR")
+    if value is not None:
+        return value or None
+    cache_home = os.getenv("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "openlane", "pdk")
+
+
+def _entry_path(directory: str, key: Tuple) -> str:
+    digest = hashlib.sha256(repr((__version__, key)).encode("utf8")).hexdigest()
+    return os.path.join(directory, f"{digest}.pickle")
+
+
+def get(key: Tuple) -> Optional[Entry]:
+    """
+    :param key: A tuple of strings (and ``None``) identifying the configuration.
+    :returns: A copy of the current entry for the key, or ``None``.
+    """
+    with _lock:
+        entry = _entries.get(key)
+    if entry is None and (directory := cache_dir()) is not None:
+        try:
+            with open(_entry_path(directory, key), "rb") as f:
+                entry = pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError, AttributeError, ImportError):
+            entry = None
+        if entry is not None:
+            with _lock:
+                _entries[key] = entry
+    if entry is None or not is_current(entry.files):
+        return None
+    return entry._replace(config=copy.deepcopy(entry.config))
+
+
+def put(key: Tuple, entry: Entry):
+    """
+    Stores an entry in memory and, if enabled, on disk. Failures to write to
+    the disk are ignored.
+    """
+    entry = entry._replace(config=copy.deepcopy(entry.config))
+    with _lock:
+        _entries[key] = entry
+    if (directory := cache_dir()) is None:
+        return
+    tmp_path = None
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(entry, f)
+        os.replace(tmp_path, _entry_path(directory, key))
+    except (OSError, pickle.PickleError):
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def clear(disk: bool = False):
+    """
+    Drops every entry from memory and, optionally, from the disk.
+    """
+    with _lock:
+        _entries.clear()
+    if disk and (directory := cache_dir()) is not None:
+        try:
+            for name in os.listdir(directory):
+                if name.endswith(".pickle"):
+                    os.unlink(os.path.join(directory, name))
+        except OSError:
+            pass
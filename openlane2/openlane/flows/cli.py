@@ -34,7 +34,14 @@ from cloup.constraints import (
 from cloup.typing import Decorator
 
 from .flow import Flow
-from ..common import set_tpe, cli, get_opdks_rev, _get_process_limit
+from ..common import (
+    set_tpe,
+    set_scheduler,
+    ResourceScheduler,
+    cli,
+    get_opdks_rev,
+    _get_process_limit,
+)
 from ..logging import set_log_level, verbose, err, options, LogLevels
 from ..state import State, InvalidState
 
@@ -69,6 +76,7 @@ def set_worker_count_cb(
         return None
 
     set_tpe(ThreadPoolExecutor(max_workers=value))
+    set_scheduler(ResourceScheduler(cpus=value))
 
 
 def initial_state_cb(
@@ -14,6 +14,7 @@
 from __future__ import annotations
 import os
 import glob
+import json
 import shutil
 import fnmatch
 import logging
@@ -68,6 +69,7 @@ from ..common import (
     slugify,
     Toolbox,
     get_latest_file,
+    GenericImmutableDict,
 )
 
 
@@ -645,6 +647,14 @@ class Flow(ABC):
         handlers.append(handler)
         register_additional_handler(handler)
 
+        if "PROCESS_HISTORY" in self.config and self.config["PROCESS_HISTORY"] is None:
+            # Shared by every run of the design
+            self.config = self.config.copy(
+                PROCESS_HISTORY=os.path.join(
+                    os.path.dirname(self.run_dir), "process_history.sqlite"
+                )
+            )
+
         try:
             self.config_resolved_path = os.path.join(self.run_dir, "resolved.json")
             with open(self.config_resolved_path, "w") as f:
@@ -664,7 +674,9 @@ class Flow(ABC):
             # Stored until next start()
             self.step_objects += step_objects
 
-            return final_state
+            self._summarize_step_cache(step_objects)
+
+            return self._with_step_cache_metrics(final_state, step_objects)
         finally:
             self.progress_bar.end()
             for registered_handlers in handlers:
@@ -674,6 +686,37 @@ class Flow(ABC):
                 for record in warning_handler.warnings.values():
                     warn(f"{record}")
 
+    def _with_step_cache_metrics(self, state: State, step_objects: List[Step]) -> State:
+        """
+        :returns: ``state`` with the number of steps restored from the step
+            cache and the number of steps that were not as the metrics
+            ``flow__step_cache__hit__count`` and ``flow__step_cache__miss__count``,
+            or ``state`` itself if no step looked up the cache.
+        """
+        looked_up = [step for step in step_objects if step.cache_hit is not None]
+        if len(looked_up) == 0:
+            return state
+        hits = len([step for step in looked_up if step.cache_hit])
+        metrics = GenericImmutableDict(
+            state.metrics,
+            overrides={
+                "flow__step_cache__hit__count": hits,
+                "flow__step_cache__miss__count": len(looked_up) - hits,
+            },
+        )
+        return state.__class__(state, metrics=metrics)
+
+    def _summarize_step_cache(self, step_objects: List[Step]):
+        assert self.run_dir is not None
+        looked_up = [step for step in step_objects if step.cache_hit is not None]
+        if len(looked_up) == 0:
+            return
+        hits = [step.id for step in looked_up if step.cache_hit]
+        misses = [step.id for step in looked_up if not step.cache_hit]
+        info(f"Step cache: {len(hits)} hit(s), {len(misses)} miss(es).")
+        with open(os.path.join(self.run_dir, "step_cache.json"), "w") as f:
+            json.dump({"hits": hits, "misses": misses}, f, indent=4)
+
     @protected
     @abstractmethod
     def run(
@@ -787,6 +830,7 @@ class Flow(ABC):
 
         # 1. Copy Files
         last_state.validate()
+        last_state.materialize()
         info(
             f"Saving views in the Efabless/Caravel User Project format to '{os.path.abspath(path)}'…"
         )
@@ -971,15 +1015,26 @@ class Flow(ABC):
             """
             Retrieves a Flow type from the registry using a lookup string.
 
+            Plugins are imported the first time a flow is not found.
+
             :param name: The registered name of the Flow. Case-sensitive.
             """
+            if found := Self.__registry.get(name):
+                return found
+            from ..plugins import load_plugins
+
+            load_plugins()
             return Self.__registry.get(name)
 
         @classmethod
         def list(Self) -> List[str]:
             """
-            :returns: A list of strings representing all registered flows.
+            :returns: A list of strings representing all registered flows,
+                including those of plugins.
             """
+            from ..plugins import load_plugins
+
+            load_plugins()
             return list(Self.__registry.keys())
 
     factory = FlowFactory
@@ -343,6 +343,7 @@ class SequentialFlow(Flow):
         assert self.run_dir is not None
         debug(f"Run concluded ▶ '{self.run_dir}'")
         final_views_path = os.path.join(self.run_dir, "final")
+        current_state = self._with_step_cache_metrics(current_state, step_list)
         try:
             current_state.save_snapshot(final_views_path)
         except Exception as e:
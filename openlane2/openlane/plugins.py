@@ -13,9 +13,33 @@
 # limitations under the License.
 import pkgutil
 import importlib
+import threading
+from types import ModuleType
+from typing import Any, Dict, Optional
 
-discovered_plugins = {
-    name: importlib.import_module(name)
-    for finder, name, ispkg in pkgutil.iter_modules()
-    if name.startswith("openlane_plugin_")
-}
+_discovered_plugins: Optional[Dict[str, ModuleType]] = None
+_lock = threading.RLock()
+
+
+def load_plugins() -> Dict[str, ModuleType]:
+    """
+    Finds and imports every ``openlane_plugin_*`` module on ``sys.path``.
+    Plugins are only searched for once, the first time this is called (or
+    ``discovered_plugins`` is accessed).
+
+    :returns: The imported plugins by module name.
+    """
+    global _discovered_plugins
+    with _lock:
+        if _discovered_plugins is None:
+            _discovered_plugins = {}
+            for _, name, _ in pkgutil.iter_modules():
+                if name.startswith("openlane_plugin_"):
+                    _discovered_plugins[name] = importlib.import_module(name)
+        return _discovered_plugins
+
+
+def __getattr__(name: str) -> Any:
+    if name == "discovered_plugins":
+        return load_plugins()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
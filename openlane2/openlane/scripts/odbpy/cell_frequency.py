@@ -40,9 +40,6 @@ def main(
     buffer_list,
     reader: OdbReader,
 ):
-    db = reader.db
-    block = db.getChip().getBlock()
-
     pattern = r"^(\S+)__(\S+)_\d+"
     compiled_pattern = re.compile(pattern)
 
@@ -68,10 +65,11 @@ def main(
         title="Buffers by Cell Master",
     )
 
-    cells = [instance.getMaster().getName() for instance in block.getInsts()]
-    buffers = open(buffer_list).read().split()
-    buffer_frequency = Counter([cell for cell in cells if cell in buffers])
-    cell_frequency = Counter(cells)
+    cell_frequency = reader.master_counts
+    buffers = set(open(buffer_list).read().split())
+    buffer_frequency = Counter(
+        {cell: count for cell, count in cell_frequency.items() if cell in buffers}
+    )
     scl_frequency = Counter()
     cell_fn_frequency = Counter()
 
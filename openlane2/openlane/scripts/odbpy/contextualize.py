@@ -45,9 +45,7 @@ def contextualize(reader, top_def, top_lef, keep_inner_connections):
     MACRO_TOP_PLACEMENT_X = 0
     MACRO_TOP_PLACEMENT_Y = 0
 
-    assert macro.name in [
-        inst.getMaster().getName() for inst in top.block.getInsts()
-    ], "%s not found in %s" % (macro.name, top.name)
+    assert macro.name in top.master_counts, f"{macro.name} not found in {top.name}"
 
     for net in nets_top:
         iterms = net.getITerms()  # asssumption: no pins (bterms) on top level
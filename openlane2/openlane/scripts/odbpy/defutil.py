@@ -44,6 +44,16 @@ def mark_component_fixed(cell_name, reader):
 cli.add_command(mark_component_fixed)
 
 
+@click.command("write_views")
+@click_odb
+def write_views(reader):
+    # The views are written by click_odb
+    pass
+
+
+cli.add_command(write_views)
+
+
 def get_die_area(def_file, input_lefs):
     die_area_dbu = (-1, -1, -1, -1)
     db = odb.dbDatabase.create()
@@ -56,7 +56,7 @@ class DiodeInserter:
         self.diode_site = self.diode_master.getSite().getConstName()
 
         self.inserted = {}
-        self.insts_by_name = {i.getName(): i for i in self.block.getInsts()}
+        self.insts_by_name = reader.instances_by_name
 
     def debug(self, msg):
         if self.verbose:
@@ -239,6 +239,7 @@ class DiodeInserter:
             diode_inst_name = f"{base_diode_inst_name}_{counter}"
 
         diode_inst = odb.dbInst_create(self.block, self.diode_master, diode_inst_name)
+        self.insts_by_name[diode_inst_name] = diode_inst
 
         diode_inst.setOrient(do)
         diode_inst.setLocation(dx, dy)
@@ -13,7 +13,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import re
-import pprint
 from collections import namedtuple
 
 from reader import click_odb, click
@@ -36,10 +35,6 @@ def main(reader, corner, checks_report):
     Net = namedtuple("Net", "name bterms")
     BTerm = namedtuple("BTerm", "name type")
 
-    db = reader.db
-    block = db.getChip().getBlock()
-    nets = block.getNets()
-
     report_content = []
     with open(checks_report, "r") as f:
         report_content = f.readlines()
@@ -52,7 +47,7 @@ def main(reader, corner, checks_report):
     end_index = report_content.index(annotation_report_end, start_index)
 
     print("Unannotated report:")
-    pprint.pprint(report_content[start_index:end_index])
+    print("".join(report_content[start_index:end_index]), end="")
 
     # Sample report:
     # Found 324 unannotated drivers.
@@ -72,8 +67,8 @@ def main(reader, corner, checks_report):
         for line in report_content[start_index:end_index]
         if re.match(r" \S+", line)
     ]
-    print("Reported nets:")
-    pprint.pprint(reported_nets)
+    # Each net is looked up once, in report order
+    nets = [reader.nets_by_name.get(name) for name in dict.fromkeys(reported_nets)]
     connected_nets = [
         Net(
             name=net.getName(),
@@ -82,10 +77,11 @@ def main(reader, corner, checks_report):
             ],
         )
         for net in nets
-        if (net.getName() in reported_nets) and filter_net(net)
+        if net is not None and filter_net(net)
     ]
     print("Filtered nets:")
-    pprint.pprint(connected_nets)
+    for net in connected_nets:
+        print(f" {net}")
     utl.metric_integer(
         f"timing__unannotated_net__count__corner:{corner}", len(reported_nets)
     )
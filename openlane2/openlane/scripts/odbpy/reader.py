@@ -15,6 +15,7 @@
 import odb
 from openroad import Tech, Design
 
+import os
 import re
 import sys
 import json
@@ -23,7 +24,8 @@ import inspect
 import functools
 from decimal import Decimal
 from fnmatch import fnmatch
-from typing import Callable, Dict
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Union
 
 # -- START: Environment Fixes
 try:
@@ -49,6 +51,19 @@ write_fn: Dict[str, Callable] = {
 }
 auto_handled_output_opts = [f"output_{key}" for key in write_fn]
 
+# Set by session.py: the ODB file (path, size and modification time) that the
+# database still loaded from the previous job was written to
+resident_db: Optional[List[Union[str, int]]] = None
+
+
+def file_fingerprint(path: str) -> Optional[List[Union[str, int]]]:
+    path = os.path.abspath(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [path, stat.st_size, stat.st_mtime_ns]
+
 
 class OdbReader(object):
     def __init__(self, *args, **kwargs):
@@ -57,8 +72,15 @@ class OdbReader(object):
 
         if len(args) == 1:
             db_in = args[0]
-            self.design.readDb(db_in)
+            if resident_db is None:
+                self.design.readDb(db_in)
+            elif file_fingerprint(db_in) != resident_db:
+                raise RuntimeError(
+                    f"A different database than '{db_in}' is already loaded."
+                )
         elif len(args) == 2:
+            if resident_db is not None:
+                raise RuntimeError("A database is already loaded.")
             lef_in, def_in = args
             if not (isinstance(lef_in, list) or isinstance(lef_in, tuple)):
                 lef_in = [lef_in]
@@ -93,6 +115,26 @@ class OdbReader(object):
         # dividerchar = re.escape("/")  # TODO: Get alternatives from LEF parser
         self.escape_verilog_rx = re.compile(rf"([{busbitchars}])")
 
+    # Indices of the block, built on first use: scripts should use these
+    # instead of searching block.getNets()/getInsts() for each lookup. Objects
+    # created or destroyed afterwards are not reflected unless the script
+    # updates the index itself.
+
+    @functools.cached_property
+    def nets_by_name(self) -> Dict[str, odb.dbNet]:
+        return {net.getName(): net for net in self.block.getNets()}
+
+    @functools.cached_property
+    def instances_by_name(self) -> Dict[str, odb.dbInst]:
+        return {instance.getName(): instance for instance in self.instances}
+
+    @functools.cached_property
+    def master_counts(self) -> Counter:
+        """
+        The number of instances of each master in the block, by master name.
+        """
+        return Counter(instance.getMaster().getName() for instance in self.instances)
+
     def add_lef(self, new_lef):
         self.ord_tech.readLef(new_lef)
 
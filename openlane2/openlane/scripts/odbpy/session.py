@@ -0,0 +1,160 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A long-lived `openroad -python` process that runs the other scripts in this
+# directory as jobs. The database a job writes stays loaded, and the next job
+# reads it from memory instead of from the ODB file if that file is unchanged,
+# so a chain of Odb steps only reads the design once.
+#
+# Jobs are read from stdin, one JSON object per line:
+#
+#   {"script": "/path/to/io_place.py", "args": [...], "cwd": "...",
+#    "env": {...}, "output": "...", "metrics": "..." or null}
+#
+# While a job runs, its stdout and stderr (including the OpenROAD log) go to
+# "output" and its metrics to "metrics". When it is done, a line with
+# "%OL_SESSION" and {"returncode": N, "resident": [path, size, mtime] or null}
+# is written to the original stdout, where "resident" is the ODB file the
+# loaded database matches. If it is null, the session exits, as a database
+# that is not saved anywhere cannot be reused or replaced by another one.
+#
+# The session starts by writing {"metrics": true/false}: whether the
+# metrics of a job can be written (utl.open_metrics), without which it cannot
+# stand in for a separate process. It exits at the end of stdin.
+import os
+import sys
+import json
+import ctypes
+import traceback
+import importlib.util
+
+import utl
+import click
+
+import reader
+
+REPLY_PREFIX = "%OL_SESSION "
+
+libc = ctypes.CDLL(None)
+commands = {}
+
+
+def load_command(script) -> click.Command:
+    if script not in commands:
+        name = os.path.splitext(os.path.basename(script))[0]
+        spec = importlib.util.spec_from_file_location(f"session_{name}", script)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        defined = [
+            value
+            for value in vars(module).values()
+            if isinstance(value, click.Command)
+            and value.callback.__module__ == module.__name__
+        ]
+        subcommands = {
+            id(subcommand)
+            for group in defined
+            if isinstance(group, click.Group)
+            for subcommand in group.commands.values()
+        }
+        roots = [command for command in defined if id(command) not in subcommands]
+        if len(roots) != 1:
+            raise ValueError(f"'{script}' does not define exactly one entry point.")
+        commands[script] = roots[0]
+    return commands[script]
+
+
+def flush():
+    sys.stdout.flush()
+    sys.stderr.flush()
+    libc.fflush(None)
+
+
+def output_odb(job):
+    args = job["args"]
+    if "--output-odb" in args:
+        return os.path.join(job["cwd"], args[args.index("--output-odb") + 1])
+    return None
+
+
+def run_job(job) -> int:
+    flush()
+    saved_fds = os.dup(1), os.dup(2)
+    output_fd = os.open(job["output"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    os.dup2(output_fd, 1)
+    os.dup2(output_fd, 2)
+    os.close(output_fd)
+    cwd = os.getcwd()
+    saved_env = os.environ.copy()
+    if metrics := job["metrics"]:
+        utl.open_metrics(metrics)
+    try:
+        os.chdir(job["cwd"])
+        os.environ.clear()
+        os.environ.update(job["env"])
+        command = load_command(job["script"])
+        command.main(args=job["args"], standalone_mode=False)
+        return 0
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    except click.ClickException as e:
+        e.show()
+        return e.exit_code
+    except Exception:
+        traceback.print_exc()
+        return 1
+    finally:
+        if metrics:
+            utl.close_metrics(metrics)
+        flush()
+        os.environ.clear()
+        os.environ.update(saved_env)
+        os.chdir(cwd)
+        os.dup2(saved_fds[0], 1)
+        os.dup2(saved_fds[1], 2)
+        for fd in saved_fds:
+            os.close(fd)
+
+
+def reply(control, message):
+    control.write(REPLY_PREFIX + json.dumps(message) + "\n")
+    control.flush()
+
+
+def main():
+    # Replies go to the original stdout, which jobs never write to
+    control = os.fdopen(os.dup(1), "w")
+    metrics_supported = hasattr(utl, "open_metrics") and hasattr(utl, "close_metrics")
+    reply(control, {"metrics": metrics_supported})
+    for line in sys.stdin:
+        if line.strip() == "":
+            continue
+        job = json.loads(line)
+        returncode = run_job(job)
+        resident = None
+        if returncode == 0 and (odb := output_odb(job)) is not None:
+            resident = reader.file_fingerprint(odb)
+        reader.resident_db = resident
+        reply(control, {"returncode": returncode, "resident": resident})
+        if resident is None:
+            break
+
+
+if __name__ == "__main__":
+    main()
@@ -153,20 +153,31 @@ proc read_timing_info {args} {
         return
     }
     set corner_name $::env(_CURRENT_CORNER_NAME)
-    define_corners $corner_name
 
-    puts "Reading timing models for corner $corner_name…"
+    # A persistent STA session (sta/session.tcl) keeps the libraries of its
+    # corner loaded between jobs
+    if { [info exists ::_ol_session_corner] && $::_ol_session_corner == $corner_name } {
+        puts "Reusing timing models for corner $corner_name…"
+    } else {
+        define_corners $corner_name
 
-    foreach lib $::env(_CURRENT_CORNER_LIBS) {
-        puts "Reading cell library for the '$corner_name' corner at '$lib'…"
-        read_liberty -corner $corner_name $lib
-    }
+        puts "Reading timing models for corner $corner_name…"
 
-    if { [info exists ::env(EXTRA_LIBS) ] } {
-        puts "Reading explicitly-specified extra libs for $corner_name…"
-        foreach extra_lib $::env(EXTRA_LIBS) {
-            puts "Reading extra timing library for the '$corner_name' corner at '$extra_lib'…"
-            read_liberty -corner $corner_name $extra_lib
+        foreach lib $::env(_CURRENT_CORNER_LIBS) {
+            puts "Reading cell library for the '$corner_name' corner at '$lib'…"
+            read_liberty -corner $corner_name $lib
+        }
+
+        if { [info exists ::env(EXTRA_LIBS) ] } {
+            puts "Reading explicitly-specified extra libs for $corner_name…"
+            foreach extra_lib $::env(EXTRA_LIBS) {
+                puts "Reading extra timing library for the '$corner_name' corner at '$extra_lib'…"
+                read_liberty -corner $corner_name $extra_lib
+            }
+        }
+
+        if { [info exists ::_ol_session_corner] } {
+            set ::_ol_session_corner $corner_name
         }
     }
 
@@ -55,26 +55,26 @@ puts "\n========================================================================
 puts "report_checks -path_delay max (Setup) -group_count 10"
 puts "============================================================================"
 puts "======================= [$corner name] Corner ===================================\n"
-report_checks -sort_by_slack -path_delay max -fields {slew cap input nets fanout} -format full_clock_expanded -group_count 10 -corner [$corner name]
+report_checks -sort_by_slack -path_delay max -fields $::env(STA_REPORT_FIELDS) -format $::env(STA_REPORT_FORMAT) -group_count 10 -corner [$corner name]
 puts ""
 puts "%OL_END_REPORT"
 
 puts "%OL_CREATE_REPORT min.rpt"
 puts "\n==========================================================================="
-puts "report_checks -path_delay min (Hold)"
+puts "report_checks -path_delay min (Hold) -group_count $::env(STA_HOLD_REPORT_GROUP_COUNT)"
 puts "============================================================================"
 puts "======================= [$corner name] Corner ===================================\n"
-report_checks -sort_by_slack -path_delay min -fields {slew cap input nets fanout} -format full_clock_expanded -group_count 1000 -corner [$corner name]
+report_checks -sort_by_slack -path_delay min -fields $::env(STA_REPORT_FIELDS) -format $::env(STA_REPORT_FORMAT) -group_count $::env(STA_HOLD_REPORT_GROUP_COUNT) -endpoint_count $::env(STA_REPORT_ENDPOINT_COUNT) -corner [$corner name]
 puts ""
 puts "%OL_END_REPORT"
 
 
 puts "%OL_CREATE_REPORT max.rpt"
 puts "\n==========================================================================="
-puts "report_checks -path_delay max (Setup)"
+puts "report_checks -path_delay max (Setup) -group_count $::env(STA_SETUP_REPORT_GROUP_COUNT)"
 puts "============================================================================"
 puts "======================= [$corner name] Corner ===================================\n"
-report_checks -sort_by_slack -path_delay max -fields {slew cap input nets fanout} -format full_clock_expanded -group_count 1000000 -corner [$corner name]
+report_checks -sort_by_slack -path_delay max -fields $::env(STA_REPORT_FIELDS) -format $::env(STA_REPORT_FORMAT) -group_count $::env(STA_SETUP_REPORT_GROUP_COUNT) -endpoint_count $::env(STA_REPORT_ENDPOINT_COUNT) -corner [$corner name]
 puts ""
 puts "%OL_END_REPORT"
 
@@ -84,7 +84,7 @@ puts "\n========================================================================
 puts "report_checks -unconstrained"
 puts "==========================================================================="
 puts "======================= [$corner name] Corner ===================================\n"
-report_checks -unconstrained -fields {slew cap input nets fanout} -format full_clock_expanded -corner [$corner name]
+report_checks -unconstrained -fields $::env(STA_REPORT_FIELDS) -format $::env(STA_REPORT_FORMAT) -corner [$corner name]
 puts ""
 
 
@@ -92,7 +92,7 @@ puts "\n========================================================================
 puts "report_checks --slack_max -0.01"
 puts "============================================================================"
 puts "======================= [$corner name] Corner ===================================\n"
-report_checks -slack_max -0.01 -fields {slew cap input nets fanout} -format full_clock_expanded -corner [$corner name]
+report_checks -slack_max -0.01 -fields $::env(STA_REPORT_FIELDS) -format $::env(STA_REPORT_FORMAT) -corner [$corner name]
 puts ""
 
 puts "\n==========================================================================="
@@ -347,6 +347,49 @@ write_metric_num "timing__setup_r2r__ws__corner:[$corner name]" $worst_r2r_setup
 write_metric_int "timing__setup_r2r_vio__count__corner:[$corner name]" $r2r_setup_vios
 puts "%OL_END_REPORT"
 
+if { [info exists ::env(STA_ENDPOINT_SLACK_REPORT)] } {
+    # The paths of max.rpt and min.rpt, one row each, for consumers that only
+    # need the slack between two points
+    set report_format $::env(STA_ENDPOINT_SLACK_REPORT)
+    puts "%OL_CREATE_REPORT endpoint_slack.$report_format"
+    if { $report_format == "csv" } {
+        puts "check,kind,startpoint,endpoint,slack"
+    } else {
+        puts "\["
+    }
+    set rows [list]
+    foreach {check path_delay group_count} [list \
+        setup max $::env(STA_SETUP_REPORT_GROUP_COUNT) \
+        hold min $::env(STA_HOLD_REPORT_GROUP_COUNT) \
+    ] {
+        set paths [find_timing_paths -path_delay $path_delay -sort_by_slack -group_count $group_count -endpoint_count $::env(STA_REPORT_ENDPOINT_COUNT)]
+        foreach path $paths {
+            set start_pin [get_property $path startpoint]
+            set end_pin [get_property $path endpoint]
+            set kind [get_path_kind $start_pin $end_pin]
+            set start_name [get_property $start_pin full_name]
+            set end_name [get_property $end_pin full_name]
+            set slack [get_property $path slack]
+            if { $report_format == "csv" } {
+                set start_name [string map {\" \"\"} $start_name]
+                set end_name [string map {\" \"\"} $end_name]
+                lappend rows "$check,$kind,\"$start_name\",\"$end_name\",$slack"
+            } else {
+                set start_name [string map {\\ \\\\ \" \\\"} $start_name]
+                set end_name [string map {\\ \\\\ \" \\\"} $end_name]
+                lappend rows "  {\"check\": \"$check\", \"kind\": \"$kind\", \"startpoint\": \"$start_name\", \"endpoint\": \"$end_name\", \"slack\": $slack}"
+            }
+        }
+    }
+    if { $report_format == "csv" } {
+        puts [join $rows "\n"]
+    } else {
+        puts [join $rows ",\n"]
+        puts "\]"
+    }
+    puts "%OL_END_REPORT"
+}
+
 puts "%OL_CREATE_REPORT unpropagated.rpt"
 
 foreach clock [all_clocks] {
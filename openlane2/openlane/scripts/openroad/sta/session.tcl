@@ -0,0 +1,85 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A long-lived OpenSTA process that runs STA scripts (usually corner.tcl) as
+# jobs, so the cell libraries of its corner are only read once.
+#
+# Jobs are read from stdin, one Tcl list per line:
+#
+#   script output cwd {NAME value NAME value …}
+#
+# The environment of a job replaces ::env entirely. While a job runs, its
+# output (puts and reports alike) goes to "output", including the usual
+# %OL_METRIC and %OL_CREATE_REPORT lines. As stderr is merged into stdout for
+# a regular subprocess, "puts stderr" goes to "output" too. When it is done,
+# {"returncode": N} is written to stdout. The session exits at the end of
+# stdin.
+
+set ::_ol_session_corner ""
+
+# Scripts call exit on errors: end the job instead of the session
+rename exit _ol_exit
+proc exit {{code 0}} {
+    return -code error -errorcode [list OL_EXIT $code] "exit $code"
+}
+
+set ::_ol_in_job 0
+
+rename puts _ol_puts
+proc puts {args} {
+    # Outside of jobs, stdout only carries replies and stderr is discarded
+    if { $::_ol_in_job && [llength $args] >= 2 \
+            && [lindex $args end-1] == "stderr" } {
+        set args [lreplace $args end-1 end-1]
+    }
+    uplevel 1 [list _ol_puts {*}$args]
+}
+
+proc _ol_run_job {script output cwd environment} {
+    foreach name [array names ::env] {
+        if { ![dict exists $environment $name] } {
+            unset ::env($name)
+        }
+    }
+    array set ::env $environment
+
+    set saved_cwd [pwd]
+    cd $cwd
+    sta::redirect_file_begin $output
+    set ::_ol_in_job 1
+    set code [catch {uplevel #0 [list source $script]} result options]
+    if { $code == 0 } {
+        set returncode 0
+    } elseif { [lindex [dict get $options -errorcode] 0] == "OL_EXIT" } {
+        set returncode [lindex [dict get $options -errorcode] 1]
+    } else {
+        puts [dict get $options -errorinfo]
+        set returncode 1
+    }
+    set ::_ol_in_job 0
+    sta::redirect_file_end
+    cd $saved_cwd
+    return $returncode
+}
+
+while { [gets stdin line] >= 0 } {
+    if { [string trim $line] == "" } {
+        continue
+    }
+    set returncode [_ol_run_job {*}$line]
+    puts "{\"returncode\": $returncode}"
+    flush stdout
+}
+
+_ol_exit 0
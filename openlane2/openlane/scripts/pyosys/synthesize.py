@@ -142,10 +142,20 @@ def openlane_opt(
 
 
 def openlane_synth(
-    d, top, flatten, report_dir, *, booth=False, abc_dff=False, undriven=True
+    d,
+    top,
+    flatten,
+    report_dir,
+    *,
+    booth=False,
+    abc_dff=False,
+    undriven=True,
+    elaborated_json=None,
 ):
     d.run_pass("hierarchy", "-check", "-top", top, "-nokeep_prints", "-nokeep_asserts")
     openlane_proc(d, report_dir)
+    if elaborated_json is not None:
+        d.run_pass("write_json", elaborated_json)
 
     if flatten:
         d.run_pass("flatten")  # Flatten the design hierarchy
@@ -214,12 +224,19 @@ def openlane_synth(
 @click.option("--config-in", type=click.Path(exists=True), required=True)
 @click.option("--extra-in", type=click.Path(exists=True), required=True)
 @click.option("--lighter-dff-map", type=click.Path(exists=True), required=False)
+@click.option(
+    "--elaborated-json",
+    type=click.Path(exists=False, dir_okay=False),
+    required=False,
+    help="Also write the design after elaboration (hierarchy, proc) as a JSON netlist",
+)
 @click.argument("inputs", nargs=-1)
 def synthesize(
     output,
     config_in,
     extra_in,
     lighter_dff_map,
+    elaborated_json,
     inputs,
 ):
     config = json.load(open(config_in))
@@ -308,6 +325,8 @@ def synthesize(
 
     if config["SYNTH_ELABORATE_ONLY"]:
         openlane_proc(d, report_dir)
+        if elaborated_json is not None:
+            d.run_pass("write_json", elaborated_json)
         if config["SYNTH_ELABORATE_FLATTEN"]:
             d.run_pass("flatten")
         d.run_pass("setattr", "-set", "keep", "1")
@@ -354,6 +373,7 @@ def synthesize(
         booth=config["SYNTH_MUL_BOOTH"],
         abc_dff=config["SYNTH_ABC_DFF"],
         undriven=config.get("SYNTH_TIE_UNDEFINED") is not None,
+        elaborated_json=elaborated_json,
     )
 
     d.run_pass("delete", "t:$print")
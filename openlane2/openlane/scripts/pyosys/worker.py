@@ -0,0 +1,113 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A long-lived pyosys process that runs the other scripts in this directory as
+# jobs, so the interpreter, the script imports and the black-box models are
+# only loaded once.
+#
+# Jobs are read from stdin, one JSON object per line:
+#
+#   {"script": "/path/to/synthesize.py", "args": [...], "cwd": "...", "output": "..."}
+#
+# While a job runs, its stdout and stderr (including the Yosys log) go to
+# "output". When it is done, {"returncode": N} is written to the original
+# stdout. The worker exits at the end of stdin.
+import os
+import sys
+import json
+import ctypes
+import traceback
+import importlib.util
+
+import click
+
+import ys_common
+
+libc = ctypes.CDLL(None)
+modules = {}
+
+
+def load_command(script) -> click.Command:
+    if script not in modules:
+        name = os.path.splitext(os.path.basename(script))[0]
+        spec = importlib.util.spec_from_file_location(f"worker_{name}", script)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        commands = [
+            value
+            for value in vars(module).values()
+            if isinstance(value, click.Command)
+            and value.callback.__module__ == module.__name__
+        ]
+        if len(commands) != 1:
+            raise ValueError(f"'{script}' does not define exactly one command.")
+        modules[script] = commands[0]
+    return modules[script]
+
+
+def flush():
+    sys.stdout.flush()
+    sys.stderr.flush()
+    libc.fflush(None)
+
+
+def run_job(job) -> int:
+    flush()
+    saved_fds = os.dup(1), os.dup(2)
+    output_fd = os.open(job["output"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    os.dup2(output_fd, 1)
+    os.dup2(output_fd, 2)
+    os.close(output_fd)
+    cwd = os.getcwd()
+    try:
+        os.chdir(job["cwd"])
+        command = load_command(job["script"])
+        command.main(args=job["args"], standalone_mode=False)
+        return 0
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    except click.ClickException as e:
+        e.show()
+        return e.exit_code
+    except Exception:
+        traceback.print_exc()
+        return 1
+    finally:
+        flush()
+        os.chdir(cwd)
+        os.dup2(saved_fds[0], 1)
+        os.dup2(saved_fds[1], 2)
+        for fd in saved_fds:
+            os.close(fd)
+
+
+def main():
+    # Replies go to the original stdout, which jobs never write to
+    control = os.fdopen(os.dup(1), "w")
+    ys_common.enable_resident_blackbox_models()
+    for line in sys.stdin:
+        if line.strip() == "":
+            continue
+        returncode = run_job(json.loads(line))
+        control.write(json.dumps({"returncode": returncode}) + "\n")
+        control.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,9 @@
 # limitations under the License.
 import os
 import sys
-from typing import Iterable, List, Union
+import json
+import hashlib
+from typing import Iterable, List, Optional, Set, Union
 
 try:
     import libyosys as ys
@@ -112,6 +114,30 @@ def _Design_read_verilog_files(
 ys.Design.read_verilog_files = _Design_read_verilog_files  # type: ignore
 
 
+# Names of the black-box model sets kept with ``design -save``, or None if
+# they are not kept. Only enabled in long-lived processes (see worker.py).
+_resident_blackbox_models: Optional[Set[str]] = None
+
+
+def enable_resident_blackbox_models():
+    global _resident_blackbox_models
+    if _resident_blackbox_models is None:
+        _resident_blackbox_models = set()
+
+
+def _blackbox_models_key(
+    models: List[str],
+    includes: List[str],
+    defines: List[str],
+) -> str:
+    files = []
+    for model in models:
+        stat = os.stat(model)
+        files.append([model, stat.st_size, stat.st_mtime_ns])
+    digest = hashlib.sha256(json.dumps([files, includes, defines]).encode("utf8"))
+    return f"openlane_blackbox_models_{digest.hexdigest()}"
+
+
 def _Design_add_blackbox_models(
     self,
     models: Iterable[str],
@@ -119,6 +145,22 @@ def _Design_add_blackbox_models(
     includes: Iterable[str],
     defines: Iterable[str],
 ):
+    """
+    Reads the black-box models into the design, which must be empty.
+
+    In long-lived processes, every set of models is only read once and
+    copied from a saved design afterwards.
+    """
+    models = list(models)
+    includes = list(includes)
+    defines = list(defines)
+    key = None
+    if _resident_blackbox_models is not None:
+        key = _blackbox_models_key(models, includes, defines)
+        if key in _resident_blackbox_models:
+            self.run_pass("design", "-load", key)
+            return
+
     include_args = [f"-I{dir}" for dir in includes]
     define_args = [f"-D{define}" for define in defines]
 
@@ -149,5 +191,9 @@ def _Design_add_blackbox_models(
             sys.stderr.flush()
             exit(-1)
 
+    if key is not None:
+        self.run_pass("design", "-save", key)
+        _resident_blackbox_models.add(key)
+
 
 ys.Design.add_blackbox_models = _Design_add_blackbox_models  # type: ignore
@@ -0,0 +1,124 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Views that are only written when they are needed.
+
+A step may add a view to its state without writing it if the view can be
+derived from another file, e.g. a DEF view from the ODB view written alongside
+it. A marker file next to the view, ``<view>.deferred.json``, records the file
+it is derived from and the function that derives it, so the view can be
+written later by any process: :meth:`openlane.state.State.materialize` writes
+the deferred views of a state, which is done for the inputs of every step and
+before a snapshot is saved.
+
+Markers are kept once their view has been written, so a view is identified by
+its source (e.g. for :mod:`openlane.steps.step_cache`) whether or not it has
+been written yet.
+
+:meta private:
+"""
+import os
+import json
+import importlib
+import threading
+from typing import Callable, Optional, Tuple, Union
+
+from ..common import Path
+
+MARKER_SUFFIX = ".deferred.json"
+
+_lock = threading.Lock()
+
+
+def defer(
+    path: Union[str, os.PathLike],
+    source: Union[str, os.PathLike],
+    derive: str,
+) -> Path:
+    """
+    Marks a view as derivable from another file. A stale file at the view's
+    path (e.g. from an earlier run in the same directory) is removed.
+
+    :param path: The path of the view once written.
+    :param source: The file the view is derived from.
+    :param derive: The ``module:function`` name of a function that takes the
+        source and the path, in that order, and writes the view.
+    :returns: The view's path.
+    """
+    path = os.path.abspath(path)
+    directory = os.path.dirname(path)
+    with open(path + MARKER_SUFFIX, "w", encoding="utf8") as f:
+        json.dump(
+            {
+                "source": os.path.relpath(os.path.abspath(source), directory),
+                "derive": derive,
+            },
+            f,
+        )
+    if os.path.exists(path):
+        os.unlink(path)
+    return Path(path)
+
+
+def derivation(path: Union[str, os.PathLike]) -> Optional[Tuple[str, str]]:
+    """
+    :returns: The source and the ``module:function`` name of the deriver of a
+        deferred view, or ``None`` if the view was never deferred.
+    """
+    path = os.path.abspath(path)
+    try:
+        with open(path + MARKER_SUFFIX, encoding="utf8") as f:
+            marker = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return os.path.join(os.path.dirname(path), marker["source"]), marker["derive"]
+
+
+def _resolve(derive: str) -> Callable[[str, str], None]:
+    module, _, function = derive.partition(":")
+    return getattr(importlib.import_module(module), function)
+
+
+def is_pending(path: Union[str, os.PathLike]) -> bool:
+    """
+    :returns: Whether a view is deferred and has not been written yet.
+    """
+    return not os.path.exists(path) and derivation(path) is not None
+
+
+def materialize(path: Union[str, os.PathLike]) -> bool:
+    """
+    Writes a deferred view if it has not been written yet. The view is written
+    to a temporary file first, so a view that exists is always complete.
+
+    :returns: Whether the view was written.
+    """
+    with _lock:
+        if not is_pending(path):
+            return False
+        found = derivation(path)
+        assert found is not None
+        source, derive = found
+        if not os.path.exists(source):
+            raise RuntimeError(
+                f"Cannot write deferred view '{path}': '{source}' no longer exists."
+            )
+        partial = f"{path}.partial"
+        try:
+            _resolve(derive)(source, partial)
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.unlink(partial)
+    return True
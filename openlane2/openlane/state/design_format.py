@@ -166,6 +166,11 @@ class DesignFormat(Enum):
         "vh",
         "Verilog Header",
     )
+    ELABORATED_JSON: DesignFormatObject = DesignFormatObject(
+        "elab_json",
+        "elab.json",
+        "Elaborated Design as a Yosys JSON Netlist",
+    )
 
     def __str__(self) -> str:
         return self.value.id
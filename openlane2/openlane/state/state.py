@@ -18,12 +18,13 @@ import sys
 import json
 import shutil
 from decimal import Decimal
-from typing import Callable, List, Mapping, Tuple, Union, Optional, Dict, Any
+from typing import Callable, Iterable, List, Mapping, Tuple, Union, Optional, Dict, Any
 
 from .design_format import (
     DesignFormat,
     DesignFormatObject,
 )
+from . import deferred
 
 from ..common import (
     Path,
@@ -31,7 +32,7 @@ from ..common import (
     mkdirp,
     copy_recursive,
 )
-from ..logging import info
+from ..logging import info, verbose
 
 
 class InvalidState(RuntimeError):
@@ -193,10 +194,31 @@ class State(GenericImmutableDict[str, StateElement]):
                         depth + 1,
                     )
 
+    def materialize(self, formats: Optional[Iterable[DesignFormat]] = None):
+        """
+        Writes the views of this state that were deferred by the step that
+        produced them (see :mod:`openlane.state.deferred`).
+
+        :param formats: The design formats to write. If unset, every deferred
+            view is written.
+        """
+        ids = None
+        if formats is not None:
+            ids = [format.value.id for format in formats]
+
+        def visitor(key, value, top_key, _, depth):
+            if ids is not None and top_key not in ids:
+                return
+            if isinstance(value, Path) and deferred.is_pending(value):
+                verbose(f"Writing deferred view '{os.path.relpath(value)}'…")
+                deferred.materialize(value)
+
+        self._walk(self, "", visitor)
+
     def save_snapshot(self, path: Union[str, os.PathLike]):
         """
-        Validates the current state then saves all views to a folder by
-        design format, including the metrics.
+        Validates the current state, writes its deferred views, then saves all
+        views to a folder by design format, including the metrics.
 
         :param path: The folder that would contain other folders.
         """
@@ -209,6 +231,7 @@ class State(GenericImmutableDict[str, StateElement]):
             shutil.copyfile(value, target_path, follow_symlinks=True)
 
         self.validate()
+        self.materialize()
         info(f"Saving views to '{os.path.abspath(path)}'…")
         mkdirp(path)
         self._walk(self, path, visitor)
@@ -266,7 +289,11 @@ class State(GenericImmutableDict[str, StateElement]):
                     key_path=current_key_path,
                 )
             else:
-                if validate_path and not os.path.exists(value):
+                if (
+                    validate_path
+                    and not os.path.exists(value)
+                    and deferred.derivation(value) is None
+                ):
                     raise ValueError(
                         f"Provided path '{value}' to design format '{current_key_path}' does not exist."
                     )
@@ -31,31 +31,45 @@ from .step import (
     ViewsUpdate,
 )
 from .tclstep import TclStep
-from . import checker as Checker
 
+import importlib
+from typing import Any
+
+# Tool modules (and their variables) are imported the first time they are
+# used, so importing a single step module or the step API stays cheap.
+#
 # You'll notice some TclStep subclasses are exposed separately-
 # this is for documentation.
-from . import yosys as Yosys
-from .yosys import YosysStep
-
-from .openroad_alerts import (
-    OpenROADAlert,
-    OpenROADOutputProcessor,
-    SupportsOpenROADAlerts,
-)
-
-from . import openroad as OpenROAD
-from .openroad import OpenROADStep
+_lazy_attributes = {
+    "Checker": ("checker", None),
+    "Yosys": ("yosys", None),
+    "YosysStep": ("yosys", "YosysStep"),
+    "OpenROADAlert": ("openroad_alerts", "OpenROADAlert"),
+    "OpenROADOutputProcessor": ("openroad_alerts", "OpenROADOutputProcessor"),
+    "SupportsOpenROADAlerts": ("openroad_alerts", "SupportsOpenROADAlerts"),
+    "OpenROAD": ("openroad", None),
+    "OpenROADStep": ("openroad", "OpenROADStep"),
+    "Odb": ("odb", None),
+    "OdbpyStep": ("odb", "OdbpyStep"),
+    "Magic": ("magic", None),
+    "MagicStep": ("magic", "MagicStep"),
+    "Netgen": ("netgen", None),
+    "NetgenStep": ("netgen", "NetgenStep"),
+    "KLayout": ("klayout", None),
+    "Misc": ("misc", None),
+    "Verilator": ("verilator", None),
+}
 
-from . import odb as Odb
-from .odb import OdbpyStep
 
-from . import magic as Magic
-from .magic import MagicStep
+def __getattr__(name: str) -> Any:
+    if name not in _lazy_attributes:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _lazy_attributes[name]
+    module = importlib.import_module(f".{module_name}", __name__)
+    value = module if attribute is None else getattr(module, attribute)
+    globals()[name] = value
+    return value
 
-from . import netgen as Netgen
-from .netgen import NetgenStep
 
-from . import klayout as KLayout
-from . import misc as Misc
-from . import verilator as Verilator
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_attributes))
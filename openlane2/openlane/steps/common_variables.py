@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from decimal import Decimal
-from typing import Optional, List
+from typing import Literal, Optional, List
 
 from ..config import Variable
 
@@ -338,3 +338,42 @@ rsz_variables = dpl_variables + [
         "A list of fully-qualified IPVT corners to use during resizer optimizations. If unspecified, the value for `STA_CORNERS` from the PDK will be used.",
     ),
 ]
+
+
+sta_report_variables = [
+    Variable(
+        "STA_SETUP_REPORT_GROUP_COUNT",
+        int,
+        "The maximum number of setup paths listed in max.rpt, worst first.",
+        default=1000000,
+    ),
+    Variable(
+        "STA_HOLD_REPORT_GROUP_COUNT",
+        int,
+        "The maximum number of hold paths listed in min.rpt, worst first.",
+        default=1000,
+    ),
+    Variable(
+        "STA_REPORT_ENDPOINT_COUNT",
+        int,
+        "The maximum number of paths listed per endpoint in max.rpt and min.rpt.",
+        default=1,
+    ),
+    Variable(
+        "STA_REPORT_FIELDS",
+        List[str],
+        "The columns added to the paths in the STA path reports, as accepted by `report_checks -fields`.",
+        default=["slew", "cap", "input", "nets", "fanout"],
+    ),
+    Variable(
+        "STA_REPORT_FORMAT",
+        Literal["full", "full_clock", "full_clock_expanded", "short", "end", "summary"],
+        "The format of the paths in the STA path reports, as accepted by `report_checks -format`. Formats other than `full_clock_expanded` omit the details some consumers of max.rpt and min.rpt rely on.",
+        default="full_clock_expanded",
+    ),
+    Variable(
+        "STA_ENDPOINT_SLACK_REPORT",
+        Optional[Literal["json", "csv"]],
+        "If set, also writes the paths of max.rpt and min.rpt as one row per path (check, path kind, startpoint, endpoint and slack) to `endpoint_slack.json` or `endpoint_slack.csv`, within the same limits.",
+    ),
+]
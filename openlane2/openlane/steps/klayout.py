@@ -444,6 +444,7 @@ class OpenGUI(KLayoutStep):
 
     id = "KLayout.OpenGUI"
     name = "Open In GUI"
+    cacheable = False
 
     inputs = [DesignFormat.DEF]
     outputs = []
@@ -519,6 +519,7 @@ class OpenGUI(MagicStep):
 
     id = "Magic.OpenGUI"
     name = "Open In GUI"
+    cacheable = False
 
     inputs = [DesignFormat.DEF]
     outputs = []
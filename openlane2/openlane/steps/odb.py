@@ -15,20 +15,25 @@ import os
 import re
 import json
 import shutil
+import subprocess
 from math import inf
 from decimal import Decimal
 from functools import reduce
 from abc import abstractmethod
 from typing import Dict, List, Literal, Optional, Tuple
 
+import psutil
 
 from .common_variables import io_layer_variables
 from .openroad_alerts import (
     OpenROADAlert,
     OpenROADOutputProcessor,
+    openroad_alert_rx,
 )
 from .openroad import DetailedPlacement, GlobalRouting
 from .tclstep import TclStep
+from . import odb_session
+from .process_stats import ProcessStatsThread
 from .step import (
     ViewsUpdate,
     MetricsUpdate,
@@ -39,12 +44,79 @@ from .step import (
 )
 from ..logging import info, verbose
 from ..config import Variable, Macro, Instance
-from ..state import State, DesignFormat
-from ..common import Path, get_script_dir
+from ..state import State, DesignFormat, deferred
+from ..common import Path, get_script_dir, get_scheduler
 
 inf_rx = re.compile(r"\b(-?)inf\b")
 
 
+def write_def(odb: str, def_out: str):
+    """
+    Writes the DEF view of an ODB file, for the DEF views deferred by
+    :class:`OdbpyStep`. As for the subprocesses of steps, OpenROAD is only
+    started once the global :class:`openlane.common.ResourceScheduler` admits
+    it. Its output is written to ``write_def.log`` and its resource use to
+    ``write_def.process_stats.json`` next to the DEF view, where later runs
+    find them like those of the step that wrote the ODB file.
+    """
+    step_dir = os.path.dirname(os.path.abspath(def_out))
+    env = os.environ.copy()
+    env["PYTHONPATH"] = (
+        f'{os.path.join(get_script_dir(), "odbpy")}:{env.get("PYTHONPATH")}'
+    )
+    cmd = [
+        "openroad",
+        "-exit",
+        "-no_splash",
+        "-python",
+        os.path.join(get_script_dir(), "odbpy", "defutil.py"),
+        "write_views",
+        "--output-def",
+        def_out,
+        odb,
+    ]
+
+    scheduler = get_scheduler()
+    scheduler.estimates.seed(os.path.dirname(step_dir))
+    job = (re.sub(r"^\d+-", "", os.path.basename(step_dir)), "write_def")
+    cpus, memory = scheduler.estimates.get(job)
+
+    log_path = os.path.join(step_dir, "write_def.log")
+    errors: List[str] = []
+    with open(log_path, "w", encoding="utf8") as log, scheduler.reserve(cpus, memory):
+        process = psutil.Popen(
+            cmd,
+            encoding="utf8",
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        process_stats_thread = ProcessStatsThread(process)
+        process_stats_thread.start()
+        assert process.stdout is not None
+        for line in process.stdout:
+            log.write(line)
+            if match := openroad_alert_rx.match(line):
+                if match[1] == "ERROR":
+                    errors.append(line.strip())
+        process_stats_thread.join()
+        returncode = process.wait()
+
+    peaks = process_stats_thread.peak_resources
+    scheduler.estimates.record(
+        job, max(peaks["cpu_percent"] / 100, 1.0), int(peaks["memory_rss"])
+    )
+    with open(os.path.join(step_dir, "write_def.process_stats.json"), "w") as f:
+        json.dump(process_stats_thread.stats_as_dict(), f, indent=4)
+
+    if returncode != 0:
+        reported = "".join(f"\n{error}" for error in errors)
+        raise RuntimeError(
+            f"OpenROAD failed to write '{def_out}' (exit code {returncode}); see '{log_path}'.{reported}"
+        )
+
+
 class OdbpyStep(Step):
     inputs = [DesignFormat.ODB]
     outputs = [DesignFormat.ODB, DesignFormat.DEF]
@@ -70,14 +142,22 @@ class OdbpyStep(Step):
             [DesignFormat.ODB, DesignFormat.DEF]
         )
 
+        # The DEF view is only written if a later step or a snapshot needs it
+        defer_def = (
+            automatic_outputs == {DesignFormat.ODB, DesignFormat.DEF}
+            and self.config.get("ODB_DEFER_DEF", True)
+        )
+
         views_updates: ViewsUpdate = {}
         command = self.get_command()
         for output in automatic_outputs:
             filename = f"{self.config['DESIGN_NAME']}.{output.value.extension}"
             file_path = os.path.join(self.step_dir, filename)
+            views_updates[output] = Path(file_path)
+            if output == DesignFormat.DEF and defer_def:
+                continue
             command.append(f"--output-{output.value.id}")
             command.append(file_path)
-            views_updates[output] = Path(file_path)
 
         command += [
             str(state_in[DesignFormat.ODB]),
@@ -87,12 +167,22 @@ class OdbpyStep(Step):
             f'{os.path.join(get_script_dir(), "odbpy")}:{env.get("PYTHONPATH")}'
         )
 
+        if self.config.get("ODB_PERSISTENT_SESSION"):
+            kwargs["_popen_callable"] = odb_session.popen
+
         subprocess_result = self.run_subprocess(
             command,
             env=env,
             **kwargs,
         )
 
+        if defer_def:
+            views_updates[DesignFormat.DEF] = deferred.defer(
+                views_updates[DesignFormat.DEF],
+                views_updates[DesignFormat.ODB],
+                f"{__name__}:write_def",
+            )
+
         metrics_path = os.path.join(self.step_dir, "or_metrics_out.json")
         metrics_updates: MetricsUpdate = subprocess_result["generated_metrics"]
         if os.path.exists(metrics_path):
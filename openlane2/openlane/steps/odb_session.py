@@ -0,0 +1,243 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Long-lived OpenROAD processes for :class:`openlane.steps.odb.OdbpyStep`.
+
+:func:`popen` takes the place of ``psutil.Popen`` in
+:meth:`openlane.steps.Step.run_subprocess` for ``openroad … -python <script> …
+<input.odb>`` commands: the script is run as a job by a session
+(``scripts/odbpy/session.py``) that keeps the database written by its last job
+loaded. A job whose input is the ODB file written by the previous Odb step is
+given to the session that wrote it, so a chain of Odb steps reads the design
+from disk once. Logs, metrics and process statistics are handled exactly as
+for a regular subprocess.
+
+:meta private:
+"""
+import os
+import json
+import atexit
+import threading
+import subprocess
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import psutil
+
+from .pyosys_worker import WorkerJob
+from ..common import get_script_dir
+
+#: The path, size and modification time (ns) of an ODB file
+Resident = Tuple[str, int, int]
+SessionKey = Tuple[Tuple[str, ...], Optional[Resident]]
+
+REPLY_PREFIX = "%OL_SESSION "
+
+#: The number of idle sessions kept, each of which holds a design in memory
+MAX_IDLE_SESSIONS = 4
+
+
+class OdbSession(object):
+    def __init__(self, flags: Sequence[str], env: Dict[str, str]):
+        self.flags = tuple(flags)
+        self.process = psutil.Popen(
+            [
+                *flags,
+                "-python",
+                os.path.join(get_script_dir(), "odbpy", "session.py"),
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            encoding="utf8",
+            env=env,
+        )
+        self.lock = threading.Lock()
+        self.resident: Optional[Resident] = None
+        hello = self._read_reply()
+        self.supports_metrics = hello is not None and hello["metrics"]
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def _read_reply(self) -> Optional[dict]:
+        # OpenROAD may print to stdout before the session redirects it
+        assert self.process.stdout is not None
+        for line in self.process.stdout:
+            if line.startswith(REPLY_PREFIX):
+                return json.loads(line[len(REPLY_PREFIX) :])
+        return None
+
+    def run(
+        self,
+        script: str,
+        args: List[str],
+        cwd: str,
+        env: Dict[str, str],
+        output: str,
+        metrics: Optional[str],
+    ) -> int:
+        """
+        Runs one job and blocks until it is done.
+
+        :returns: The job's exit code, or -1 if the session died.
+        """
+        assert self.process.stdin is not None
+        with self.lock:
+            self.resident = None
+            job = {
+                "script": script,
+                "args": args,
+                "cwd": cwd,
+                "env": env,
+                "output": output,
+                "metrics": metrics,
+            }
+            try:
+                self.process.stdin.write(json.dumps(job) + "\n")
+                self.process.stdin.flush()
+            except OSError:
+                return -1
+            reply = self._read_reply()
+            if reply is None:
+                return -1
+            if resident := reply["resident"]:
+                self.resident = tuple(resident)
+            return reply["returncode"]
+
+    def close(self):
+        if self.process.stdin is not None:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+_idle_sessions: Dict[SessionKey, OdbSession] = {}
+_all_sessions: List[OdbSession] = []
+_unsupported: Set[Tuple[str, ...]] = set()
+_pool_lock = threading.Lock()
+
+
+def parse_command(
+    cmd: Sequence[str],
+) -> Tuple[List[str], Optional[str], str, List[str]]:
+    """
+    Splits an ``openroad [flags] -python <script> [args]`` command.
+
+    :returns: The flags without ``-metrics <path>``, the metrics path, the
+        script and its arguments.
+    """
+    cmd = [str(arg) for arg in cmd]
+    if "-python" not in cmd or cmd.index("-python") + 1 >= len(cmd):
+        raise ValueError(f"Not an OpenROAD Python script invocation: {cmd}")
+    python_at = cmd.index("-python")
+    flags = cmd[:python_at]
+    metrics = None
+    if "-metrics" in flags:
+        metrics_at = flags.index("-metrics")
+        metrics = flags[metrics_at + 1]
+        del flags[metrics_at : metrics_at + 2]
+    return flags, metrics, cmd[python_at + 1], cmd[python_at + 2 :]
+
+
+def fingerprint(path: str) -> Optional[Resident]:
+    path = os.path.abspath(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (path, stat.st_size, stat.st_mtime_ns)
+
+
+def _acquire(key: SessionKey, env: Dict[str, str]) -> Optional[OdbSession]:
+    with _pool_lock:
+        if key[0] in _unsupported:
+            return None
+        session = _idle_sessions.pop(key, None)
+        if session is not None and session.alive:
+            return session
+    session = OdbSession(key[0], env)
+    if not session.supports_metrics:
+        session.close()
+        with _pool_lock:
+            _unsupported.add(key[0])
+        return None
+    with _pool_lock:
+        _all_sessions.append(session)
+    return session
+
+
+def _release(session: OdbSession):
+    retired = []
+    with _pool_lock:
+        if session.alive and session.resident is not None:
+            key = (session.flags, session.resident)
+            if previous := _idle_sessions.pop(key, None):
+                retired.append(previous)
+            _idle_sessions[key] = session
+            # Dicts keep insertion order, so the first sessions are the least
+            # recently used
+            while len(_idle_sessions) > MAX_IDLE_SESSIONS:
+                retired.append(_idle_sessions.pop(next(iter(_idle_sessions))))
+        else:
+            retired.append(session)
+        for retiree in retired:
+            if retiree in _all_sessions:
+                _all_sessions.remove(retiree)
+    for retiree in retired:
+        retiree.close()
+
+
+@atexit.register
+def shutdown():
+    """Stops all sessions. Jobs that are still running are lost."""
+    with _pool_lock:
+        sessions = list(_all_sessions)
+        _all_sessions.clear()
+        _idle_sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+def popen(cmd: Sequence[str], *, env: Dict[str, str], **kwargs) -> psutil.Popen:
+    """
+    Runs an ``openroad [flags] -python <script> … <input.odb>`` command in a
+    session. If the OpenROAD build cannot write the metrics of a job in a
+    session, the command is run with ``psutil.Popen`` instead.
+    Other keyword arguments (stdin, stdout, …) are accepted for compatibility
+    with ``psutil.Popen`` and ignored.
+    """
+    flags, metrics, script, args = parse_command(cmd)
+    env = {key: os.fsdecode(value) for key, value in env.items()}
+    cwd = str(kwargs.get("cwd") or os.getcwd())
+    key = (tuple(flags), fingerprint(os.path.join(cwd, args[-1])))
+    session = _acquire(key, env)
+    if session is None:
+        return psutil.Popen(cmd, env=env, **kwargs)
+    if stdin := kwargs.get("stdin"):
+        if hasattr(stdin, "close"):
+            stdin.close()
+
+    def run(output: str) -> int:
+        try:
+            return session.run(script, args, cwd, env, output, metrics)
+        finally:
+            _release(session)
+
+    return WorkerJob(session.process.pid, run, prefix="odb-session-")  # type: ignore
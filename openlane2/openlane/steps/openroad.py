@@ -56,6 +56,7 @@ from .openroad_alerts import (
     OpenROADOutputProcessor,
 )
 from .tclstep import TclStep
+from . import sta_session, sta_cache
 from .common_variables import (
     io_layer_variables,
     pdn_variables,
@@ -63,6 +64,7 @@ from .common_variables import (
     dpl_variables,
     grt_variables,
     routing_layer_variables,
+    sta_report_variables,
 )
 
 from ..config import Variable, Macro
@@ -361,6 +363,8 @@ class STAMidPNR(OpenROADStep):
     inputs = [DesignFormat.ODB]
     outputs = []
 
+    config_vars = OpenROADStep.config_vars + sta_report_variables
+
     def get_script_path(self):
         return os.path.join(get_script_dir(), "openroad", "sta", "corner.tcl")
 
@@ -524,29 +528,44 @@ class CheckMacroInstances(OpenSTAStep):
 class MultiCornerSTA(OpenSTAStep):
     outputs = [DesignFormat.SDF, DesignFormat.SDC]
 
-    config_vars = OpenSTAStep.config_vars + [
-        Variable(
-            "STA_MACRO_PRIORITIZE_NL",
-            bool,
-            "Prioritize the use of Netlists + SPEF files over LIB files if available for Macros. Useful if extraction was done using OpenROAD, where SPEF files are far more accurate.",
-            default=True,
-        ),
-        Variable(
-            "STA_MAX_VIOLATOR_COUNT",
-            Optional[int],
-            "Maximum number of violators to list in violator_list.rpt",
-        ),
-        Variable(
-            "EXTRA_SPEFS",
-            Optional[List[Union[str, Path]]],
-            "A variable that only exists for backwards compatibility with OpenLane <2.0.0 and should not be used by new designs.",
-        ),
-        Variable(
-            "STA_THREADS",
-            Optional[int],
-            "The maximum number of STA corners to run in parallel. If unset, this will be equal to your machine's thread count.",
-        ),
-    ]
+    config_vars = (
+        OpenSTAStep.config_vars
+        + sta_report_variables
+        + [
+            Variable(
+                "STA_MACRO_PRIORITIZE_NL",
+                bool,
+                "Prioritize the use of Netlists + SPEF files over LIB files if available for Macros. Useful if extraction was done using OpenROAD, where SPEF files are far more accurate.",
+                default=True,
+            ),
+            Variable(
+                "STA_MAX_VIOLATOR_COUNT",
+                Optional[int],
+                "Maximum number of violators to list in violator_list.rpt",
+            ),
+            Variable(
+                "EXTRA_SPEFS",
+                Optional[List[Union[str, Path]]],
+                "A variable that only exists for backwards compatibility with OpenLane <2.0.0 and should not be used by new designs.",
+            ),
+            Variable(
+                "STA_THREADS",
+                Optional[int],
+                "The maximum number of STA corners to run in parallel. If unset, this will be equal to your machine's thread count.",
+            ),
+            Variable(
+                "STA_PERSISTENT_SESSION",
+                bool,
+                "Run each corner in a long-lived OpenSTA session that keeps the corner's cell libraries loaded, instead of starting OpenSTA every time. Sessions are kept for the lifetime of the OpenLane process and reused by later STA steps for the same corner and libraries, so iterative flows only read the netlist, parasitics and constraints again. Logs, reports and metrics are unchanged.",
+                default=False,
+            ),
+            Variable(
+                "STA_CACHE_DIR",
+                Optional[str],
+                "If set, the results of every corner (metrics, reports and other files) are stored in this directory, keyed by the contents of every input file and the value of every other variable, and a corner with a matching entry is restored from it instead of running STA again.",
+            ),
+        ]
+    )
 
     def get_script_path(self):
         return os.path.join(get_script_dir(), "openroad", "sta", "corner.tcl")
@@ -562,6 +581,10 @@ class MultiCornerSTA(OpenSTAStep):
         current_env["_CURRENT_CORNER_NAME"] = corner
         log_path = os.path.join(corner_dir, "sta.log")
 
+        kwargs = {}
+        if self.config["STA_PERSISTENT_SESSION"]:
+            kwargs["_popen_callable"] = sta_session.popen
+
         try:
             subprocess_result = self.run_subprocess(
                 self.get_command(),
@@ -569,6 +592,7 @@ class MultiCornerSTA(OpenSTAStep):
                 env=current_env,
                 silent=True,
                 report_dir=corner_dir,
+                **kwargs,
             )
 
             generated_metrics = subprocess_result["generated_metrics"]
@@ -580,6 +604,27 @@ class MultiCornerSTA(OpenSTAStep):
 
         return generated_metrics
 
+    def _run_corner_cached(
+        self,
+        state_in: State,
+        current_env: Dict[str, Any],
+        corner: str,
+        corner_dir: str,
+    ) -> Dict[str, Any]:
+        cache_dir = self.config["STA_CACHE_DIR"]
+        if cache_dir is None:
+            return self.run_corner(state_in, current_env, corner, corner_dir)
+
+        key = sta_cache.corner_key(
+            self.id, corner, self.get_command(), current_env, self.step_dir
+        )
+        if (metrics := sta_cache.load(cache_dir, key, corner_dir)) is not None:
+            info(f"Reusing cached STA results for the {corner} timing corner…")
+            return metrics
+        metrics = self.run_corner(state_in, current_env, corner, corner_dir)
+        sta_cache.store(cache_dir, key, corner_dir, metrics)
+        return metrics
+
     def run(self, state_in: State, **kwargs) -> Tuple[ViewsUpdate, MetricsUpdate]:
         kwargs, env = self.extract_env(kwargs)
         env = self.prepare_env(env, state_in)
@@ -610,7 +655,7 @@ class MultiCornerSTA(OpenSTAStep):
             mkdirp(corner_dir)
 
             futures[corner] = tpe.submit(
-                self.run_corner,
+                self._run_corner_cached,
                 state_in,
                 current_env,
                 corner,
@@ -2412,6 +2457,7 @@ class OpenGUI(Step):
 
     id = "OpenROAD.OpenGUI"
     name = "Open In GUI"
+    cacheable = False
 
     inputs = [DesignFormat.ODB]
     outputs = []
@@ -63,6 +63,7 @@ class OpenROADOutputProcessor(OutputProcessor):
     """
 
     key = "openroad_alerts"
+    report_line_prefixes = ("[WARNING", "[ERROR")
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
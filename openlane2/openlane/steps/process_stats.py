@@ -0,0 +1,322 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Resource usage of the subprocesses of steps.
+
+All live subprocesses are sampled by one shared thread. Each subprocess is
+sampled together with every process it has spawned (ABC under Yosys, …), at an
+interval that grows with its runtime, so long runs and many concurrent runs
+cost few samples. If a subprocess runs in a cgroup (v2) of its own, e.g., when
+started through ``systemd-run --scope``, the cgroup's ``memory.peak`` and
+``cpu.stat`` are used as well: they see every peak and every process.
+
+:meta private:
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+import heapq
+import itertools
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import psutil
+
+from ..common import format_size, format_elapsed_time
+from ..common.scheduler import cgroup_dir
+from ..logging import warn
+
+#: The sampling interval of a new subprocess, in seconds
+MIN_INTERVAL = 0.1
+#: The longest sampling interval, in seconds
+MAX_INTERVAL = 2.0
+#: The sampling interval as a fraction of the runtime so far
+INTERVAL_FRACTION = 0.05
+#: The sampling interval once the subprocess is expected to end
+FINAL_INTERVAL = 0.01
+
+RESOURCES = ["cpu_percent", "memory_rss", "memory_vms", "threads"]
+
+
+class ProcessStatsThread(object):
+    """
+    Tracks the resource usage of a subprocess and its descendants until it
+    exits.
+
+    The name is historical: the subprocess is sampled by a thread shared by
+    all subprocesses. :meth:`start` and :meth:`join` behave like those of a
+    ``threading.Thread`` that samples it.
+
+    :param process: A ``psutil.Popen`` or an object with the same interface.
+    :param interval: The initial sampling interval, in seconds.
+    """
+
+    def __init__(self, process: psutil.Popen, interval: float = MIN_INTERVAL):
+        self.process = process
+        self.interval = interval
+        self.time = {
+            "cpu_time_user": 0.0,
+            "cpu_time_system": 0.0,
+            "runtime": 0.0,
+        }
+        if sys.platform == "linux":
+            self.time["cpu_time_iowait"] = 0.0
+
+        self.peak_resources = {key: 0.0 for key in RESOURCES}
+        self.avg_resources = {key: 0.0 for key in RESOURCES}
+        self.done = threading.Event()
+        self.final = False
+
+        self._sampled_time = 0.0
+        self._started = 0.0
+        self._last_sample: Optional[Tuple[float, float]] = None
+        self._descendants: Dict[int, psutil.Process] = {}
+        self._cgroup: Optional[str] = None
+
+    def start(self):
+        self._started = time.monotonic()
+        pid = getattr(self.process, "pid", None)
+        if pid is not None and (cgroup := cgroup_dir(pid)) != cgroup_dir():
+            self._cgroup = cgroup
+        _get_sampler().add(self)
+
+    def join(self, timeout: Optional[float] = None):
+        # Called once the subprocess's output has ended: it is about to exit
+        self.final = True
+        _get_sampler().wake(self)
+        self.done.wait(timeout)
+
+    def is_alive(self) -> bool:
+        return not self.done.is_set()
+
+    @property
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {
+            "time": self.time,
+            "peak_resources": self.peak_resources,
+            "avg_resources": self.avg_resources,
+        }
+
+    def stats_as_dict(self):
+        return {
+            "time": {k: format_elapsed_time(self.time[k]) for k in self.time},
+            "peak_resources": {
+                k: (
+                    self.peak_resources[k]
+                    if "memory" not in k
+                    else format_size(int(self.peak_resources[k]))
+                )
+                for k in self.peak_resources
+            },
+            "avg_resources": {
+                k: (
+                    self.avg_resources[k]
+                    if "memory" not in k
+                    else format_size(int(self.avg_resources[k]))
+                )
+                for k in self.avg_resources
+            },
+        }
+
+    def next_interval(self) -> float:
+        if self.final:
+            return FINAL_INTERVAL
+        runtime = time.monotonic() - self._started
+        return min(max(runtime * INTERVAL_FRACTION, self.interval), MAX_INTERVAL)
+
+    def _tree(self) -> List[Any]:
+        children = getattr(self.process, "children", None)
+        if children is None:
+            return []
+        live = {}
+        for child in children(recursive=True):
+            # Kept across samples, so each descendant is only looked up once
+            live[child.pid] = self._descendants.get(child.pid, child)
+        self._descendants = live
+        return list(live.values())
+
+    def _read_cgroup(self, name: str) -> Optional[str]:
+        if self._cgroup is None:
+            return None
+        try:
+            with open(os.path.join(self._cgroup, name), encoding="utf8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _record_times(
+        self,
+        now: float,
+        cpu_times: Any,
+        user: Optional[float] = None,
+        system: Optional[float] = None,
+    ):
+        if user is None or system is None:
+            user = cpu_times.user + getattr(cpu_times, "children_user", 0.0)
+            system = cpu_times.system + getattr(cpu_times, "children_system", 0.0)
+        self.time["runtime"] = now - self._started
+        # Descendants that were never waited for may have been sampled only
+        self.time["cpu_time_user"] = max(user, self.time["cpu_time_user"])
+        self.time["cpu_time_system"] = max(system, self.time["cpu_time_system"])
+        if sys.platform == "linux":
+            self.time["cpu_time_iowait"] = getattr(cpu_times, "iowait", 0.0)
+
+    def sample(self) -> bool:
+        """
+        Takes one sample of the subprocess and its descendants.
+
+        :returns: Whether the subprocess is still running.
+        """
+        now = time.monotonic()
+        try:
+            with self.process.oneshot():
+                status = self.process.status()
+                if status == psutil.STATUS_ZOMBIE:
+                    # Exited, but its CPU times (including those of every
+                    # descendant it waited for) can still be read
+                    self._record_times(now, self.process.cpu_times())
+                    return False
+                elif status == psutil.STATUS_DEAD:
+                    return False
+                cpu_times = self.process.cpu_times()
+                memory = self.process.memory_info()
+                threads = self.process.num_threads()
+        except psutil.NoSuchProcess:
+            return False
+
+        # Includes descendants that have already exited and were waited for
+        user = cpu_times.user + getattr(cpu_times, "children_user", 0.0)
+        system = cpu_times.system + getattr(cpu_times, "children_system", 0.0)
+        current = {
+            "memory_rss": float(memory.rss),
+            "memory_vms": float(memory.vms),
+            "threads": float(threads),
+        }
+        for descendant in self._tree():
+            try:
+                with descendant.oneshot():
+                    times = descendant.cpu_times()
+                    descendant_memory = descendant.memory_info()
+                    descendant_threads = descendant.num_threads()
+            except psutil.Error:
+                continue  # Exited since it was listed
+            user += times.user + times.children_user
+            system += times.system + times.children_system
+            current["memory_rss"] += descendant_memory.rss
+            current["memory_vms"] += descendant_memory.vms
+            current["threads"] += descendant_threads
+
+        if memory_peak := self._read_cgroup("memory.peak"):
+            current["memory_rss"] = max(current["memory_rss"], float(memory_peak))
+        if cpu_stat := self._read_cgroup("cpu.stat"):
+            fields = dict(line.split() for line in cpu_stat.splitlines())
+            if "user_usec" in fields and "system_usec" in fields:
+                user = max(user, int(fields["user_usec"]) / 1e6)
+                system = max(system, int(fields["system_usec"]) / 1e6)
+
+        cpu_time = user + system
+        if self._last_sample is None:
+            current["cpu_percent"] = 0.0
+        else:
+            last_time, last_cpu_time = self._last_sample
+            elapsed = now - last_time
+            current["cpu_percent"] = (
+                (cpu_time - last_cpu_time) / elapsed * 100 if elapsed > 0 else 0.0
+            )
+        self._last_sample = (now, cpu_time)
+
+        self._record_times(now, cpu_times, user, system)
+
+        # Averages are weighted by time, as samples are not evenly spaced
+        weight = self.time["runtime"] - self._sampled_time
+        total = self.time["runtime"]
+        for key in RESOURCES:
+            self.peak_resources[key] = max(current[key], self.peak_resources[key])
+            if total > 0:
+                self.avg_resources[key] = (
+                    self.avg_resources[key] * (total - weight) + current[key] * weight
+                ) / total
+        self._sampled_time = total
+        return True
+
+
+class ProcessSampler(threading.Thread):
+    """
+    The thread that samples every tracked subprocess when it is due.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(daemon=True, name="ProcessSampler")
+        self._due: List[Tuple[float, int, ProcessStatsThread]] = []
+        self._order = itertools.count()
+        self._condition = threading.Condition()
+
+    def add(self, tracker: ProcessStatsThread):
+        with self._condition:
+            heapq.heappush(self._due, (time.monotonic(), next(self._order), tracker))
+            self._condition.notify()
+
+    def wake(self, tracker: ProcessStatsThread):
+        with self._condition:
+            if not tracker.done.is_set():
+                heapq.heappush(
+                    self._due, (time.monotonic(), next(self._order), tracker)
+                )
+                self._condition.notify()
+
+    def run(self):
+        while True:
+            with self._condition:
+                while len(self._due) == 0:
+                    self._condition.wait()
+                due, _, tracker = self._due[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                heapq.heappop(self._due)
+            if tracker.done.is_set():
+                continue  # Also scheduled by wake()
+            try:
+                running = tracker.sample()
+            except Exception as e:
+                warn(f"Process resource tracker encountered an error: {e}")
+                running = False
+            if running:
+                with self._condition:
+                    heapq.heappush(
+                        self._due,
+                        (
+                            time.monotonic() + tracker.next_interval(),
+                            next(self._order),
+                            tracker,
+                        ),
+                    )
+            else:
+                tracker.done.set()
+
+
+_sampler: Optional[ProcessSampler] = None
+_sampler_lock = threading.Lock()
+
+
+def _get_sampler() -> ProcessSampler:
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None or not _sampler.is_alive():
+            _sampler = ProcessSampler()
+            _sampler.start()
+        return _sampler
@@ -22,6 +22,7 @@ from abc import abstractmethod
 from typing import List, Literal, Optional, Set, Tuple
 
 from .step import ViewsUpdate, MetricsUpdate, Step
+from . import pyosys_worker
 
 from ..config import Variable
 from ..state import State, DesignFormat
@@ -199,6 +200,12 @@ class PyosysStep(Step):
             "Which log level for Yosys. At WARNING or higher, the initialization splash is also disabled.",
             default="ALL",
         ),
+        Variable(
+            "YOSYS_PERSISTENT_WORKER",
+            bool,
+            "Run the step's script in a long-lived pyosys worker process instead of starting Yosys every time. Workers are kept for the lifetime of the OpenLane process and reused by later Yosys steps with the same log level, saving the interpreter startup and reading black-box models more than once. Logs, reports and outputs are unchanged.",
+            default=False,
+        ),
     ]
 
     @abstractmethod
@@ -220,6 +227,8 @@ class PyosysStep(Step):
 
     def run(self, state_in: State, **kwargs) -> Tuple[ViewsUpdate, MetricsUpdate]:
         cmd = self.get_command(state_in)
+        if self.config["YOSYS_PERSISTENT_WORKER"]:
+            kwargs["_popen_callable"] = pyosys_worker.popen
         subprocess_result = super().run_subprocess(cmd, **kwargs)
         return {}, subprocess_result["generated_metrics"]
 
@@ -324,7 +333,7 @@ class JsonHeader(VerilogStep):
 
 class SynthesisCommon(VerilogStep):
     inputs = []  # The input RTL is part of the configuration
-    outputs = [DesignFormat.NETLIST]
+    outputs = [DesignFormat.NETLIST, DesignFormat.ELABORATED_JSON]
 
     config_vars = PyosysStep.config_vars + [
         Variable(
@@ -471,6 +480,12 @@ class SynthesisCommon(VerilogStep):
             "If true, Verilog-2001 attributes are omitted from output netlists. Some utilities do not support attributes.",
             default=True,
         ),
+        Variable(
+            "SYNTH_WRITE_ELABORATED_JSON",
+            bool,
+            "If true, the design is also written as a Yosys JSON netlist right after elaboration (`hierarchy` and `proc`), before any optimization or technology mapping, and added to the state. Saves tools that need the elaborated design a separate Yosys invocation.",
+            default=False,
+        ),
         # Variable(
         #     "SYNTH_SDC_FILE",
         #     Optional[Path],
@@ -481,12 +496,20 @@ class SynthesisCommon(VerilogStep):
     def get_script_path(self) -> str:
         return os.path.join(get_script_dir(), "pyosys", "synthesize.py")
 
+    def get_elaborated_json_path(self) -> str:
+        return os.path.join(
+            self.step_dir,
+            f"{self.config['DESIGN_NAME']}.{DesignFormat.ELABORATED_JSON.value.extension}",
+        )
+
     def get_command(self, state_in: State) -> List[str]:
         out_file = os.path.join(
             self.step_dir,
             f"{self.config['DESIGN_NAME']}.{DesignFormat.NETLIST.value.extension}",
         )
         cmd = super().get_command(state_in)
+        if self.config["SYNTH_WRITE_ELABORATED_JSON"]:
+            cmd.extend(["--elaborated-json", self.get_elaborated_json_path()])
         if self.config["USE_LIGHTER"]:
             lighter_dff_map = self.config["LIGHTER_DFF_MAP"]
             if lighter_dff_map is None:
@@ -542,6 +565,10 @@ class SynthesisCommon(VerilogStep):
             )
 
         view_updates[DesignFormat.NETLIST] = Path(out_file)
+        if self.config["SYNTH_WRITE_ELABORATED_JSON"]:
+            view_updates[DesignFormat.ELABORATED_JSON] = Path(
+                self.get_elaborated_json_path()
+            )
 
         return view_updates, metric_updates
 
@@ -0,0 +1,247 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Long-lived pyosys processes for :class:`openlane.steps.pyosys.PyosysStep`.
+
+:func:`popen` takes the place of ``psutil.Popen`` in
+:meth:`openlane.steps.Step.run_subprocess` for ``yosys -y <script> … -- …``
+commands: instead of starting Yosys, the script is run as a job by an idle
+worker (``scripts/pyosys/worker.py``) started with the same Yosys flags and
+environment, so logs, metrics and process statistics are handled exactly as
+for a regular subprocess.
+
+:meta private:
+"""
+import os
+import json
+import atexit
+import tempfile
+import threading
+import subprocess
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import psutil
+
+from ..common import get_script_dir
+
+WorkerKey = Tuple[Tuple[str, ...], Tuple[Tuple[str, str], ...]]
+
+
+class PyosysWorker(object):
+    def __init__(self, yosys: str, flags: Sequence[str], env: Dict[str, str]):
+        self.process = psutil.Popen(
+            [
+                yosys,
+                "-y",
+                os.path.join(get_script_dir(), "pyosys", "worker.py"),
+                *flags,
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            encoding="utf8",
+            env=env,
+        )
+        self.lock = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(self, script: str, args: List[str], cwd: str, output: str) -> int:
+        """
+        Runs one job and blocks until it is done.
+
+        :returns: The job's exit code, or -1 if the worker died.
+        """
+        assert self.process.stdin is not None and self.process.stdout is not None
+        with self.lock:
+            job = {"script": script, "args": args, "cwd": cwd, "output": output}
+            try:
+                self.process.stdin.write(json.dumps(job) + "\n")
+                self.process.stdin.flush()
+            except OSError:
+                return -1
+            reply = self.process.stdout.readline()
+            if reply == "":
+                return -1
+            return json.loads(reply)["returncode"]
+
+    def close(self):
+        if self.process.stdin is not None:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+_idle_workers: Dict[WorkerKey, List[PyosysWorker]] = {}
+_all_workers: List[PyosysWorker] = []
+_pool_lock = threading.Lock()
+
+
+def _acquire(key: WorkerKey, yosys: str) -> PyosysWorker:
+    with _pool_lock:
+        idle = _idle_workers.setdefault(key, [])
+        while len(idle):
+            worker = idle.pop()
+            if worker.alive:
+                return worker
+    worker = PyosysWorker(yosys, key[0], dict(key[1]))
+    with _pool_lock:
+        _all_workers.append(worker)
+    return worker
+
+
+def _release(key: WorkerKey, worker: PyosysWorker):
+    with _pool_lock:
+        if worker.alive:
+            _idle_workers.setdefault(key, []).append(worker)
+        elif worker in _all_workers:
+            _all_workers.remove(worker)
+
+
+@atexit.register
+def shutdown():
+    """Stops all workers. Jobs that are still running are lost."""
+    with _pool_lock:
+        workers = list(_all_workers)
+        _all_workers.clear()
+        _idle_workers.clear()
+    for worker in workers:
+        worker.close()
+
+
+class WorkerJob(object):
+    """
+    A job running in a long-lived worker process, with the subset of the
+    ``psutil.Popen`` interface used by :meth:`openlane.steps.Step.run_subprocess`
+    and :class:`openlane.steps.process_stats.ProcessStatsThread`. Resource
+    usage is that of the worker, with CPU times counted from the start of the
+    job.
+
+    :param pid: The worker's process ID.
+    :param run: Runs the job in the worker with its output going to the path
+        it is given, blocks until it is done and returns its exit code.
+    :param prefix: Prefix of the temporary output file.
+    """
+
+    def __init__(
+        self,
+        pid: int,
+        run: Callable[[str], int],
+        prefix: str = "pyosys-worker-",
+    ):
+        fd, self.output = tempfile.mkstemp(prefix=prefix, suffix=".log")
+        os.close(fd)
+        self.returncode: Optional[int] = None
+        self.done = threading.Event()
+        self.pid = pid
+        self.stats = psutil.Process(self.pid)
+        self.baseline = self.stats.cpu_times()
+
+        def target():
+            try:
+                self.returncode = run(self.output)
+            finally:
+                self.done.set()
+
+        threading.Thread(target=target, daemon=True).start()
+        self.stdout = self._lines()
+
+    def _lines(self):
+        with open(self.output, encoding="utf8") as f:
+            pending = ""
+            while True:
+                line = f.readline()
+                if line != "":
+                    pending += line
+                    if pending.endswith("\n"):
+                        yield pending
+                        pending = ""
+                    continue
+                if self.done.is_set():
+                    pending += f.read()
+                    yield from pending.splitlines(keepends=True)
+                    return
+                self.done.wait(0.05)
+
+    def poll(self) -> Optional[int]:
+        return self.returncode if self.done.is_set() else None
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[int]:
+        self.done.wait(timeout)
+        if self.done.is_set() and os.path.exists(self.output):
+            os.unlink(self.output)
+        return self.poll()
+
+    def status(self) -> str:
+        return psutil.STATUS_DEAD if self.done.is_set() else psutil.STATUS_RUNNING
+
+    @contextmanager
+    def oneshot(self):
+        with self.stats.oneshot():
+            yield
+
+    def cpu_percent(self) -> float:
+        return self.stats.cpu_percent()
+
+    def memory_info(self):
+        return self.stats.memory_info()
+
+    def num_threads(self) -> int:
+        return self.stats.num_threads()
+
+    def children(self, recursive: bool = False) -> List[psutil.Process]:
+        return self.stats.children(recursive=recursive)
+
+    def cpu_times(self):
+        current = self.stats.cpu_times()
+        return current._replace(
+            **{
+                field: getattr(current, field) - getattr(self.baseline, field)
+                for field in current._fields
+            }
+        )
+
+
+def popen(cmd: Sequence[str], *, env: Dict[str, str], **kwargs) -> WorkerJob:
+    """
+    Runs a ``yosys -y <script> [flags] -- [args]`` command in a worker.
+    Other keyword arguments (stdin, stdout, …) are accepted for compatibility
+    with ``psutil.Popen`` and ignored.
+    """
+    if stdin := kwargs.get("stdin"):
+        if hasattr(stdin, "close"):
+            stdin.close()
+    cmd = [str(arg) for arg in cmd]
+    if len(cmd) < 3 or cmd[1] != "-y" or "--" not in cmd:
+        raise ValueError(f"Not a pyosys script invocation: {cmd}")
+    separator = cmd.index("--")
+    key: WorkerKey = (tuple(cmd[3:separator]), tuple(sorted(env.items())))
+    cwd = str(kwargs.get("cwd") or os.getcwd())
+    worker = _acquire(key, cmd[0])
+
+    def run(output: str) -> int:
+        try:
+            return worker.run(cmd[2], cmd[separator + 1 :], cwd, output)
+        finally:
+            _release(key, worker)
+
+    return WorkerJob(worker.process.pid, run)
@@ -0,0 +1,188 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+A content-addressed on-disk cache of the results of one
+:class:`openlane.steps.openroad.MultiCornerSTA` corner: its metrics and
+every file written to the corner directory (reports, logs, SDF, …).
+
+Entries are keyed by the step, the corner, the OpenLane version, the STA
+scripts, the tool binary and the corner's environment, where every file the
+environment points to is replaced by a hash of its contents. Paths inside the
+step directory, and variables inherited unchanged from the OpenLane process
+itself, are not part of the key.
+
+:meta private:
+"""
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+from functools import lru_cache
+from decimal import Decimal
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from ..common import get_script_dir
+from ..__version__ import __version__
+
+METRIC_TYPES = {"int": int, "float": float, "Decimal": Decimal, "str": str}
+
+_file_digests: Dict[Tuple[str, int, int], str] = {}
+_digest_lock = threading.Lock()
+
+
+def file_digest(path: str) -> str:
+    """
+    The SHA-256 of a file's contents, computed once per path, size and
+    modification time.
+    """
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _digest_lock:
+        if digest := _file_digests.get(memo_key):
+            return digest
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            sha.update(chunk)
+    digest = sha.hexdigest()
+    with _digest_lock:
+        _file_digests[memo_key] = digest
+    return digest
+
+
+@lru_cache(maxsize=1)
+def _scripts_digest() -> str:
+    sha = hashlib.sha256()
+    for subdirectory in ["openroad", "odbpy"]:
+        root_dir = os.path.join(get_script_dir(), subdirectory)
+        for root, dirs, files in os.walk(root_dir):
+            dirs.sort()
+            for file in sorted(files):
+                path = os.path.join(root, file)
+                sha.update(os.path.relpath(path, root_dir).encode("utf8"))
+                sha.update(file_digest(path).encode("utf8"))
+    return sha.hexdigest()
+
+
+def corner_key(
+    step_id: str,
+    corner: str,
+    cmd: Sequence[str],
+    env: Dict[str, Any],
+    step_dir: str,
+) -> str:
+    """
+    :param step_id: The ID of the STA step.
+    :param corner: The timing corner.
+    :param cmd: The STA command; its binary is identified by contents.
+    :param env: The environment of the corner.
+    :param step_dir: The step directory, which differs between runs.
+    :returns: The key of the corner's cache entry.
+    """
+    step_dir = os.path.abspath(step_dir)
+    tool = shutil.which(str(cmd[0])) or str(cmd[0])
+    identity: Dict[str, Any] = {
+        "step": step_id,
+        "corner": corner,
+        "version": __version__,
+        "scripts": _scripts_digest(),
+        "tool": file_digest(tool) if os.path.isfile(tool) else tool,
+        "env": {},
+    }
+    for name, value in sorted(env.items()):
+        value = os.fsdecode(value)
+        if os.environ.get(name) == value:
+            continue
+        tokens = []
+        for token in value.split():
+            if token.startswith(step_dir):
+                token = "$STEP_DIR" + token[len(step_dir) :]
+            elif os.path.isfile(token):
+                token = file_digest(token)
+            tokens.append(token)
+        identity["env"][name] = tokens
+    payload = json.dumps(identity, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf8")).hexdigest()
+
+
+def _encode_metric(value: Any) -> Tuple[str, Any]:
+    type_name = type(value).__name__
+    if type_name in METRIC_TYPES:
+        return (type_name, str(value))
+    return ("json", value)
+
+
+def encode_metrics(metrics: Dict[str, Any]) -> Dict[str, Tuple[str, Any]]:
+    """
+    :returns: The metrics in a JSON-serializable form that keeps the types
+        of numeric metrics (``int``, ``float`` and ``Decimal``).
+    """
+    return {name: _encode_metric(value) for name, value in metrics.items()}
+
+
+def decode_metrics(encoded: Dict[str, Tuple[str, Any]]) -> Dict[str, Any]:
+    """
+    The inverse of :func:`encode_metrics`.
+    """
+    return {
+        name: value if type_name == "json" else METRIC_TYPES[type_name](value)
+        for name, (type_name, value) in encoded.items()
+    }
+
+
+def _entry_dir(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, key[:2], key)
+
+
+def load(cache_dir: str, key: str, corner_dir: str) -> Optional[Dict[str, Any]]:
+    """
+    Restores a cached corner into ``corner_dir``.
+
+    :returns: The corner's metrics, or ``None`` on a cache miss.
+    """
+    entry = _entry_dir(cache_dir, key)
+    try:
+        with open(os.path.join(entry, "metrics.json"), encoding="utf8") as f:
+            encoded = json.load(f)
+    except FileNotFoundError:
+        return None
+    shutil.copytree(os.path.join(entry, "files"), corner_dir, dirs_exist_ok=True)
+    return decode_metrics(encoded)
+
+
+def store(cache_dir: str, key: str, corner_dir: str, metrics: Dict[str, Any]):
+    """
+    Stores the contents of ``corner_dir`` and the corner's metrics. Entries
+    are written to a temporary directory first, so concurrent readers only
+    ever see complete entries.
+    """
+    entry = _entry_dir(cache_dir, key)
+    if os.path.isdir(entry):
+        return
+    os.makedirs(os.path.dirname(entry), exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=f".{key}-", dir=os.path.dirname(entry))
+    try:
+        shutil.copytree(corner_dir, os.path.join(staging, "files"))
+        with open(os.path.join(staging, "metrics.json"), "w", encoding="utf8") as f:
+            json.dump(encode_metrics(metrics), f, indent=4)
+        os.rename(staging, entry)
+    except OSError:
+        # Another process stored the same entry first
+        if not os.path.isdir(entry):
+            raise
+    finally:
+        if os.path.isdir(staging):
+            shutil.rmtree(staging)
@@ -0,0 +1,181 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Long-lived OpenSTA processes for :class:`openlane.steps.openroad.MultiCornerSTA`.
+
+:func:`popen` takes the place of ``psutil.Popen`` in
+:meth:`openlane.steps.Step.run_subprocess` for ``sta … -exit <script>``
+commands: instead of starting OpenSTA, the script is run as a job by an idle
+session (``scripts/openroad/sta/session.tcl``) that already has the cell
+libraries of the same timing corner loaded, so logs, metrics, reports and
+process statistics are handled exactly as for a regular subprocess.
+
+:meta private:
+"""
+import os
+import json
+import atexit
+import threading
+import subprocess
+from typing import Dict, List, Sequence, Tuple
+
+import psutil
+
+from .pyosys_worker import WorkerJob
+from ..common import TclUtils, get_script_dir
+
+SessionKey = Tuple[str, Tuple[str, ...], Tuple[Tuple[str, int, int], ...]]
+
+#: The variables that decide what a session keeps loaded between jobs
+SESSION_VARIABLES = ("_CURRENT_CORNER_NAME", "_CURRENT_CORNER_LIBS", "EXTRA_LIBS")
+
+
+class STASession(object):
+    def __init__(self, sta: str, flags: Sequence[str], env: Dict[str, str]):
+        self.process = psutil.Popen(
+            [
+                sta,
+                *flags,
+                os.path.join(get_script_dir(), "openroad", "sta", "session.tcl"),
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            encoding="utf8",
+            env=env,
+        )
+        self.lock = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(self, script: str, output: str, cwd: str, env: Dict[str, str]) -> int:
+        """
+        Runs one job and blocks until it is done.
+
+        :returns: The job's exit code, or -1 if the session died.
+        """
+        assert self.process.stdin is not None and self.process.stdout is not None
+        with self.lock:
+            job = TclUtils.join(
+                [
+                    script,
+                    output,
+                    cwd,
+                    TclUtils.join(
+                        [item for pair in sorted(env.items()) for item in pair]
+                    ),
+                ]
+            )
+            try:
+                self.process.stdin.write(job + "\n")
+                self.process.stdin.flush()
+            except OSError:
+                return -1
+            reply = self.process.stdout.readline()
+            if reply == "":
+                return -1
+            return json.loads(reply)["returncode"]
+
+    def close(self):
+        if self.process.stdin is not None:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+_idle_sessions: Dict[SessionKey, List[STASession]] = {}
+_all_sessions: List[STASession] = []
+_pool_lock = threading.Lock()
+
+
+def _session_key(sta: str, flags: Sequence[str], env: Dict[str, str]) -> SessionKey:
+    # Libraries are identified by path, size and modification time, so a
+    # session never reports with a stale copy of a library that has changed
+    files = []
+    for name in SESSION_VARIABLES:
+        for token in env.get(name, "").split():
+            if os.path.isfile(token):
+                stat = os.stat(token)
+                files.append((token, stat.st_size, stat.st_mtime_ns))
+    return (
+        sta,
+        (*flags, *(env.get(name, "") for name in SESSION_VARIABLES)),
+        tuple(files),
+    )
+
+
+def _acquire(key: SessionKey, flags: Sequence[str], env: Dict[str, str]) -> STASession:
+    with _pool_lock:
+        idle = _idle_sessions.setdefault(key, [])
+        while len(idle):
+            session = idle.pop()
+            if session.alive:
+                return session
+    session = STASession(key[0], flags, env)
+    with _pool_lock:
+        _all_sessions.append(session)
+    return session
+
+
+def _release(key: SessionKey, session: STASession):
+    with _pool_lock:
+        if session.alive:
+            _idle_sessions.setdefault(key, []).append(session)
+        elif session in _all_sessions:
+            _all_sessions.remove(session)
+
+
+@atexit.register
+def shutdown():
+    """Stops all sessions. Jobs that are still running are lost."""
+    with _pool_lock:
+        sessions = list(_all_sessions)
+        _all_sessions.clear()
+        _idle_sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+def popen(cmd: Sequence[str], *, env: Dict[str, str], **kwargs) -> WorkerJob:
+    """
+    Runs a ``sta [flags] -exit <script>`` command in a session.
+    Other keyword arguments (stdin, stdout, …) are accepted for compatibility
+    with ``psutil.Popen`` and ignored.
+    """
+    if stdin := kwargs.get("stdin"):
+        if hasattr(stdin, "close"):
+            stdin.close()
+    cmd = [str(arg) for arg in cmd]
+    env = {key: os.fsdecode(value) for key, value in env.items()}
+    if len(cmd) < 3 or cmd[-2] != "-exit":
+        raise ValueError(f"Not an STA script invocation: {cmd}")
+    flags = cmd[1:-2]
+    key = _session_key(cmd[0], flags, env)
+    cwd = str(kwargs.get("cwd") or os.getcwd())
+    session = _acquire(key, flags, env)
+
+    def run(output: str) -> int:
+        try:
+            return session.run(cmd[-1], output, cwd, env)
+        finally:
+            _release(key, session)
+
+    return WorkerJob(session.process.pid, run, prefix="sta-session-")
@@ -18,14 +18,15 @@ import sys
 import json
 import time
 import psutil
+import codecs
+import importlib
 import shutil
+import sqlite3
 import textwrap
-import datetime
 import subprocess
 from signal import Signals
 from decimal import Decimal
 from io import TextIOWrapper
-from threading import Thread
 from inspect import isabstract
 from itertools import zip_longest
 from abc import abstractmethod, ABC
@@ -33,6 +34,8 @@ from concurrent.futures import Future
 from typing import (
     Any,
     List,
+    Iterable,
+    TextIO,
     Callable,
     Optional,
     Set,
@@ -68,7 +71,13 @@ from ..common import (
     copy_recursive,
     format_size,
     format_elapsed_time,
+    get_scheduler,
+    get_process_history,
+    ProcessHistory,
 )
+from ..common.process_history import settings_digest
+from . import step_cache
+from .process_stats import ProcessStatsThread
 from .. import logging
 from ..logging import (
     rule,
@@ -101,6 +110,13 @@ class OutputProcessor(ABC, Generic[VT]):
 
     key: ClassVar[str] = NotImplemented
 
+    #: The prefixes of the lines this processor may act on while a report is
+    #: being written, or ``None`` if it may act on any line. Output in between
+    #: such lines is copied to the log and the report in bulk by
+    #: :meth:`openlane.steps.Step.run_subprocess` without calling
+    #: :meth:`process_line`.
+    report_line_prefixes: ClassVar[Optional[Tuple[str, ...]]] = None
+
     def __init__(self, step: Step, report_dir: str, silent: bool) -> None:
         self.step = step
         self.report_dir: str = report_dir
@@ -148,12 +164,24 @@ class DefaultOutputProcessor(OutputProcessor[Dict[str, Any]]):
     """
 
     key = "generated_metrics"
+    report_line_prefixes = ("%OL_",)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.generated_metrics: Dict[str, Any] = {}
         self.current_rpt: Optional[TextIOWrapper] = None
 
+    def write_report(self, text: str) -> bool:
+        """
+        Writes report lines other than the special keywords in bulk.
+
+        :returns: ``False`` if no report is being written.
+        """
+        if self.current_rpt is None:
+            return False
+        self.current_rpt.write(text)
+        return True
+
     def process_line(self, line: str) -> bool:
         """
         Always returns ``True``, so ``DefaultOutputProcessor`` should always be
@@ -240,105 +268,126 @@ REPORT_START_LOCUS = "%OL_CREATE_REPORT"
 REPORT_END_LOCUS = "%OL_END_REPORT"
 METRIC_LOCUS = "%OL_METRIC"
 
-GlobalToolbox = Toolbox(os.path.join(os.getcwd(), "openlane_run", "tmp"))
-ViewsUpdate = Dict[DesignFormat, StateElement]
-MetricsUpdate = Dict[str, Any]
-
+OUTPUT_CHUNK_SIZE = 1024 * 1024
+LOG_TAIL_LENGTH = 10
+
+#: The modules of :mod:`openlane.steps` defining the built-in steps, by the
+#: prefix of their IDs. They are imported on demand by :attr:`Step.factory`.
+STEP_MODULES: Dict[str, List[str]] = {
+    "Checker": ["checker"],
+    "Yosys": ["pyosys", "yosys"],
+    "OpenROAD": ["openroad"],
+    "Odb": ["odb"],
+    "Magic": ["magic"],
+    "Netgen": ["netgen"],
+    "KLayout": ["klayout"],
+    "Misc": ["misc"],
+    "Verilator": ["verilator"],
+}
+
+
+def _last_lines(text: str, count: int) -> List[str]:
+    start = len(text) - 1
+    for _ in range(count):
+        start = text.rfind("\n", 0, start)
+        if start == -1:
+            break
+    return text[start + 1 :].splitlines(keepends=True)
+
+
+def _find_line_start(text: str, position: int, prefixes: Sequence[str]) -> int:
+    # Plain substring searches: a multiline regex is several times slower
+    found = -1
+    for prefix in prefixes:
+        if text.startswith(prefix, position):
+            return position
+        index = text.find("\n" + prefix, position)
+        if index != -1 and (found == -1 or index + 1 < found):
+            found = index + 1
+    return found
+
+
+def _process_output(
+    stdout: Iterable[str],
+    log_file: TextIO,
+    line_buffer: RingBuffer[str],
+    output_processors: Sequence[OutputProcessor],
+):
+    """
+    Feeds subprocess output to the log, ``line_buffer`` and the output
+    processors, line by line.
+
+    If the output is a buffered pipe and every processor up to the
+    :class:`DefaultOutputProcessor` declares its
+    :attr:`OutputProcessor.report_line_prefixes`, the output is read in
+    chunks instead. While a report is being written, the lines in between
+    lines with those prefixes are copied to the log and the report in bulk.
+    """
 
-class ProcessStatsThread(Thread):
-    def __init__(self, process: psutil.Popen, interval: float = 0.1):
-        Thread.__init__(
-            self,
-        )
-        self.process = process
-        self.result = None
-        self.interval = interval
-        self.time = {
-            "cpu_time_user": 0.0,
-            "cpu_time_system": 0.0,
-            "runtime": 0.0,
-        }
-        if sys.platform == "linux":
-            self.time["cpu_time_iowait"] = 0.0
-
-        self.peak_resources = {
-            "cpu_percent": 0.0,
-            "memory_rss": 0.0,
-            "memory_vms": 0.0,
-            "threads": 0.0,
-        }
-        self.avg_resources = {
-            "cpu_percent": 0.0,
-            "memory_rss": 0.0,
-            "memory_vms": 0.0,
-            "threads": 0.0,
-        }
+    def process_line(line: str):
+        log_file.write(line)
+        line_buffer.push(line)
+        for processor in output_processors:
+            if processor.process_line(line):
+                break
+
+    reporter: Optional[DefaultOutputProcessor] = None
+    prefixes: List[str] = []
+    for processor in output_processors:
+        if processor.report_line_prefixes is None:
+            break
+        prefixes += processor.report_line_prefixes
+        if isinstance(processor, DefaultOutputProcessor):
+            reporter = processor
+            break
+
+    raw = getattr(stdout, "buffer", None)
+    if reporter is None or not hasattr(raw, "read1"):
+        for line in stdout:
+            process_line(line)
+        return
+
+    decoder = codecs.getincrementaldecoder("utf8")()
+    pending = ""
+    while True:
+        data = raw.read1(OUTPUT_CHUNK_SIZE)
+        text = pending + decoder.decode(data, final=len(data) == 0)
+        pending = ""
+        # Universal newlines, as for the line-by-line reader: a trailing
+        # carriage return may be the first half of a CRLF
+        if len(data) and text.endswith("\r"):
+            text, pending = text[:-1], "\r"
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        if len(data):
+            complete = text.rfind("\n") + 1
+            text, pending = text[:complete], text[complete:] + pending
+
+        position = 0
+        while position < len(text):
+            if reporter.current_rpt is not None:
+                end = _find_line_start(text, position, prefixes)
+                if end == -1:
+                    end = len(text)
+                if end > position:
+                    bulk = text[position:end]
+                    log_file.write(bulk)
+                    reporter.write_report(bulk)
+                    for line in _last_lines(bulk, LOG_TAIL_LENGTH):
+                        line_buffer.push(line)
+                    position = end
+                    continue
+            end = text.find("\n", position) + 1 or len(text)
+            process_line(text[position:end])
+            position = end
+
+        if len(data) == 0:
+            break
 
-    def run(self):
-        try:
-            count = 1
-            status = self.process.status()
-            now = datetime.datetime.now()
-            while status not in [psutil.STATUS_ZOMBIE, psutil.STATUS_DEAD]:
-                with self.process.oneshot():
-                    cpu = self.process.cpu_percent()
-                    memory = self.process.memory_info()
-                    cpu_time = self.process.cpu_times()
-                    threads = self.process.num_threads()
-
-                    runtime = datetime.datetime.now() - now
-                    self.time["runtime"] = runtime.total_seconds()
-                    self.time["cpu_time_user"] = cpu_time.user
-                    self.time["cpu_time_system"] = cpu_time.system
-                    if sys.platform == "linux":
-                        self.time["cpu_time_iowait"] = cpu_time.iowait  # type: ignore
-
-                    current: Dict[str, float] = {}
-                    current["cpu_percent"] = cpu
-                    current["memory_rss"] = memory.rss
-                    current["memory_vms"] = memory.vms
-                    current["threads"] = threads
-
-                    for key in self.peak_resources.keys():
-                        self.peak_resources[key] = max(
-                            current[key], self.peak_resources[key]
-                        )
 
-                        # moving average
-                        self.avg_resources[key] = (
-                            (count * self.avg_resources[key]) + current[key]
-                        ) / (count + 1)
-
-                    count += 1
-                    time.sleep(self.interval)
-                    status = self.process.status()
-        except psutil.Error as e:
-            message = e.msg
-            for normal in ["process no longer exists", "but it's a zombie"]:
-                if normal in message:
-                    return
-            warn(f"Process resource tracker encountered an error: {e}")
-
-    def stats_as_dict(self):
-        return {
-            "time": {k: format_elapsed_time(self.time[k]) for k in self.time},
-            "peak_resources": {
-                k: (
-                    self.peak_resources[k]
-                    if "memory" not in k
-                    else format_size(int(self.peak_resources[k]))
-                )
-                for k in self.peak_resources
-            },
-            "avg_resources": {
-                k: (
-                    self.avg_resources[k]
-                    if "memory" not in k
-                    else format_size(int(self.avg_resources[k]))
-                )
-                for k in self.avg_resources
-            },
-        }
+GlobalToolbox = Toolbox(os.path.join(os.getcwd(), "openlane_run", "tmp"))
+ViewsUpdate = Dict[DesignFormat, StateElement]
+MetricsUpdate = Dict[str, Any]
 
 
 class Step(ABC):
@@ -422,6 +471,10 @@ class Step(ABC):
         :class:`openlane.steps.OutputProcessor` classes for use with
         :meth:`run_subprocess`.
 
+    :cvar cacheable: Whether the results of this step may be restored from
+        ``STEP_CACHE_DIR`` instead of running it. Steps with side effects
+        outside of their step directory should set this to ``False``.
+
     :ivar state_out:
         The last output state from running this step object, if it exists.
 
@@ -448,6 +501,17 @@ class Step(ABC):
         exists.
 
         If :meth:`start` is called again, the reference is destroyed.
+
+    :ivar cache_hit:
+        Whether the last run of this step object was restored from
+        ``STEP_CACHE_DIR``, or ``None`` if the cache was not used.
+
+        If :meth:`start` is called again, the value is replaced.
+
+    :ivar priority:
+        The priority of this step's subprocesses in the global
+        :class:`openlane.common.ResourceScheduler`. Subprocesses with a higher
+        priority are started first when resources are scarce.
     """
 
     # Class Variables
@@ -456,6 +520,7 @@ class Step(ABC):
     outputs: ClassVar[List[DesignFormat]] = NotImplemented
     output_processors: ClassVar[List[Type[OutputProcessor]]] = [DefaultOutputProcessor]
     config_vars: ClassVar[List[Variable]] = []
+    cacheable: ClassVar[bool] = True
 
     # Instance Variables
     name: str
@@ -468,6 +533,8 @@ class Step(ABC):
     start_time: Optional[float] = None
     end_time: Optional[float] = None
     config_path: Optional[str] = None
+    cache_hit: Optional[bool] = None
+    priority: int = 0
 
     # These are mutable class variables. However, they will only be used
     # when steps are run outside of a Flow, pretty much.
@@ -995,6 +1062,9 @@ class Step(ABC):
             f.write(json.dumps(dumpable_config, cls=GenericDictEncoder))
 
         # 2. State
+        self.state_in.result().materialize(
+            [*self.__class__.inputs, DesignFormat.DEF]
+        )
         state_in: GenericDict[str, Any] = self.state_in.result().copy_mut()
         for format in DesignFormat:
             assert isinstance(format.value, DesignFormatObject)  # type checker shut up
@@ -1147,16 +1217,42 @@ class Step(ABC):
                 ) from None
 
         try:
-            views_updates, metrics_updates = self.run(state_in_result, **kwargs)
-        except subprocess.CalledProcessError as e:
-            if e.returncode is not None and e.returncode < 0:
-                raise StepSignalled(
-                    f"{self.name}: Interrupted ({Signals(-e.returncode).name})"
-                ) from None
-            else:
-                raise StepError(
-                    f"{self.name}: subprocess {e.args} failed", underlying_error=e
-                ) from None
+            state_in_result.materialize(self.inputs)
+        except (RuntimeError, subprocess.CalledProcessError) as e:
+            raise StepException(
+                f"{type(self).__name__}: failed to write a deferred input: {e}"
+            ) from None
+
+        self.cache_hit = None
+        cache_dir = self.config.get("STEP_CACHE_DIR")
+        cache_key: Optional[str] = None
+        cached = None
+        if cache_dir is not None and self.cacheable:
+            cache_key = step_cache.step_key(
+                self.id,
+                self.__class__.get_implementation_id(),
+                self.config.to_raw_dict(include_meta=False),
+                state_in_result,
+            )
+            cached = step_cache.load(cache_dir, cache_key, self.step_dir)
+            self.cache_hit = cached is not None
+
+        if cached is not None:
+            info(f"Restored '{self.id}' from the step cache.")
+            views_updates, metrics_updates = cached
+        else:
+            try:
+                views_updates, metrics_updates = self.run(state_in_result, **kwargs)
+            except subprocess.CalledProcessError as e:
+                if e.returncode is not None and e.returncode < 0:
+                    raise StepSignalled(
+                        f"{self.name}: Interrupted ({Signals(-e.returncode).name})"
+                    ) from None
+                else:
+                    raise StepError(
+                        f"{self.name}: subprocess {e.args} failed",
+                        underlying_error=e,
+                    ) from None
 
         metrics = GenericImmutableDict(
             state_in_result.metrics, overrides=metrics_updates
@@ -1176,6 +1272,23 @@ class Step(ABC):
         with open(os.path.join(self.step_dir, "state_out.json"), "w") as f:
             f.write(self.state_out.dumps())
 
+        if cache_key is not None and cached is None:
+            size_limit = self.config.get("STEP_CACHE_SIZE")
+            try:
+                if not step_cache.store(
+                    cache_dir,
+                    cache_key,
+                    self.step_dir,
+                    views_updates,
+                    metrics_updates,
+                    size_limit and size_limit * 1024 * 1024,
+                ):
+                    debug(
+                        f"'{self.id}' produced views outside of its step directory and was not cached."
+                    )
+            except OSError as e:
+                self.warn(f"Failed to store '{self.id}' in the step cache: {e}")
+
         self.end_time = time.time()
         with open(os.path.join(self.step_dir, "runtime.txt"), "w") as f:
             f.write(format_elapsed_time(self.end_time - self.start_time))
@@ -1235,6 +1348,10 @@ class Step(ABC):
         The output from the subprocess is processed line-by-line by instances
         of output processor classes.
 
+        The subprocess is only started once the global
+        :class:`openlane.common.ResourceScheduler` admits it, based on the
+        resources used by earlier runs of the same step and log file.
+
         :param cmd: A list of variables, representing a program and its arguments,
             similar to how you would use it in a shell.
         :param log_to: An optional override for the log path from
@@ -1318,28 +1435,61 @@ class Step(ABC):
         verbose(
             f"Logging subprocess to [repr.filename]{link_start}'{os.path.relpath(log_path)}'{link_end}[/repr.filename]…"
         )
-        process = _popen_callable(
-            cmd_str,
-            encoding="utf8",
-            env=env,
-            **kwargs,
-        )
 
-        process_stats_thread = ProcessStatsThread(process)
-        process_stats_thread.start()
-
-        line_buffer = RingBuffer(str, 10)
-        if process_stdout := process.stdout:
+        # Estimated from earlier runs of the same step and log file
+        run_dir = os.path.dirname(os.path.abspath(self.step_dir))
+        scheduler = get_scheduler()
+        scheduler.estimates.seed(run_dir)
+        job = (slugify(self.id), os.path.basename(os.path.splitext(log_path)[0]))
+        cpus, memory = scheduler.estimates.get(job)
+
+        history: Optional[ProcessHistory] = None
+        settings: Optional[str] = None
+        size: Optional[float] = None
+        if history_path := self.config.get("PROCESS_HISTORY"):
+            settings = settings_digest(self.config.to_raw_dict(include_meta=False))
+            if self.state_in.done():
+                instance_count = self.state_in.result().metrics.get(
+                    "design__instance__count"
+                )
+                if instance_count is not None:
+                    size = float(instance_count)
             try:
-                for line in process_stdout:
-                    log_file.write(line)
-                    line_buffer.push(line)
-                    for processor in output_processors:
-                        if processor.process_line(line):
-                            break
-            except UnicodeDecodeError as e:
-                raise StepException(f"Subprocess emitted non-UTF-8 output: {e}")
-        process_stats_thread.join()
+                history = get_process_history(history_path)
+                history.ingest(run_dir)
+                if prediction := history.predict(
+                    *job, settings=settings, size=size
+                ):
+                    cpus, memory = prediction.cpus, prediction.peak_memory
+            except sqlite3.Error as e:
+                self.warn(f"Failed to read the process history: {e}")
+                history = None
+        with scheduler.reserve(cpus, memory, self.priority):
+            process = _popen_callable(
+                cmd_str,
+                encoding="utf8",
+                env=env,
+                **kwargs,
+            )
+
+            process_stats_thread = ProcessStatsThread(process)
+            process_stats_thread.start()
+
+            line_buffer = RingBuffer(str, LOG_TAIL_LENGTH)
+            if process_stdout := process.stdout:
+                try:
+                    _process_output(
+                        process_stdout, log_file, line_buffer, output_processors
+                    )
+                except UnicodeDecodeError as e:
+                    raise StepException(f"Subprocess emitted non-UTF-8 output: {e}")
+            process_stats_thread.join()
+            returncode = process.wait()
+
+        peaks = process_stats_thread.peak_resources
+        scheduler.estimates.record(
+            job, max(peaks["cpu_percent"] / 100, 1.0), int(peaks["memory_rss"])
+        )
 
         json_stats = f"{os.path.splitext(log_path)[0]}.process_stats.json"
 
@@ -1350,8 +1500,19 @@ class Step(ABC):
                 indent=4,
             )
 
+        if history is not None:
+            try:
+                history.record(
+                    json_stats,
+                    *job,
+                    process_stats_thread.stats,
+                    settings=settings,
+                    size=size,
+                )
+            except sqlite3.Error as e:
+                self.warn(f"Failed to update the process history: {e}")
+
         result: Dict[str, Any] = {}
-        returncode = process.wait()
         log_file.close()
         result["returncode"] = returncode
         result["log_path"] = log_path
@@ -1458,15 +1619,38 @@ class Step(ABC):
             """
             Retrieves a Step type from the registry using a lookup string.
 
+            Built-in steps are imported the first time one of the steps in their
+            module is looked up (see :data:`STEP_MODULES`) and plugins the first
+            time a step is not found otherwise.
+
             :param name: The registered name of the Step. Case-insensitive.
             """
+            if found := Self.__registry.get(name.lower()):
+                return found
+            prefix = name.split(".")[0].lower()
+            for module_prefix, modules in STEP_MODULES.items():
+                if module_prefix.lower() == prefix:
+                    for module in modules:
+                        importlib.import_module(f".{module}", __package__)
+            if found := Self.__registry.get(name.lower()):
+                return found
+            from ..plugins import load_plugins
+
+            load_plugins()
             return Self.__registry.get(name.lower())
 
         @classmethod
         def list(Self) -> List[str]:
             """
-            :returns: A list of IDs of all registered names.
+            :returns: A list of IDs of all registered names, after importing
+                every built-in step and plugin.
             """
+            from ..plugins import load_plugins
+
+            for modules in STEP_MODULES.values():
+                for module in modules:
+                    importlib.import_module(f".{module}", __package__)
+            load_plugins()
             return [cls.id for cls in Self.__registry.values()]
 
     factory = StepFactory
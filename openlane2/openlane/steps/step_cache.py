@@ -0,0 +1,361 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+A content-addressed on-disk cache of the results of :meth:`openlane.steps.Step.start`:
+the views and metrics a step's ``run()`` returned, and the files it left in
+its step directory.
+
+Entries are keyed by the step, its implementation, the OpenLane version, the
+step's configuration and its input state, where every file the configuration
+or the input state points to is replaced by a hash of its contents, and every
+directory by the names and hashes of the files in it. Results are only stored
+if every view the step produced is inside its step directory.
+
+The cache is kept under a size limit by evicting the least recently used
+entries. The total size of the entries is kept in ``size.json``, so the
+entries are only listed when the limit is exceeded.
+
+:meta private:
+"""
+import os
+import glob
+import json
+import fcntl
+import shutil
+import hashlib
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+from .sta_cache import file_digest, encode_metrics, decode_metrics
+from ..state import DesignFormat, State, deferred
+from ..common import GenericDictEncoder, Path
+from ..__version__ import __version__
+
+FICLONE = 0x40049409
+
+#: Files written by :meth:`openlane.steps.Step.start` itself, never cached
+START_FILES = ("config.json", "state_in.json", "state_out.json", "runtime.txt")
+
+#: Configuration variables left out of keys. The design directory holds the
+#: run directories, and the files in it that a step uses are keyed where the
+#: configuration points to them.
+UNKEYED = ("DESIGN_DIR",)
+
+#: The total size of the entries of a cache, relative to the cache directory
+SIZE_FILE = "size.json"
+
+
+def _content(value: Any) -> Any:
+    if isinstance(value, Path):
+        if found := deferred.derivation(value):
+            # The same whether or not the view has been written yet
+            source, derive = found
+            return {"deferred": _content(Path(source)), "derive": derive}
+        if os.path.isfile(value):
+            return file_digest(str(value))
+        if os.path.isdir(value):
+            # e.g. include directories: every file in them may be read
+            return _directory_content(str(value))
+        return str(value)
+    elif isinstance(value, dict):
+        return {key: _content(element) for key, element in value.items()}
+    elif isinstance(value, (list, tuple)):
+        return [_content(element) for element in value]
+    return value
+
+
+def _directory_content(directory: str) -> Dict[str, str]:
+    content = {}
+    for root, dirs, names in os.walk(directory):
+        dirs.sort()
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            if os.path.isfile(path):
+                content[os.path.relpath(path, directory)] = file_digest(path)
+    return content
+
+
+def step_key(
+    step_id: str,
+    implementation_id: str,
+    config: Dict[str, Any],
+    state_in: State,
+) -> str:
+    """
+    :param step_id: The ID of the step.
+    :param implementation_id: The step's implementation, i.e.
+        :meth:`openlane.steps.Step.get_implementation_id`.
+    :param config: The step's configuration.
+    :param state_in: The step's input state.
+    :returns: The key of the step's cache entry.
+    """
+    identity = {
+        "step": step_id,
+        "implementation": implementation_id,
+        "version": __version__,
+        "config": _content(
+            {
+                name: value
+                for name, value in config.items()
+                if not name.startswith("STEP_CACHE_") and name not in UNKEYED
+            }
+        ),
+        "views": _content(state_in.to_raw_dict(metrics=False)),
+        "metrics": state_in.metrics.to_raw_dict(),
+    }
+    payload = json.dumps(identity, cls=GenericDictEncoder, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf8")).hexdigest()
+
+
+def _encode_views(views: Dict[str, Any], step_dir: str) -> Optional[Any]:
+    # Views are stored relative to the step directory
+    def encode(value: Any) -> Any:
+        if value is None:
+            return None
+        elif isinstance(value, dict):
+            return {key: encode(element) for key, element in value.items()}
+        elif isinstance(value, list):
+            return [encode(element) for element in value]
+        path = os.path.abspath(str(value))
+        if os.path.commonpath([path, step_dir]) != step_dir:
+            raise ValueError(path)
+        return os.path.relpath(path, step_dir)
+
+    try:
+        return encode(views)
+    except ValueError:
+        return None
+
+
+def _decode_views(views: Dict[str, Any], step_dir: str) -> Dict[str, Any]:
+    def decode(value: Any) -> Any:
+        if value is None:
+            return None
+        elif isinstance(value, dict):
+            return {key: decode(element) for key, element in value.items()}
+        elif isinstance(value, list):
+            return [decode(element) for element in value]
+        return Path(os.path.join(step_dir, value))
+
+    return decode(views)
+
+
+def _clone_or_copy(src: str, dst: str):
+    # Entries and step directories share data where the filesystem supports
+    # reflinks (btrfs, XFS, …). Hardlinks are not used: a step that runs again
+    # in the same directory would overwrite the cache entry in place.
+    try:
+        with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+            fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+            cloned = os.fstat(dst_file.fileno()).st_size == os.fstat(
+                src_file.fileno()
+            ).st_size
+        if cloned:
+            shutil.copystat(src, dst)
+            return
+    except OSError:
+        pass
+    shutil.copy2(src, dst)
+
+
+def _ignore_start_files(root: str):
+    def ignore(directory: str, names: List[str]) -> List[str]:
+        if os.path.abspath(directory) != os.path.abspath(root):
+            return []
+        return [name for name in names if name in START_FILES]
+
+    return ignore
+
+
+def _entry_dir(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, key[:2], key)
+
+
+def load(
+    cache_dir: str,
+    key: str,
+    step_dir: str,
+) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Restores a cached step into ``step_dir`` and marks the entry as used.
+
+    :returns: The step's views and metrics updates, or ``None`` on a cache
+        miss.
+    """
+    entry = _entry_dir(cache_dir, key)
+    manifest_path = os.path.join(entry, "entry.json")
+    try:
+        with open(manifest_path, encoding="utf8") as f:
+            manifest = json.load(f)
+        shutil.copytree(
+            os.path.join(entry, "files"),
+            step_dir,
+            copy_function=_clone_or_copy,
+            dirs_exist_ok=True,
+        )
+        os.utime(manifest_path)
+    except FileNotFoundError:
+        # Also covers entries evicted while they were being restored
+        return None
+    step_dir = os.path.abspath(step_dir)
+    return (
+        _decode_views(manifest["views"], step_dir),
+        decode_metrics(manifest["metrics"]),
+    )
+
+
+def store(
+    cache_dir: str,
+    key: str,
+    step_dir: str,
+    views_updates: Dict[str, Any],
+    metrics_updates: Dict[str, Any],
+    size_limit: Optional[int] = None,
+) -> bool:
+    """
+    Stores the contents of ``step_dir`` with the step's views and metrics
+    updates, then evicts the least recently used entries until the cache is
+    no larger than ``size_limit`` bytes.
+
+    :returns: Whether the step could be cached, i.e. whether all of its views
+        are inside ``step_dir``.
+    """
+    step_dir = os.path.abspath(step_dir)
+    views = _encode_views(
+        {
+            format.value.id if isinstance(format, DesignFormat) else format: value
+            for format, value in views_updates.items()
+        },
+        step_dir,
+    )
+    if views is None:
+        return False
+
+    entry = _entry_dir(cache_dir, key)
+    added = 0
+    if not os.path.isdir(entry):
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f".{key}-", dir=os.path.dirname(entry))
+        try:
+            files = os.path.join(staging, "files")
+            shutil.copytree(
+                step_dir,
+                files,
+                ignore=_ignore_start_files(step_dir),
+                copy_function=_clone_or_copy,
+            )
+            size = 0
+            for root, _, names in os.walk(files):
+                for name in names:
+                    size += os.path.getsize(os.path.join(root, name))
+            with open(os.path.join(staging, "entry.json"), "w", encoding="utf8") as f:
+                manifest = {
+                    "views": views,
+                    "metrics": encode_metrics(metrics_updates),
+                    "size": size,
+                }
+                json.dump(manifest, f, indent=4)
+            os.rename(staging, entry)
+            added = size
+        except OSError:
+            # Another process stored the same entry first
+            if not os.path.isdir(entry):
+                raise
+        finally:
+            if os.path.isdir(staging):
+                shutil.rmtree(staging)
+
+    with _size_file(cache_dir) as f:
+        total = _read_total(f)
+        if total is None:
+            # Created by a version without a size file, or damaged
+            total = sum(size for _, size, _ in _list_entries(cache_dir))
+        else:
+            total += added
+        if size_limit is not None and total > size_limit:
+            total = _evict(cache_dir, size_limit)
+        _write_total(f, total)
+    return True
+
+
+@contextmanager
+def _size_file(cache_dir: str) -> Iterator[IO[str]]:
+    # Held while the size file is read and written, and while entries are
+    # evicted, so concurrent flows sharing a cache agree on its size
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(os.path.join(cache_dir, SIZE_FILE), "a+", encoding="utf8") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield f
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _read_total(f: IO[str]) -> Optional[int]:
+    f.seek(0)
+    try:
+        return int(json.load(f)["total"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_total(f: IO[str], total: int):
+    f.seek(0)
+    f.truncate()
+    json.dump({"total": total}, f)
+    f.flush()
+
+
+def _list_entries(cache_dir: str) -> List[Tuple[float, int, str]]:
+    # The time each entry was last used, its size and its directory
+    entries = []
+    manifests = glob.glob(os.path.join(cache_dir, "*", "*", "entry.json"))
+    for manifest_path in manifests:
+        try:
+            last_used = os.path.getmtime(manifest_path)
+            with open(manifest_path, encoding="utf8") as f:
+                size = json.load(f)["size"]
+        except (OSError, ValueError, KeyError):
+            continue
+        entries.append((last_used, size, os.path.dirname(manifest_path)))
+    return entries
+
+
+def _evict(cache_dir: str, size_limit: int) -> int:
+    entries = _list_entries(cache_dir)
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry in sorted(entries):
+        if total <= size_limit:
+            break
+        # Renamed first, so readers never see an entry that is half removed
+        evicted = os.path.join(
+            os.path.dirname(entry), f".{os.path.basename(entry)}.evicted"
+        )
+        try:
+            os.rename(entry, evicted)
+        except OSError:
+            continue  # Removed by another process
+        shutil.rmtree(evicted, ignore_errors=True)
+        total -= size
+    return total
+
+
+def evict(cache_dir: str, size_limit: int):
+    """
+    Removes the least recently used entries until the cache is no larger
+    than ``size_limit`` bytes.
+    """
+    with _size_file(cache_dir) as f:
+        _write_total(f, _evict(cache_dir, size_limit))
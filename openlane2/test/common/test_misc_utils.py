@@ -91,6 +91,17 @@ def test_slugify():
     ), "Failed slugify test"
 
 
+def test_parse_size():
+    from openlane.common import format_size, parse_size
+
+    assert parse_size("512B") == 513
+    assert parse_size("3MiB") == 4 * 1024**2
+    for size in [0, 1023, 1024, 5 * 1024**3 + 7]:
+        assert parse_size(format_size(size)) > size, "parse_size rounded down"
+    with pytest.raises(ValueError, match="Invalid size"):
+        parse_size("3MB")
+
+
 def test_magic_drc():
     from openlane.common import DRC, Violation
 
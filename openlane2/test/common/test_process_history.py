@@ -0,0 +1,119 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+
+import pytest
+
+
+def stats(runtime, peak_rss, peak_cpu=100.0):
+    return {
+        "time": {"runtime": runtime, "cpu_time_user": runtime, "cpu_time_system": 0},
+        "peak_resources": {"cpu_percent": peak_cpu, "memory_rss": peak_rss},
+        "avg_resources": {"cpu_percent": peak_cpu / 2, "memory_rss": peak_rss / 2},
+    }
+
+
+def test_predict(tmp_path):
+    from openlane.common import ProcessHistory
+    from openlane.common.process_history import settings_digest
+
+    history = ProcessHistory(str(tmp_path / "history.sqlite"))
+    assert history.predict("openroad-staprepnr", "sta") is None
+
+    settings = settings_digest({"CLOCK_PERIOD": 10, "SYNTH_STRATEGY": "AREA 0"})
+    other_settings = settings_digest({"CLOCK_PERIOD": 10, "SYNTH_STRATEGY": "DELAY 4"})
+    history.record(
+        "a/sta.process_stats.json",
+        "openroad-staprepnr",
+        "sta",
+        stats(10.0, 1000, 250.0),
+        settings=settings,
+        size=1000,
+    )
+    history.record(
+        "b/sta.process_stats.json",
+        "openroad-staprepnr",
+        "sta",
+        stats(100.0, 50000),
+        settings=settings,
+        size=100000,
+    )
+    history.record(
+        "c/sta.process_stats.json",
+        "openroad-staprepnr",
+        "sta",
+        stats(1.0, 10**9),
+        settings=other_settings,
+        size=2000,
+    )
+
+    prediction = history.predict(
+        "openroad-staprepnr", "sta", settings=settings, size=2000
+    )
+    assert prediction is not None
+    assert prediction.samples == 2, "records with other settings were used"
+    # The nearest sizes, scaled linearly: 1000 -> 2000 and 100000 -> 2000
+    assert prediction.peak_memory == 2000
+    assert prediction.runtime == pytest.approx((20.0 + 2.0) / 2)
+    assert prediction.cpus == 2.5
+
+    unsized = history.predict("openroad-staprepnr", settings=other_settings)
+    assert unsized == (1.0, 10**9, 1.0, 1)
+
+    # A later record of the same file replaces the earlier one
+    history.record(
+        "c/sta.process_stats.json",
+        "openroad-staprepnr",
+        "sta",
+        stats(2.0, 10),
+        settings=other_settings,
+    )
+    assert history.predict("openroad-staprepnr", settings=other_settings) == (
+        2.0,
+        10,
+        1.0,
+        1,
+    )
+    history.close()
+
+
+def test_ingest(tmp_path):
+    from openlane.common import ProcessHistory
+
+    step_dir = tmp_path / "runs" / "RUN_1" / "3-yosys-synthesis"
+    step_dir.mkdir(parents=True)
+    (step_dir / "yosys-synthesis.process_stats.json").write_text(
+        json.dumps(
+            {
+                "time": {
+                    "cpu_time_user": "00:00:01.500",
+                    "cpu_time_system": "00:00:00.500",
+                    "runtime": "00:01:02.250",
+                },
+                "peak_resources": {"cpu_percent": 99.5, "memory_rss": "1GiB"},
+                "avg_resources": {"cpu_percent": 80.0, "memory_rss": "512MiB"},
+            }
+        )
+    )
+    (step_dir / "broken.process_stats.json").write_text("{")
+
+    history = ProcessHistory(str(tmp_path / "runs" / "process_history.sqlite"))
+    assert history.ingest(str(tmp_path / "runs" / "RUN_1")) == 1
+    assert history.ingest(str(tmp_path / "runs" / "RUN_1")) == 0
+
+    prediction = history.predict("yosys-synthesis", "yosys-synthesis")
+    assert prediction is not None
+    assert prediction.runtime == pytest.approx(62.25)
+    assert prediction.peak_memory == 2 * 1024**3
+    history.close()
@@ -0,0 +1,75 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import time
+import threading
+
+
+def test_scheduler_limits():
+    from openlane.common import ResourceScheduler
+
+    scheduler = ResourceScheduler(cpus=4, memory=1000)
+    order = []
+    peak = {"cpus": 0.0, "memory": 0}
+    lock = threading.Lock()
+
+    def job(name, cpus, memory, priority=0):
+        with scheduler.reserve(cpus, memory, priority):
+            with lock:
+                order.append(name)
+                peak["cpus"] = max(peak["cpus"], scheduler.used_cpus)
+                peak["memory"] = max(peak["memory"], scheduler.used_memory)
+            time.sleep(0.05)
+
+    # Holds everything while the others queue up
+    blocker = threading.Thread(target=job, args=("blocker", 4, 1000))
+    blocker.start()
+    while scheduler.running == 0:
+        time.sleep(0.001)
+
+    threads = [
+        threading.Thread(target=job, args=("low", 1, 600)),
+        threading.Thread(target=job, args=("huge", 64, 10**9)),
+    ]
+    for thread in threads:
+        thread.start()
+        while len(scheduler._waiting) < threads.index(thread) + 1:
+            time.sleep(0.001)
+    high = threading.Thread(target=job, args=("high", 1, 600), kwargs={"priority": 1})
+    high.start()
+    for thread in [blocker, *threads, high]:
+        thread.join()
+
+    assert order == ["blocker", "high", "low", "huge"]
+    assert peak["cpus"] <= 4 and peak["memory"] <= 1000, "limits exceeded"
+    assert scheduler.running == 0 and scheduler.used_cpus == 0
+
+
+def test_estimates_seed(tmp_path):
+    from openlane.common.scheduler import ResourceEstimates
+
+    corner_dir = tmp_path / "run" / "12-openroad-staprepnr" / "nom_tt_025C_1v80"
+    corner_dir.mkdir(parents=True)
+    (corner_dir / "sta.process_stats.json").write_text(
+        json.dumps({"peak_resources": {"cpu_percent": 250.0, "memory_rss": "3MiB"}})
+    )
+    (corner_dir / "broken.process_stats.json").write_text("{")
+
+    estimates = ResourceEstimates()
+    estimates.seed(str(tmp_path / "run"))
+    assert estimates.get(("openroad-staprepnr", "sta")) == (2.5, 4 * 1024**2)
+    assert estimates.get(("openroad-staprepnr", "broken")) == estimates.default
+
+    estimates.record(("openroad-staprepnr", "sta"), 1.0, 5 * 1024**2)
+    assert estimates.get(("openroad-staprepnr", "sta")) == (2.5, 5 * 1024**2)
@@ -727,3 +727,45 @@ def test_dis_migration(caplog: pytest.LogCaptureFixture):
         "See 'Migrating DIODE_INSERTION_STRATEGY'" in caplog.text
     ), "diode insertion strategy did not trigger a warning"
     caplog.clear()
+
+
+@pytest.mark.usefixtures("_mock_conf_fs")
+@mock_variables()
+def test_pdk_cache(monkeypatch: pytest.MonkeyPatch):
+    from unittest import mock
+
+    from openlane.common import TclUtils
+    from openlane.config import Config, pdk_cache
+
+    monkeypatch.setenv("OPENLANE_PDK_CACHE_DIR", "/cache")
+    pdk_cache.clear()
+
+    def load():
+        cfg, _ = Config.load(
+            {"DESIGN_NAME": "whatever", "VERILOG_FILES": "dir::src/*.v"},
+            config.flow_common_variables,
+            design_dir="/cwd",
+            pdk="dummy",
+            pdk_root="/pdk",
+        )
+        return cfg
+
+    with mock.patch.object(TclUtils, "_eval_env", wraps=TclUtils._eval_env) as eval_env:
+        first = load()
+        assert eval_env.call_count == 2, "PDK and SCL files not evaluated once each"
+        assert load() == first
+        assert eval_env.call_count == 2, "PDK configuration not cached in memory"
+
+        pdk_cache.clear()
+        assert load() == first
+        assert eval_env.call_count == 2, "PDK configuration not cached on disk"
+
+        with open("/pdk/dummy/libs.tech/openlane/config.tcl", "a") as f:
+            f.write('set ::env(TECH_LEF) "/pdk/dummy/other.tlef"\n')
+        with open("/pdk/dummy/other.tlef", "w") as f:
+            f.write("")
+        changed = load()
+        assert eval_env.call_count == 4, "changed PDK configuration not evaluated"
+        assert changed["TECH_LEFS"] == {"nom_*": "/pdk/dummy/other.tlef"}
+
+    pdk_cache.clear(disk=True)
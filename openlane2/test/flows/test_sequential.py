@@ -77,6 +77,53 @@ def test_sequential_flow(MetricIncrementer: Type[Step]):
     assert state.metrics["counter"] == 4, "SequentialFlow did not run properly"
 
 
+@pytest.mark.usefixtures("_mock_conf_fs")
+@mock_variables([flow_module, sequential_flow_module, step_module])
+def test_step_cache_metrics(MetricIncrementer: Type[Step]):
+    import json
+    from openlane.config.flow import option_variables
+    from openlane.flows import SequentialFlow
+
+    class CachedIncrementer(MetricIncrementer):
+        id = "Test.CachedIncrementer"
+        config_vars = [
+            variable
+            for variable in option_variables
+            if variable.name.startswith("STEP_CACHE_")
+        ]
+
+    class Dummy(SequentialFlow):
+        Steps = [CachedIncrementer, CachedIncrementer]
+
+    def start(tag: str):
+        flow = Dummy(
+            {
+                "DESIGN_NAME": "WHATEVER",
+                "VERILOG_FILES": ["/cwd/src/a.v"],
+                "STEP_CACHE_DIR": "/cache",
+            },
+            design_dir="/cwd",
+            pdk="dummy",
+            scl="dummy_scl",
+            pdk_root="/pdk",
+        )
+        return flow, flow.start(tag=tag)
+
+    _, state = start("first")
+    assert state.metrics["flow__step_cache__hit__count"] == 0
+    assert state.metrics["flow__step_cache__miss__count"] == 2
+
+    flow, state = start("second")
+    assert state.metrics["counter"] == 2
+    assert state.metrics["flow__step_cache__hit__count"] == 2
+    assert state.metrics["flow__step_cache__miss__count"] == 0
+    with open(f"{flow.run_dir}/final/metrics.json") as f:
+        metrics = json.load(f)
+    assert (
+        metrics["flow__step_cache__hit__count"] == 2
+    ), "step cache metrics were not saved with the final views"
+
+
 @pytest.mark.usefixtures("_mock_conf_fs")
 @mock_variables([flow_module, sequential_flow_module, step_module])
 def test_custom_seqflow(MetricIncrementer):
@@ -238,3 +238,38 @@ def test_loads():
 
     new_state = State.loads(json.dumps(state.to_raw_dict()))
     assert new_state.to_raw_dict() == state.to_raw_dict()
+
+
+@pytest.mark.usefixtures("_mock_fs")
+def test_deferred_view():
+    from openlane.common import Path
+    from openlane.state import DesignFormat, State, deferred
+    from openlane.steps import step_cache
+
+    os.mkdir("step")
+    with open("step/spm.odb", "w") as f:
+        f.write("odb\n")
+    with open("step/spm.def", "w") as f:
+        f.write("stale\n")
+
+    # Derived by copying the source
+    def_view = deferred.defer("step/spm.def", "step/spm.odb", "shutil:copyfile")
+    assert not os.path.exists(def_view), "stale view was not removed"
+    state = State({"odb": Path("step/spm.odb"), "def": def_view})
+    key = step_cache.step_key("Odb.Test", "Odb.Test", {}, state)
+
+    loaded = State.loads(state.dumps())
+    assert loaded[DesignFormat.DEF] == def_view
+
+    state.materialize([DesignFormat.ODB])
+    assert deferred.is_pending(def_view)
+    state.materialize([DesignFormat.DEF])
+    assert not deferred.is_pending(def_view)
+    assert open(def_view, encoding="utf8").read() == "odb\n"
+    assert (
+        step_cache.step_key("Odb.Test", "Odb.Test", {}, state) == key
+    ), "writing a deferred view changed the step key"
+
+    os.unlink(def_view)
+    state.save_snapshot("out")
+    assert open("out/def/spm.def", encoding="utf8").read() == "odb\n"
@@ -0,0 +1,90 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sys
+import json
+import subprocess
+from typing import Dict, List, Tuple
+
+TOOL_MODULES = [
+    "openlane.steps.checker",
+    "openlane.steps.yosys",
+    "openlane.steps.pyosys",
+    "openlane.steps.openroad",
+    "openlane.steps.odb",
+    "openlane.steps.magic",
+    "openlane.steps.netgen",
+    "openlane.steps.klayout",
+    "openlane.steps.misc",
+    "openlane.steps.verilator",
+]
+
+
+def import_time(statements: str) -> Tuple[Dict[str, int], List[str]]:
+    """
+    Runs ``statements`` in a fresh interpreter with ``-X importtime``.
+
+    :returns: The cumulative import time of each top-level import, in
+        microseconds, and the modules loaded once the statements are done.
+    """
+    process = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"{statements}\nimport sys, json\nprint(json.dumps(sorted(sys.modules)))",
+        ],
+        capture_output=True,
+        encoding="utf8",
+        check=True,
+    )
+    cumulative = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, total, name = line[len("import time:") :].split("|")
+        if not name.startswith("  "):  # Imported by the statements themselves
+            cumulative[name.strip()] = int(total)
+    return cumulative, json.loads(process.stdout.splitlines()[-1])
+
+
+def test_import_time():
+    cumulative, modules = import_time("import openlane.steps")
+    print(f"import openlane.steps: {cumulative['openlane.steps'] / 1000:.1f} ms")
+    eager = [module for module in TOOL_MODULES if module in modules]
+    assert eager == [], "tool step modules imported eagerly"
+    assert "httpx" not in modules, "httpx imported eagerly"
+
+    _, modules = import_time(
+        "from openlane.steps import Step\n"
+        "assert Step.factory.get('Magic.StreamOut') is not None\n"
+        "import openlane.plugins\n"
+        "assert openlane.plugins._discovered_plugins is None, 'plugins searched for'"
+    )
+    assert "openlane.steps.magic" in modules
+    assert "openlane.steps.klayout" not in modules, "unrelated step module imported"
+
+
+def test_step_modules():
+    from openlane.steps import Step
+    from openlane.steps.step import STEP_MODULES
+
+    for step_id in Step.factory.list():
+        module = Step.factory.get(step_id).__module__
+        if not module.startswith("openlane.steps."):
+            continue  # A plugin
+        prefix = step_id.split(".")[0]
+        assert module.split(".")[-1] in STEP_MODULES.get(
+            prefix, []
+        ), f"'{step_id}' is defined in a module not listed for '{prefix}'"
@@ -0,0 +1,142 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import sys
+import stat
+import textwrap
+
+import pytest
+
+from openlane.steps import step
+
+mock_variables = pytest.mock_variables
+
+# Writes every --output-<format> file it is given, naming the input ODB, and
+# fails with an OpenROAD error if _FAKE_FAIL is set.
+FAKE_OPENROAD = textwrap.dedent(
+    f"""\
+    #!{sys.executable}
+    import os
+    import sys
+
+    if "_FAKE_FAIL" in os.environ:
+        print("[ERROR ODB-0001] fake failure")
+        sys.exit(1)
+    args = sys.argv[sys.argv.index("-python") + 2 :]
+    for i, arg in enumerate(args):
+        if arg.startswith("--output-"):
+            with open(args[i + 1], "w") as f:
+                f.write(f"{{arg[len('--output-'):]}} of {{args[-1]}}")
+    """
+)
+
+
+@pytest.fixture()
+def _fake_openroad(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    path = bin_dir / "openroad"
+    path.write_text(FAKE_OPENROAD)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{bin_dir}:{os.environ['PATH']}")
+
+
+@pytest.mark.usefixtures("_fake_openroad")
+@mock_variables([step])
+def test_deferred_def(tmp_path, monkeypatch):
+    from openlane.common import Path, Toolbox
+    from openlane.config import Config
+    from openlane.state import DesignFormat, State, deferred
+    from openlane.steps import Step, StepException
+    from openlane.steps.odb import OdbpyStep
+
+    class WriteOdb(OdbpyStep):
+        id = "Test.WriteOdb"
+        config_vars = []
+
+        def get_script_path(self):
+            return "write_odb.py"
+
+        def get_command(self):
+            return ["openroad", "-exit", "-no_splash", "-python", "write_odb.py"]
+
+    read = []
+
+    class ReadDef(Step):
+        id = "Test.ReadDef"
+        inputs = [DesignFormat.DEF]
+        outputs = []
+
+        def run(self, state_in, **kwargs):
+            with open(str(state_in[DesignFormat.DEF])) as f:
+                read.append(f.read())
+            return {}, {}
+
+    config = Config(
+        {
+            "DESIGN_NAME": "top",
+            "DESIGN_DIR": str(tmp_path),
+            "EXAMPLE_PDK_VAR": "bla",
+            "PDK_ROOT": "/pdk",
+            "PDK": "dummy",
+            "STD_CELL_LIBRARY": "dummy_scl",
+            "VERILOG_FILES": [],
+            "GRT_REPAIR_ANTENNAS": True,
+            "RUN_HEURISTIC_DIODE_INSERTION": False,
+            "MACROS": None,
+            "DIODE_ON_PORTS": None,
+            "TECH_LEFS": {},
+            "DEFAULT_CORNER": "nom_tt_025C_1v80",
+            "RANDOM_ARRAY": None,
+        }
+    )
+    toolbox = Toolbox(tmp_dir=str(tmp_path / "tmp"))
+    odb_in = tmp_path / "in.odb"
+    odb_in.write_text("odb")
+
+    step_dir = tmp_path / "run" / "1-test-writeodb"
+    writer = WriteOdb(
+        config=config,
+        state_in=State({DesignFormat.ODB: Path(str(odb_in))}),
+        _no_revalidate_conf=True,
+    )
+    state_out = writer.start(toolbox=toolbox, step_dir=str(step_dir))
+    def_path = str(state_out[DesignFormat.DEF])
+    odb_path = str(state_out[DesignFormat.ODB])
+
+    command = (step_dir / "COMMANDS").read_text()
+    assert "--output-odb" in command
+    assert "--output-def" not in command, "the DEF view was not deferred"
+    assert deferred.derivation(def_path) == (
+        odb_path,
+        "openlane.steps.odb:write_def",
+    )
+    assert os.path.isfile(def_path + deferred.MARKER_SUFFIX)
+    assert not os.path.exists(def_path)
+
+    reader = ReadDef(config=config, state_in=state_out, _no_revalidate_conf=True)
+    reader.start(toolbox=toolbox, step_dir=str(tmp_path / "run" / "2-test-readdef"))
+    assert read == [
+        f"def of {odb_path}"
+    ], "the DEF view was not written for its consumer"
+    assert (step_dir / "write_def.log").is_file()
+    assert (step_dir / "write_def.process_stats.json").is_file()
+
+    writer.start(toolbox=toolbox, step_dir=str(step_dir))
+    monkeypatch.setenv("_FAKE_FAIL", "1")
+    reader = ReadDef(config=config, state_in=state_out, _no_revalidate_conf=True)
+    with pytest.raises(StepException, match=r"\[ERROR ODB-0001\] fake failure"):
+        reader.start(
+            toolbox=toolbox, step_dir=str(tmp_path / "run" / "3-test-readdef")
+        )
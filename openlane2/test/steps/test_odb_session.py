@@ -0,0 +1,163 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import sys
+import stat
+import json
+import textwrap
+import subprocess
+
+import pytest
+
+# Speaks the session protocol without OpenROAD: the output of a job is the
+# session's PID, the output ODB and the metrics file are written, and the exit
+# code is _FAKE_RETURNCODE. Run without session.py, it prints "direct".
+FAKE_OPENROAD = textwrap.dedent(
+    f"""\
+    #!{sys.executable}
+    import os
+    import sys
+    import json
+
+    script = sys.argv[sys.argv.index("-python") + 1]
+    if not script.endswith("session.py"):
+        print("direct")
+        sys.exit(0)
+
+    def reply(message):
+        print("%OL_SESSION " + json.dumps(message), flush=True)
+
+    print("[WARNING ORD-0039] .openroad ignored with -python", flush=True)
+    reply({{"metrics": "_FAKE_NO_METRICS" not in os.environ}})
+    for line in sys.stdin:
+        job = json.loads(line)
+        args, env = job["args"], job["env"]
+        with open(job["output"], "w") as f:
+            print(os.getpid(), file=f)
+        if job["metrics"] is not None:
+            with open(job["metrics"], "w") as f:
+                json.dump({{"script": os.path.basename(job["script"])}}, f)
+        returncode = int(env["_FAKE_RETURNCODE"])
+        resident = None
+        if returncode == 0 and "--output-odb" in args:
+            odb = os.path.join(job["cwd"], args[args.index("--output-odb") + 1])
+            with open(odb, "w") as f:
+                f.write(job["script"])
+            stat = os.stat(odb)
+            resident = [os.path.abspath(odb), stat.st_size, stat.st_mtime_ns]
+        reply({{"returncode": returncode, "resident": resident}})
+        if resident is None:
+            break
+    """
+)
+
+
+@pytest.fixture()
+def fake_openroad(tmp_path):
+    from openlane.steps import odb_session
+
+    path = tmp_path / "openroad"
+    path.write_text(FAKE_OPENROAD)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    yield str(path)
+    odb_session.shutdown()
+    odb_session._unsupported.clear()
+
+
+def run_step(openroad, tmp_path, name, input_odb, **env):
+    from openlane.steps import odb_session
+
+    step_dir = tmp_path / name
+    step_dir.mkdir()
+    cmd = [
+        openroad,
+        "-exit",
+        "-no_splash",
+        "-metrics",
+        str(step_dir / "or_metrics_out.json"),
+        "-python",
+        f"{name}.py",
+        "--output-odb",
+        str(step_dir / "out.odb"),
+        str(input_odb),
+    ]
+    env = {**os.environ, "_FAKE_RETURNCODE": "0", **env}
+    job = odb_session.popen(
+        cmd,
+        env=env,
+        encoding="utf8",
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+    )
+    lines = list(job.stdout)
+    return job.wait(), lines, step_dir
+
+
+def test_session_chain(fake_openroad, tmp_path):
+    odb = tmp_path / "in.odb"
+    odb.write_text("odb")
+
+    returncode, (pid,), first_dir = run_step(fake_openroad, tmp_path, "a", odb)
+    assert returncode == 0
+    metrics = json.loads((first_dir / "or_metrics_out.json").read_text())
+    assert metrics == {"script": "a.py"}
+
+    returncode, lines, second_dir = run_step(
+        fake_openroad, tmp_path, "b", first_dir / "out.odb"
+    )
+    assert returncode == 0
+    assert lines == [pid], "session that wrote the input was not reused"
+
+    _, lines, _ = run_step(fake_openroad, tmp_path, "c", odb)
+    assert lines != [pid], "session was reused for an ODB it did not write"
+
+    (second_dir / "out.odb").write_text("changed by another step")
+    _, lines, _ = run_step(fake_openroad, tmp_path, "d", second_dir / "out.odb")
+    assert lines != [pid], "session was reused after its ODB changed"
+
+
+def test_session_failure(fake_openroad, tmp_path):
+    odb = tmp_path / "in.odb"
+    odb.write_text("odb")
+
+    _, (pid,), first_dir = run_step(fake_openroad, tmp_path, "a", odb)
+    returncode, lines, _ = run_step(
+        fake_openroad, tmp_path, "b", first_dir / "out.odb", _FAKE_RETURNCODE="1"
+    )
+    assert returncode == 1
+    assert lines == [pid]
+
+    _, lines, _ = run_step(fake_openroad, tmp_path, "c", first_dir / "out.odb")
+    assert lines != [pid], "session was reused after a failed job"
+
+
+def test_session_without_metrics(fake_openroad, tmp_path):
+    odb = tmp_path / "in.odb"
+    odb.write_text("odb")
+
+    returncode, lines, _ = run_step(
+        fake_openroad, tmp_path, "a", odb, _FAKE_NO_METRICS="1"
+    )
+    assert returncode == 0
+    assert lines == ["direct\n"]
+
+
+def test_parse_command():
+    from openlane.steps import odb_session
+
+    assert odb_session.parse_command(
+        ["openroad", "-exit", "-metrics", "m.json", "-python", "s.py", "in.odb"]
+    ) == (["openroad", "-exit"], "m.json", "s.py", ["in.odb"])
+    with pytest.raises(ValueError, match="Not an OpenROAD Python script"):
+        odb_session.popen(["openroad", "-exit", "script.tcl"], env={})
@@ -0,0 +1,62 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sys
+import subprocess
+
+import pytest
+
+# Allocates 64 MiB in a grandchild of the tracked process and burns CPU
+GRANDCHILD = """
+import time
+memory = bytearray(64 * 1024 * 1024)
+end = time.monotonic() + 0.6
+while time.monotonic() < end:
+    pass
+"""
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="requires /proc")
+def test_process_tree():
+    import psutil
+    from openlane.steps.process_stats import ProcessStatsThread, _get_sampler
+
+    processes = [
+        psutil.Popen(
+            ["sh", "-c", f'"{sys.executable}" -c "$0"; exit 0', GRANDCHILD],
+            stdout=subprocess.DEVNULL,
+        )
+        for _ in range(2)
+    ]
+    trackers = [ProcessStatsThread(process) for process in processes]
+    for tracker in trackers:
+        tracker.start()
+    for process, tracker in zip(processes, trackers):
+        process.wait()
+        tracker.join()
+        assert not tracker.is_alive()
+
+        stats = tracker.stats
+        assert stats["peak_resources"]["memory_rss"] >= 64 * 1024 * 1024
+        # The grandchildren may share a core with each other and other tests
+        assert stats["peak_resources"]["cpu_percent"] > 0
+        assert stats["time"]["cpu_time_user"] + stats["time"]["cpu_time_system"] > 0
+        assert stats["time"]["runtime"] >= 0.5
+        assert 0 < stats["avg_resources"]["memory_rss"]
+        assert (
+            stats["avg_resources"]["memory_rss"]
+            <= stats["peak_resources"]["memory_rss"]
+        )
+        assert set(tracker.stats_as_dict()) == set(stats)
+
+    assert _get_sampler().name == "ProcessSampler", "sampler not shared"
@@ -0,0 +1,87 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import sys
+import stat
+import textwrap
+
+import pytest
+
+# Speaks the worker protocol without Yosys: the first job argument is the
+# exit code, and the output is the worker's PID and the job's arguments.
+FAKE_YOSYS = textwrap.dedent(
+    f"""\
+    #!{sys.executable}
+    import os
+    import sys
+    import json
+
+    for line in sys.stdin:
+        job = json.loads(line)
+        with open(job["output"], "w") as f:
+            print(os.getpid(), file=f)
+            print(" ".join(job["args"]), file=f)
+            f.write("no trailing newline")
+        print(json.dumps({{"returncode": int(job["args"][0])}}), flush=True)
+    """
+)
+
+
+@pytest.fixture()
+def fake_yosys(tmp_path):
+    from openlane.steps import pyosys_worker
+
+    path = tmp_path / "yosys"
+    path.write_text(FAKE_YOSYS)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    yield str(path)
+    pyosys_worker.shutdown()
+
+
+def test_worker_job(fake_yosys):
+    from openlane.steps import pyosys_worker
+
+    env = dict(os.environ)
+    job = pyosys_worker.popen(
+        [fake_yosys, "-y", "synthesize.py", "-qq", "--", "0", "--output", "x"],
+        env=env,
+    )
+    pid, args, last = list(job.stdout)
+    assert job.wait() == 0
+    assert args == "0 --output x\n"
+    assert last == "no trailing newline"
+    assert job.status() == "dead"
+
+    failing = pyosys_worker.popen(
+        [fake_yosys, "-y", "synthesize.py", "-qq", "--", "3"],
+        env=env,
+    )
+    lines = list(failing.stdout)
+    assert failing.wait() == 3
+    assert lines[0] == pid, "idle worker was not reused"
+
+    other_flags = pyosys_worker.popen(
+        [fake_yosys, "-y", "synthesize.py", "-q", "--", "0"],
+        env=env,
+    )
+    lines = list(other_flags.stdout)
+    assert other_flags.wait() == 0
+    assert lines[0] != pid, "worker was reused with different yosys flags"
+
+
+def test_worker_not_pyosys():
+    from openlane.steps import pyosys_worker
+
+    with pytest.raises(ValueError, match="Not a pyosys script invocation"):
+        pyosys_worker.popen(["yosys", "-p", "help"], env={})
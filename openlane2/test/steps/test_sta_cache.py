@@ -0,0 +1,77 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from decimal import Decimal
+
+
+def test_corner_key(tmp_path):
+    from openlane.steps import sta_cache
+
+    netlists = []
+    for run in ["run_a", "run_b"]:
+        netlist = tmp_path / run / "1-yosys-synthesis" / "top.nl.v"
+        netlist.parent.mkdir(parents=True)
+        netlist.write_text("module top(); endmodule")
+        netlists.append(netlist)
+
+    def key(netlist, step_dir, **kwargs):
+        env = {
+            "CURRENT_NETLIST": str(netlist),
+            "STEP_DIR": str(step_dir),
+            "_SDF_SAVE_DIR": f"{step_dir}/nom_tt_025C_1v80",
+            "CLOCK_PERIOD": "10",
+            **kwargs,
+        }
+        return sta_cache.corner_key(
+            "OpenROAD.STAPrePNR", "nom_tt_025C_1v80", ["sta"], env, str(step_dir)
+        )
+
+    base = key(netlists[0], tmp_path / "run_a" / "2-openroad-staprepnr")
+    assert base == key(
+        netlists[1], tmp_path / "run_b" / "5-openroad-staprepnr"
+    ), "identical inputs in another run have a different key"
+    assert base != key(
+        netlists[0], tmp_path / "run_a" / "2-openroad-staprepnr", CLOCK_PERIOD="9"
+    ), "a changed variable has the same key"
+
+    netlists[1].write_text("module top(input a); endmodule")
+    assert base != key(
+        netlists[1], tmp_path / "run_b" / "5-openroad-staprepnr"
+    ), "a changed input file has the same key"
+
+
+def test_store_load(tmp_path):
+    from openlane.steps import sta_cache
+
+    corner_dir = tmp_path / "step" / "nom_tt_025C_1v80"
+    corner_dir.mkdir(parents=True)
+    (corner_dir / "max.rpt").write_text("report")
+    metrics = {
+        "timing__setup__ws__corner:nom_tt_025C_1v80": Decimal("-0.25"),
+        "timing__setup_vio__count__corner:nom_tt_025C_1v80": 3,
+        "timing__unannotated_net__count__corner:nom_tt_025C_1v80": 0.0,
+        "design__instance__count": [1, 2],
+    }
+    cache_dir = str(tmp_path / "cache")
+
+    assert sta_cache.load(cache_dir, "ab" * 32, str(tmp_path / "restored")) is None
+    sta_cache.store(cache_dir, "ab" * 32, str(corner_dir), metrics)
+    sta_cache.store(cache_dir, "ab" * 32, str(corner_dir), metrics)
+
+    restored = tmp_path / "restored"
+    loaded = sta_cache.load(cache_dir, "ab" * 32, str(restored))
+    assert loaded == metrics
+    assert [type(value) for value in loaded.values()] == [
+        type(value) for value in metrics.values()
+    ]
+    assert (restored / "max.rpt").read_text() == "report"
@@ -0,0 +1,175 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import sys
+import stat
+import textwrap
+
+import pytest
+
+# Speaks the session protocol without OpenSTA: the output is the session's
+# PID, a metric and a report, and the exit code is _FAKE_RETURNCODE.
+FAKE_STA = textwrap.dedent(
+    f"""\
+    #!{sys.executable}
+    import os
+    import sys
+    import json
+    import tkinter
+
+    tcl = tkinter.Tcl()
+    for line in sys.stdin:
+        script, output, cwd, env = tcl.splitlist(line.strip())
+        env = dict(zip(*[iter(tcl.splitlist(env))] * 2))
+        with open(output, "w") as f:
+            print(os.getpid(), file=f)
+            corner = env["_CURRENT_CORNER_NAME"]
+            print(f"%OL_METRIC_F timing__setup__ws__corner:{{corner}} 0.5", file=f)
+            print("%OL_CREATE_REPORT max.rpt", file=f)
+            print(env["SPACED"], file=f)
+            f.write("%OL_END_REPORT")
+        print(json.dumps({{"returncode": int(env["_FAKE_RETURNCODE"])}}), flush=True)
+    """
+)
+
+
+# Runs the real session.tcl in a Tcl interpreter without OpenSTA: report
+# redirection is emulated by a transform on stdout that writes to the file.
+FAKE_STA_SESSION = textwrap.dedent(
+    f"""\
+    #!{sys.executable}
+    import os
+    import sys
+    import tkinter
+
+    tcl = tkinter.Tcl()
+    # tkinter removes exit
+    tcl.createcommand("exit", lambda code="0": os._exit(int(code)))
+    tcl.eval(
+        '''
+        namespace eval sta {{
+            proc redirect_file_begin {{path}} {{
+                set ::_fake_redirect [open $path w]
+                chan push stdout ::sta::_redirect
+            }}
+            proc redirect_file_end {{}} {{
+                chan pop stdout
+                close $::_fake_redirect
+            }}
+            proc _redirect {{command handle args}} {{
+                switch $command {{
+                    initialize {{ return {{initialize finalize write}} }}
+                    write {{
+                        _ol_puts -nonewline $::_fake_redirect [lindex $args 0]
+                        return ""
+                    }}
+                }}
+            }}
+        }}
+        '''
+    )
+    tcl.eval(f"source {{sys.argv[-1]}}")
+    """
+)
+
+
+@pytest.fixture()
+def fake_sta(tmp_path):
+    from openlane.steps import sta_session
+
+    path = tmp_path / "sta"
+    path.write_text(FAKE_STA)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    yield str(path)
+    sta_session.shutdown()
+
+
+def test_session_job(fake_sta, tmp_path):
+    from openlane.steps import sta_session
+
+    lib = tmp_path / "a.lib"
+    lib.write_text("library (a) {}")
+    env = dict(
+        os.environ,
+        _CURRENT_CORNER_NAME="nom_tt_025C_1v80",
+        _CURRENT_CORNER_LIBS=str(lib),
+        _FAKE_RETURNCODE="0",
+        SPACED='a "quoted" [value] with $ and {braces}',
+    )
+    cmd = [fake_sta, "-no_splash", "-exit", "corner.tcl"]
+    job = sta_session.popen(cmd, env=env)
+    pid, metric, start, report, end = list(job.stdout)
+    assert job.wait() == 0
+    assert metric == "%OL_METRIC_F timing__setup__ws__corner:nom_tt_025C_1v80 0.5\n"
+    assert report == 'a "quoted" [value] with $ and {braces}\n'
+    assert end == "%OL_END_REPORT"
+    assert job.status() == "dead"
+
+    failing = sta_session.popen(cmd, env=dict(env, _FAKE_RETURNCODE="1"))
+    lines = list(failing.stdout)
+    assert failing.wait() == 1
+    assert lines[0] == pid, "idle session was not reused"
+
+    other_corner = sta_session.popen(
+        cmd, env=dict(env, _CURRENT_CORNER_NAME="max_ss_100C_1v60")
+    )
+    lines = list(other_corner.stdout)
+    assert other_corner.wait() == 0
+    assert lines[0] != pid, "session was reused for a different corner"
+
+    lib.write_text("library (a) { /* changed */ }")
+    changed_lib = sta_session.popen(cmd, env=env)
+    lines = list(changed_lib.stdout)
+    assert changed_lib.wait() == 0
+    assert lines[0] != pid, "session was reused after a library changed"
+
+
+def test_session_not_sta_script():
+    from openlane.steps import sta_session
+
+    with pytest.raises(ValueError, match="Not an STA script invocation"):
+        sta_session.popen(["sta", "-no_splash"], env={})
+
+
+def test_session_stderr(tmp_path):
+    from openlane.steps import sta_session
+
+    sta = tmp_path / "sta"
+    sta.write_text(FAKE_STA_SESSION)
+    sta.chmod(sta.stat().st_mode | stat.S_IEXEC)
+    script = tmp_path / "corner.tcl"
+    script.write_text(
+        textwrap.dedent(
+            """\
+            puts "%OL_METRIC_I count 1"
+            puts stderr {[ERROR]: Could not read the SDC file.}
+            exit 1
+            """
+        )
+    )
+    try:
+        cmd = [str(sta), "-no_splash", "-exit", str(script)]
+        job = sta_session.popen(cmd, env=dict(os.environ), cwd=str(tmp_path))
+        lines = list(job.stdout)
+        assert job.wait() == 1
+        assert lines == [
+            "%OL_METRIC_I count 1\n",
+            "[ERROR]: Could not read the SDC file.\n",
+        ], "stderr of a job did not reach its output"
+
+        job = sta_session.popen(cmd, env=dict(os.environ), cwd=str(tmp_path))
+        assert len(list(job.stdout)) == 2
+        assert job.wait() == 1, "session did not survive a job's stderr output"
+    finally:
+        sta_session.shutdown()
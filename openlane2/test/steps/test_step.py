@@ -414,3 +414,115 @@ def test_run_subprocess(mock_run):
 
     with pytest.raises(StepException, match="non-UTF-8"):
         step.start(step_dir=".")
+
+
+@pytest.mark.usefixtures("_chdir_tmp")
+@mock_variables([step])
+def test_run_subprocess_bulk_reports(mock_run):
+    import psutil
+    from openlane.config import Config
+    from openlane.steps import Step, OutputProcessor, DefaultOutputProcessor
+    from openlane.state import DesignFormat, State
+
+    dir = os.getcwd()
+
+    class WarningProcessor(OutputProcessor):
+        key = "warnings"
+        report_line_prefixes = ("[WARNING",)
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.warnings = []
+
+        def process_line(self, line: str) -> bool:
+            if line.startswith("[WARNING"):
+                self.warnings.append(line)
+                return True
+            return False
+
+        def result(self):
+            return self.warnings
+
+    class StepTest(Step):
+        inputs = [DesignFormat.NETLIST]
+        outputs = [DesignFormat.NETLIST]
+        id = "TclStepTest"
+        step_dir = dir
+        run = mock_run
+
+    step = StepTest(
+        config=Config(
+            {
+                "DESIGN_NAME": "whatever",
+                "DESIGN_DIR": dir,
+                "EXAMPLE_PDK_VAR": "bla",
+                "PDK_ROOT": "/pdk",
+                "PDK": "dummy",
+                "STD_CELL_LIBRARY": "dummy_scl",
+                "VERILOG_FILES": ["/cwd/src/a.v", "/cwd/src/b.v"],
+                "GRT_REPAIR_ANTENNAS": True,
+                "RUN_HEURISTIC_DIODE_INSERTION": False,
+                "MACROS": None,
+                "DIODE_ON_PORTS": None,
+                "TECH_LEFS": {
+                    "nom_*": "/pdk/dummy/libs.ref/techlef/dummy_scl/dummy_tech_lef.tlef"
+                },
+                "DEFAULT_CORNER": "nom_tt_025C_1v80",
+                "RANDOM_ARRAY": None,
+            }
+        ),
+        state_in=State({DesignFormat.NETLIST: "abc"}),
+        _no_revalidate_conf=True,
+    )
+
+    # Several chunks of report, with CRLF line endings straddling chunk
+    # boundaries and keywords and warnings in the middle of the report
+    report_lines = [f"path {i}: slack -0.{i:06d} ✓\r\n" for i in range(150000)]
+    report_lines[70000] = "[WARNING STA-0001] in a report\r\n"
+    report_lines[90000] = "%OL_METRIC_I inner_metric 3\n"
+    out_data = "".join(
+        [
+            "before\n",
+            "%OL_CREATE_REPORT big.rpt\n",
+            *report_lines,
+            "%OL_END_REPORT\n",
+            "[WARNING STA-0002] outside\n",
+            "%OL_METRIC_F outer_metric 0.5\n",
+            "no trailing newline",
+        ]
+    )
+    with open("out.txt", "w", newline="") as f:
+        f.write(out_data)
+
+    def line_popen(*args, **kwargs):
+        process = psutil.Popen(*args, **kwargs)
+        # No underlying buffer: forces the line-by-line reader
+        process.stdout = iter(process.stdout.readline, "")
+        return process
+
+    results = []
+    for popen in [psutil.Popen, line_popen]:
+        log = f"{popen.__name__}.log"
+        result = step.run_subprocess(
+            ["cat", "out.txt"],
+            silent=True,
+            log_to=log,
+            output_processing=[WarningProcessor, DefaultOutputProcessor],
+            _popen_callable=popen,
+        )
+        with open(log, newline="") as f:
+            log_data = f.read()
+        with open("big.rpt", newline="") as f:
+            report_data = f.read()
+        results.append(
+            (result["generated_metrics"], result["warnings"], log_data, report_data)
+        )
+
+    assert results[0] == results[1], "bulk report handling changed the output"
+    metrics, warnings, log_data, report_data = results[0]
+    assert metrics == {"inner_metric": 3, "outer_metric": 0.5}
+    assert len(warnings) == 2
+    assert log_data == out_data.replace("\r\n", "\n")
+    del report_lines[90000]
+    del report_lines[70000]
+    assert report_data == "".join(report_lines).replace("\r\n", "\n")
@@ -0,0 +1,188 @@
+# Copyright 2024 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+from decimal import Decimal
+from typing import List, Tuple
+
+import pytest
+
+from openlane.steps import step
+
+mock_variables = pytest.mock_variables
+
+
+@pytest.mark.usefixtures("_mock_conf_fs")
+@mock_variables([step])
+def test_step_cache(mock_config):
+    from openlane.common import Path, Toolbox
+    from openlane.config.flow import option_variables
+    from openlane.state import DesignFormat, State
+    from openlane.steps import Step, MetricsUpdate, ViewsUpdate
+
+    runs = []
+
+    class TestStep(Step):
+        inputs = [DesignFormat.NETLIST]
+        outputs = [DesignFormat.NETLIST]
+        id = "TestStep"
+        config_vars = [
+            variable
+            for variable in option_variables
+            if variable.name.startswith("STEP_CACHE_")
+        ]
+
+        def run(self, state_in: State, **kwargs) -> Tuple[ViewsUpdate, MetricsUpdate]:
+            runs.append(self.step_dir)
+            netlist = os.path.join(self.step_dir, "out", "top.nl.v")
+            os.makedirs(os.path.dirname(netlist))
+            with open(netlist, "w") as f:
+                f.write(open(str(state_in[DesignFormat.NETLIST])).read() + "// out\n")
+            return {DesignFormat.NETLIST: Path(netlist)}, {"cells": Decimal("1.5")}
+
+    def start(netlist: str, step_dir: str) -> Tuple[Step, State]:
+        state_in = State({DesignFormat.NETLIST: Path(netlist)}, metrics={"a": 1})
+        step = TestStep(
+            config=mock_config,
+            state_in=state_in,
+            STEP_CACHE_DIR="/cache",
+        )
+        return step, step.start(toolbox=Toolbox(tmp_dir="/tmp"), step_dir=step_dir)
+
+    for netlist in ["/cwd/a.nl.v", "/cwd/b.nl.v"]:
+        with open(netlist, "w") as f:
+            f.write("module top(); endmodule\n")
+
+    step, state_out = start("/cwd/a.nl.v", "/run/1-teststep")
+    assert step.cache_hit is False
+    assert runs == ["/run/1-teststep"]
+
+    step, state_out = start("/cwd/b.nl.v", "/run/2-teststep")
+    assert step.cache_hit is True, "identical input in another file was not restored"
+    assert runs == ["/run/1-teststep"], "step ran despite a cache hit"
+    assert state_out[DesignFormat.NETLIST] == "/run/2-teststep/out/top.nl.v"
+    assert state_out.metrics["cells"] == Decimal("1.5")
+    assert isinstance(state_out.metrics["cells"], Decimal)
+    with open("/run/2-teststep/out/top.nl.v") as f:
+        assert f.read() == "module top(); endmodule\n// out\n"
+    with open("/run/2-teststep/state_in.json") as f:
+        assert "b.nl.v" in f.read(), "restored step has a stale state_in.json"
+
+    with open("/cwd/b.nl.v", "w") as f:
+        f.write("module top(input a); endmodule\n")
+    step, state_out = start("/cwd/b.nl.v", "/run/3-teststep")
+    assert step.cache_hit is False, "changed input was restored from the cache"
+    assert runs == ["/run/1-teststep", "/run/3-teststep"]
+
+
+@pytest.mark.usefixtures("_mock_conf_fs")
+@mock_variables([step])
+def test_step_cache_directory(mock_config):
+    from openlane.common import Path, Toolbox
+    from openlane.config import Variable
+    from openlane.config.flow import option_variables
+    from openlane.state import State
+    from openlane.steps import Step, MetricsUpdate, ViewsUpdate
+
+    runs = []
+
+    class TestStep(Step):
+        inputs = []
+        outputs = []
+        id = "TestStep"
+        config_vars = [
+            variable
+            for variable in option_variables
+            if variable.name.startswith("STEP_CACHE_")
+        ] + [Variable("INCLUDE_DIRS", List[Path], "x")]
+
+        def run(self, state_in: State, **kwargs) -> Tuple[ViewsUpdate, MetricsUpdate]:
+            runs.append(self.step_dir)
+            return {}, {}
+
+    def start(step_dir: str) -> Step:
+        step = TestStep(
+            config=mock_config,
+            state_in=State(),
+            STEP_CACHE_DIR="/cache",
+            INCLUDE_DIRS=[Path("/cwd/include")],
+        )
+        step.start(toolbox=Toolbox(tmp_dir="/tmp"), step_dir=step_dir)
+        return step
+
+    os.makedirs("/cwd/include/sub")
+    with open("/cwd/include/sub/defs.vh", "w") as f:
+        f.write("`define WIDTH 8\n")
+
+    assert start("/run/1-teststep").cache_hit is False
+    assert start("/run/2-teststep").cache_hit is True
+
+    with open("/cwd/include/sub/defs.vh", "w") as f:
+        f.write("`define WIDTH 16\n")
+    step = start("/run/3-teststep")
+    assert (
+        step.cache_hit is False
+    ), "a step whose included file changed was restored from the cache"
+    assert runs == ["/run/1-teststep", "/run/3-teststep"]
+
+
+def test_evict(tmp_path):
+    from openlane.steps import step_cache
+
+    cache_dir = str(tmp_path / "cache")
+    keys = [f"{i:02d}" * 32 for i in range(3)]
+    for i, key in enumerate(keys):
+        step_dir = tmp_path / key
+        step_dir.mkdir()
+        (step_dir / "report.rpt").write_text("x" * 100)
+        assert step_cache.store(cache_dir, key, str(step_dir), {}, {})
+        entry = os.path.join(cache_dir, key[:2], key, "entry.json")
+        os.utime(entry, (i, i))
+
+    # Restoring an entry makes it the most recently used one
+    assert step_cache.load(cache_dir, keys[0], str(tmp_path / "restored")) is not None
+    step_cache.evict(cache_dir, 250)
+    assert step_cache.load(cache_dir, keys[1], str(tmp_path / "restored")) is None
+    assert step_cache.load(cache_dir, keys[0], str(tmp_path / "restored")) is not None
+    assert step_cache.load(cache_dir, keys[2], str(tmp_path / "restored")) is not None
+
+    outside = tmp_path / "outside.v"
+    outside.write_text("")
+    assert not step_cache.store(
+        cache_dir, "ff" * 32, str(tmp_path / keys[0]), {"nl": str(outside)}, {}
+    ), "a step with views outside of its step directory was cached"
+
+
+def test_size_file(tmp_path, monkeypatch):
+    from openlane.steps import step_cache
+
+    cache_dir = str(tmp_path / "cache")
+    step_dir = tmp_path / "step"
+    step_dir.mkdir()
+    (step_dir / "report.rpt").write_text("x" * 100)
+    assert step_cache.store(cache_dir, "00" * 32, str(step_dir), {}, {}, 250)
+
+    listed = []
+    list_entries = step_cache._list_entries
+    monkeypatch.setattr(
+        step_cache,
+        "_list_entries",
+        lambda cache_dir: listed.append(cache_dir) or list_entries(cache_dir),
+    )
+    assert step_cache.store(cache_dir, "01" * 32, str(step_dir), {}, {}, 250)
+    assert listed == [], "entries were listed while the cache was under its limit"
+
+    assert step_cache.store(cache_dir, "02" * 32, str(step_dir), {}, {}, 250)
+    assert listed == [cache_dir]
+    with open(os.path.join(cache_dir, step_cache.SIZE_FILE)) as f:
+        assert f.read() == '{"total": 200}'